@@ -0,0 +1,230 @@
+"""
+NEER — Advisory Buckets
+Canonical, bucketed inputs for WeatherScout's AI advisory.
+
+The advisory prompt used to carry raw numbers and the city name, so
+31.2°C in Jodhpur and 31.4°C in Pali were two Gemini calls for the same
+advice. Now the prompt only sees discrete features:
+
+    today / tomorrow temperature band (5°C), rain class, wind class,
+    alert set, season + this month's activity, crop, language
+
+and asks the model to write exact values as placeholders ({city},
+{temp_max}, ...). The prompt text is therefore identical for every
+location in the same bucket, so the content-addressed LLM cache in
+front of text_fn serves one advisory per bucket; fill_template() puts
+each location's own numbers back in. A reply that invents a placeholder
+or writes a weather value itself (31°C, 40%, 12 mm) would be wrong for
+every other location in the bucket: is_advisory_template() keeps it out
+of the cache and fill_template() refuses it.
+
+AdvisoryBucketStats counts, per day, distinct raw inputs (what the old
+prompt would have sent) vs distinct buckets — the reuse the cache can get.
+"""
+
+import hashlib
+import json
+import math
+import re
+from datetime import date
+
+PLACEHOLDERS = {
+    "city": "city name",
+    "temp": "current temperature (°C)",
+    "temp_max": "tomorrow's high (°C)",
+    "temp_min": "tomorrow's low (°C)",
+    "rain_mm": "tomorrow's rain (mm)",
+    "rain_prob": "tomorrow's rain probability (%)",
+    "wind": "tomorrow's max wind (km/h)",
+    "humidity": "current humidity (%)",
+}
+UNKNOWN = "unknown"     # Class of a value Open-Meteo returned as null
+_PLACEHOLDER = re.compile(r"\{\w+\}")
+# A number written with a weather unit instead of a placeholder
+_BARE_VALUE = re.compile(
+    r"\d+(?:\.\d+)?\s*(?:°\s*C?|%|mm\b|km/h|डिग्री|मिमी|प्रतिशत)", re.IGNORECASE
+)
+
+
+# ============================================================
+# FEATURES
+# ============================================================
+
+def temp_band(temp: float) -> str:
+    if temp is None:
+        return UNKNOWN
+    low = int(math.floor(temp / 5) * 5)
+    return f"{low}–{low + 5}°C"
+
+
+# Class edges follow the weather rule thresholds (heavy_rain, strong_wind,
+# good_spray_window) so a bucket never straddles an alert boundary
+def rain_class(rain_mm: float, rain_prob: float) -> str:
+    if rain_mm is None or rain_prob is None:
+        # One known value can still put it in a class on its own
+        if (rain_mm or 0) >= 30:
+            return "heavy rain"
+        if (rain_mm or 0) >= 5 or (rain_prob or 0) >= 70:
+            return "rain likely"
+        return UNKNOWN
+    if rain_mm >= 30:
+        return "heavy rain"
+    if rain_mm >= 5 or rain_prob >= 70:
+        return "rain likely"
+    if rain_mm >= 1 or rain_prob >= 30:
+        return "light rain possible"
+    return "dry"
+
+
+def wind_class(wind_kmh: float) -> str:
+    if wind_kmh is None:
+        return UNKNOWN
+    if wind_kmh >= 25:
+        return "strong"
+    if wind_kmh >= 15:
+        return "breezy"
+    return "calm"
+
+
+def advisory_features(weather, alerts: list, season_label: str, current_activity: str,
+                      lang: str, crop_type: str = None) -> dict:
+    """Discrete advisory inputs (weather: a WeatherService Forecast); equal features ⇒ one shared advisory."""
+    tomorrow = weather.daily_row(weather.tomorrow_index)
+    return {
+        "today_temp": temp_band(weather.current["temp"]),
+        "tomorrow_high": temp_band(tomorrow["temp_max"]),
+        "tomorrow_low": temp_band(tomorrow["temp_min"]),
+        "rain": rain_class(tomorrow["rain_mm"], tomorrow["rain_prob"]),
+        "wind": wind_class(tomorrow["wind_max"]),
+        "alerts": sorted(f"[{a['type'].upper()}] {a['title']}" for a in alerts),
+        "season": season_label,
+        "activity": current_activity,
+        "crop": (crop_type or "").strip().lower(),
+        "lang": lang,
+    }
+
+
+def template_values(weather, city: str) -> dict:
+    """Exact per-location values for the advisory placeholders."""
+    current = weather.current
+    tomorrow = weather.daily_row(weather.tomorrow_index)
+    return {
+        "city": city,
+        "temp": current["temp"],
+        "temp_max": tomorrow["temp_max"],
+        "temp_min": tomorrow["temp_min"],
+        "rain_mm": tomorrow["rain_mm"],
+        "rain_prob": tomorrow["rain_prob"],
+        "wind": tomorrow["wind_max"],
+        "humidity": current["humidity"],
+    }
+
+
+def template_problems(text: str) -> list:
+    """Why an advisory template can't be shared across a bucket ([] = usable)."""
+    problems = []
+    unknown = sorted({p for p in _PLACEHOLDER.findall(text) if p[1:-1] not in PLACEHOLDERS})
+    if unknown:
+        problems.append(f"unknown placeholders {', '.join(unknown)}")
+    bare = _BARE_VALUE.findall(text)
+    if bare:
+        problems.append(f"literal values {', '.join(bare)}")
+    return problems
+
+
+def is_advisory_template(text: str) -> bool:
+    """Validator for the weather_advisory response cache."""
+    return not template_problems(text)
+
+
+def fill_template(text: str, values: dict) -> str:
+    """
+    Replace {placeholder}s with this location's values (other braces untouched).
+    Raises ValueError if the model invented a placeholder or wrote a weather
+    value itself (see template_problems).
+    """
+    problems = template_problems(text)
+    if problems:
+        raise ValueError(f"Unusable advisory template: {'; '.join(problems)}")
+    for name, value in values.items():
+        text = text.replace(f"{{{name}}}", "–" if value is None else str(value))
+    return text
+
+
+def advisory_prompt(features: dict) -> str:
+    """Location-independent advisory prompt for one bucket."""
+    alert_lines = "\n".join(f"  - {a}" for a in features["alerts"]) or "  No critical alerts."
+    crop_line = f"\nFarmer is growing: {features['crop']}" if features["crop"] else ""
+    placeholder_lines = "\n".join(f"  {{{name}}} — {meaning}" for name, meaning in PLACEHOLDERS.items())
+
+    return f"""You are 'NEER Weather Scout', an expert agricultural weather advisor for Indian farmers.
+
+CURRENT CONDITIONS:
+- Temperature band: {features['today_temp']}
+- Season: {features['season']}
+
+TOMORROW'S FORECAST:
+- High: {features['tomorrow_high']}, Low: {features['tomorrow_low']}
+- Rain: {features['rain']}
+- Wind: {features['wind']}
+
+ACTIVE ALERTS:
+{alert_lines}
+
+SEASONAL ACTIVITY for this month: {features['activity']}
+{crop_line}
+
+TASK: Write a concise 3-4 line farming advisory for today. Be specific and actionable.
+Include:
+1. What to do TODAY based on current weather
+2. What to PREPARE FOR based on tomorrow's forecast
+3. Any seasonal tip relevant to this month
+
+EXACT VALUES: this advisory is shared by many locations. Never write a number
+for the weather or a place name yourself — write these placeholders exactly
+(with the braces) and they will be filled in per location:
+{placeholder_lines}
+
+RULES:
+- Be concise — maximum 4 lines
+- Be specific (mention temperatures, timing) using the placeholders
+- Respond ONLY in {features['lang']}
+- Do NOT use greetings or sign-offs"""
+
+
+# ============================================================
+# REUSE STATS
+# ============================================================
+
+def _digest(obj) -> str:
+    return hashlib.sha1(json.dumps(obj, sort_keys=True, ensure_ascii=False).encode("utf-8")).hexdigest()
+
+
+class AdvisoryBucketStats:
+    """Distinct raw advisory inputs vs distinct buckets, for the current day."""
+
+    def __init__(self):
+        self.day = None
+        self.requests = 0
+        self._raw = set()
+        self._buckets = set()
+
+    def record(self, raw_inputs: dict, features: dict):
+        today = date.today().isoformat()
+        if today != self.day:
+            self.day, self.requests = today, 0
+            self._raw.clear()
+            self._buckets.clear()
+        self.requests += 1
+        self._raw.add(_digest(raw_inputs))
+        self._buckets.add(_digest(features))
+
+    def stats(self) -> dict:
+        raw, buckets = len(self._raw), len(self._buckets)
+        return {
+            "date": self.day,
+            "requests": self.requests,
+            "raw_prompts": raw,
+            "buckets": buckets,
+            "llm_calls_saved_pct": round(100 * (1 - buckets / raw), 1) if raw else 0.0,
+        }
@@ -0,0 +1,82 @@
+"""
+NEER — Batch Alert Engine
+WeatherScout's farming alerts for many locations at once, in NumPy.
+
+The per-request path (WeatherScout._generate_alerts) evaluates the compiled
+weather rules for one city on Python scalars. District-wide jobs (SMS
+alerts, prefetch) need every city at once, so here each input is an array
+over N locations and the same compiled predicates produce one boolean
+mask per rule:
+
+    arrays = forecasts_to_arrays([forecast, ...])    # WeatherService Forecasts
+    alerts = batch_alerts(arrays, lang="Hindi")      # [[alert, ...], ...] per location
+
+Inputs (shape (N,) unless noted):
+  temp_min, temp_max, rain_mm, rain_prob, wind_max  — tomorrow (or today if
+                                                      only one day is known)
+  humidity, temp                                    — current conditions
+  daily_rain                                        — (N, D) rain_mm per day
+
+The output is identical to the scalar path (same alerts, same order, same
+text); bench_alerts.py checks this and measures throughput.
+"""
+
+import numpy as np
+
+from rule_engine import weather_rules
+
+INPUT_FIELDS = ("temp_min", "temp_max", "rain_mm", "rain_prob", "wind_max", "humidity", "temp")
+
+
+def forecasts_to_arrays(forecasts: list) -> dict:
+    """Stack WeatherService Forecasts into the batch input arrays."""
+    n = len(forecasts)
+    days = max((len(f.dates) for f in forecasts), default=0)
+    arrays = {name: np.full(n, np.nan) for name in INPUT_FIELDS}
+    arrays["daily_rain"] = np.full((n, days), np.nan)
+
+    for i, f in enumerate(forecasts):
+        t = f.tomorrow_index
+        for name in ("temp_min", "temp_max", "rain_mm", "rain_prob", "wind_max"):
+            arrays[name][i] = f.daily[name][t]
+        arrays["humidity"][i] = f.current["humidity"]
+        arrays["temp"][i] = f.current["temp"]
+        arrays["daily_rain"][i, :len(f.dates)] = f.daily["rain_mm"]
+    return arrays
+
+
+def array_facts(arrays: dict) -> dict:
+    """Rule-engine facts as arrays over N locations."""
+    daily_rain = np.asarray(arrays["daily_rain"], dtype=float)
+    n = len(daily_rain)
+    facts = {name: np.asarray(arrays[name], dtype=float) for name in INPUT_FIELDS if name != "wind_max"}
+    facts["wind_speed"] = np.asarray(arrays["wind_max"], dtype=float)
+    # Days with < 1 mm rain among the next 3 (missing days never count)
+    facts["no_rain_days"] = (daily_rain[:, :3] < 1).sum(axis=1)
+    facts["danger_alerts"] = np.zeros(n, dtype=int)
+    return facts
+
+
+def alert_masks(arrays: dict, crop: str = None):
+    """
+    (rules, masks): the compiled rules and an (N, len(rules)) boolean
+    matrix whose column j says where rules[j] fires.
+    """
+    fired = weather_rules.fire(array_facts(arrays), crop)
+    n = len(arrays["temp_min"])
+    masks = np.zeros((n, len(fired)), dtype=bool)
+    for j, (_, result) in enumerate(fired):
+        masks[:, j] = result
+    return [rule for rule, _ in fired], masks
+
+
+def batch_alerts(arrays: dict, lang: str = "English", crop: str = None) -> list:
+    """Per-location alert lists, identical to WeatherScout._generate_alerts."""
+    rules, masks = alert_masks(arrays, crop)
+    templates = [rule.alert(lang) for rule in rules]
+    result = [[] for _ in range(len(masks))]
+    # nonzero() walks row-major: per location, alerts come out in rule order
+    rows, cols = np.nonzero(masks)
+    for row, col in zip(rows.tolist(), cols.tolist()):
+        result[row].append(dict(templates[col]))
+    return result
@@ -0,0 +1,80 @@
+"""
+Benchmark: scalar WeatherScout._generate_alerts vs vectorized alert_engine.batch_alerts.
+
+Builds N random 7-day forecasts that straddle every alert threshold, checks
+that both paths return identical alert lists, and prints throughput.
+
+    python bench_alerts.py            # 500 and 50,000 locations
+    python bench_alerts.py 2000       # custom sizes
+"""
+
+import sys
+import time
+
+import numpy as np
+
+from alert_engine import alert_masks, batch_alerts, forecasts_to_arrays
+from weather_scout import WeatherScout
+from weather_service import parse_forecast
+
+DAYS = 7
+DATES = [f"2025-01-{day:02d}" for day in range(1, DAYS + 1)]
+
+
+def random_forecasts(n: int, seed: int = 7) -> list:
+    rng = np.random.default_rng(seed)
+    forecasts = []
+    for _ in range(n):
+        daily = {
+            "temperature_2m_min": [round(float(rng.uniform(-3, 28)), 1) for _ in range(DAYS)],
+            "temperature_2m_max": [round(float(rng.uniform(15, 48)), 1) for _ in range(DAYS)],
+            "precipitation_sum": [round(float(rng.choice([0.0, 0.5, rng.uniform(0, 60)])), 1) for _ in range(DAYS)],
+            "precipitation_probability_max": [int(rng.integers(0, 101)) for _ in range(DAYS)],
+            "wind_speed_10m_max": [round(float(rng.uniform(0, 40)), 1) for _ in range(DAYS)],
+        }
+        forecasts.append(parse_forecast({
+            "current": {
+                "temperature_2m": round(float(rng.uniform(0, 46)), 1),
+                "relative_humidity_2m": int(rng.integers(20, 101)),
+                "apparent_temperature": 0.0, "wind_speed_10m": 0.0, "wind_direction_10m": 0, "weather_code": 0,
+            },
+            "daily": {"time": DATES, **daily},
+        }))
+    return forecasts
+
+
+def run(n: int):
+    scout = WeatherScout(text_fn=None)
+    forecasts = random_forecasts(n)
+
+    start = time.perf_counter()
+    scalar = [scout._generate_alerts(f, "English") for f in forecasts]
+    scalar_sec = time.perf_counter() - start
+
+    start = time.perf_counter()
+    arrays = forecasts_to_arrays(forecasts)
+    stack_sec = time.perf_counter() - start
+
+    start = time.perf_counter()
+    _, masks = alert_masks(arrays)
+    mask_sec = time.perf_counter() - start
+
+    start = time.perf_counter()
+    batch = batch_alerts(arrays, "English")
+    batch_sec = time.perf_counter() - start
+
+    assert batch == scalar, "batch alerts differ from the scalar path"
+    assert batch_alerts(arrays, "Hindi") == [scout._generate_alerts(f, "Hindi") for f in forecasts]
+
+    print(f"\n── {n:,} locations ({int(masks.sum()):,} alerts) — identical to scalar path ✓")
+    print(f"  scalar _generate_alerts : {scalar_sec * 1000:9.1f} ms  ({n / scalar_sec:12,.0f} loc/s)")
+    print(f"  forecasts_to_arrays     : {stack_sec * 1000:9.1f} ms")
+    print(f"  alert_masks (NumPy)     : {mask_sec * 1000:9.1f} ms  ({n / mask_sec:12,.0f} loc/s)")
+    print(f"  batch_alerts (+ dicts)  : {batch_sec * 1000:9.1f} ms  ({n / batch_sec:12,.0f} loc/s)")
+    print(f"  speed-up vs scalar      : {scalar_sec / batch_sec:9.1f}× (masks only: {scalar_sec / mask_sec:,.0f}×)")
+
+
+if __name__ == "__main__":
+    sizes = [int(arg) for arg in sys.argv[1:]] or [500, 50_000]
+    for size in sizes:
+        run(size)
@@ -0,0 +1,142 @@
+"""
+NEER — Chat Sessions
+Server-side conversation memory for /chat, keyed by user.
+
+Each session keeps the most recent turns verbatim. When the history grows
+past HISTORY_TOKEN_BUDGET, older turns are folded into a compact memory
+(one short Gemini summary) so per-turn input tokens stay flat as the
+conversation grows. Idle sessions expire after SESSION_IDLE_TTL_SEC and
+the store is bounded to MAX_SESSIONS by LRU eviction.
+
+Only text turns are kept — tool calls and their payloads are not replayed.
+"""
+
+import asyncio
+import os
+import time
+from collections import OrderedDict
+
+from google.genai import types as genai_types
+
+from tool_payloads import estimate_tokens
+
+MAX_SESSIONS = int(os.getenv("CHAT_MAX_SESSIONS", "2000"))
+SESSION_IDLE_TTL_SEC = int(os.getenv("CHAT_SESSION_IDLE_TTL_SEC", str(30 * 60)))
+HISTORY_TOKEN_BUDGET = int(os.getenv("CHAT_HISTORY_TOKEN_BUDGET", "1500"))
+KEEP_RECENT_TURNS = 4       # Turns always kept verbatim after a compaction
+SUMMARY_MAX_CHARS = 1200    # Fallback memory length if the summary call fails
+
+
+class ChatSession:
+    def __init__(self, user_id: str):
+        self.user_id = user_id
+        self.memory = ""        # Summary of turns that were compacted away
+        self.turns = []         # [(user_text, model_text)]
+        self.last_used = time.monotonic()
+        self.compacting = False
+
+    def history(self) -> list:
+        """Gemini chat history: compact memory first, then recent turns."""
+        contents = []
+        if self.memory:
+            contents.append(genai_types.Content(role="user", parts=[genai_types.Part.from_text(
+                text=f"(Summary of our earlier conversation: {self.memory})")]))
+            contents.append(genai_types.Content(role="model", parts=[genai_types.Part.from_text(text="Noted.")]))
+        for user_text, model_text in self.turns:
+            contents.append(genai_types.Content(role="user", parts=[genai_types.Part.from_text(text=user_text)]))
+            contents.append(genai_types.Content(role="model", parts=[genai_types.Part.from_text(text=model_text)]))
+        return contents
+
+    def tokens(self) -> int:
+        return estimate_tokens([self.memory, self.turns])
+
+
+class SessionStore:
+    """LRU + idle-TTL bounded map of user_id → ChatSession."""
+
+    def __init__(self, summarize_fn, max_sessions: int = MAX_SESSIONS,
+                 idle_ttl: float = SESSION_IDLE_TTL_SEC, token_budget: int = HISTORY_TOKEN_BUDGET):
+        self.summarize = summarize_fn
+        self.max_sessions = max_sessions
+        self.idle_ttl = idle_ttl
+        self.token_budget = token_budget
+        self.sessions = OrderedDict()
+        self.evictions = 0
+        self.compactions = 0
+        self._tasks = set()     # Running compactions (the loop only keeps weak references)
+
+    def get(self, user_id: str) -> ChatSession:
+        """Fetch (or start) the session for user_id and mark it recently used."""
+        self._evict_idle()
+        session = self.sessions.get(user_id)
+        if session is None:
+            session = ChatSession(user_id)
+            self.sessions[user_id] = session
+            while len(self.sessions) > self.max_sessions:
+                self.sessions.popitem(last=False)
+                self.evictions += 1
+        else:
+            self.sessions.move_to_end(user_id)
+        session.last_used = time.monotonic()
+        return session
+
+    def _evict_idle(self):
+        cutoff = time.monotonic() - self.idle_ttl
+        while self.sessions:
+            oldest = next(iter(self.sessions.values()))
+            if oldest.last_used >= cutoff:
+                break
+            self.sessions.popitem(last=False)
+            self.evictions += 1
+
+    def record(self, session: ChatSession, user_text: str, model_text: str):
+        """Append a finished turn; compact in the background if over budget."""
+        session.turns.append((user_text, model_text))
+        # Compact in batches (≥ KEEP_RECENT_TURNS old turns) so long answers
+        # don't trigger a summary call on every turn
+        if (session.tokens() > self.token_budget and not session.compacting
+                and len(session.turns) >= 2 * KEEP_RECENT_TURNS):
+            # Claimed before the task first runs, so a second record() can't schedule another
+            session.compacting = True
+            task = asyncio.ensure_future(self._compact(session))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _compact(self, session: ChatSession):
+        """Fold all but the last KEEP_RECENT_TURNS turns into session.memory."""
+        n_old = len(session.turns) - KEEP_RECENT_TURNS
+        if n_old <= 0:
+            session.compacting = False
+            return
+        old_turns = session.turns[:n_old]
+        transcript = "\n".join(f"Farmer: {u}\nNEER: {m}" for u, m in old_turns)
+        prompt = f"""Summarize this conversation between a farmer and NEER, an agricultural assistant, into a compact memory.
+Keep: the farmer's location, crops, land size, problems discussed, advice already given, and open questions.
+Maximum 80 words. Plain text, no bullet points. Keep the farmer's language.
+
+EXISTING MEMORY:
+{session.memory or "(none)"}
+
+CONVERSATION:
+{transcript}"""
+        try:
+            session.memory = (await self.summarize(prompt)).strip()
+        except asyncio.CancelledError:
+            # Nothing was folded into memory, so keep the turns for the next try
+            session.compacting = False
+            raise
+        except Exception as e:
+            print(f"[CHAT SESSIONS] Summary failed: {e}, truncating instead")
+            session.memory = (session.memory + " " + transcript)[-SUMMARY_MAX_CHARS:].strip()
+        # New turns are only ever appended, so the first n_old are still the ones summarized
+        del session.turns[:n_old]
+        session.compacting = False
+        self.compactions += 1
+
+    def stats(self) -> dict:
+        return {
+            "sessions": len(self.sessions),
+            "max_sessions": self.max_sessions,
+            "evictions": self.evictions,
+            "compactions": self.compactions,
+        }
@@ -0,0 +1,136 @@
+"""
+NEER — Per-model Circuit Breaker
+Remembers which Gemini models are unhealthy so the cascade skips them.
+
+States:
+  closed     — healthy, all traffic allowed
+  open       — too many failures / too slow; skipped until OPEN_COOLDOWN_SEC passes
+  half_open  — cooldown over; a limited number of probe calls are let through.
+               HALF_OPEN_SUCCESSES consecutive successes close the circuit,
+               any failure re-opens it (with a longer cooldown)
+
+Health is scored over a rolling window of recent calls. A "failure" is a
+non-429 error (timeouts, 5xx, malformed responses) or a call slower than
+SLOW_CALL_SEC. Rate limits are quota, not health, and are handled by the
+ModelRouter instead.
+"""
+
+import time
+from collections import deque
+
+WINDOW = 20                 # Recent calls considered per model
+MIN_CALLS = 5               # Don't judge a model on fewer calls than this
+FAILURE_RATE_OPEN = 0.5     # Open when ≥50% of recent calls failed
+SLOW_CALL_SEC = 20.0        # Calls slower than this count as failures
+OPEN_COOLDOWN_SEC = 30.0    # First cooldown; doubles on each re-open
+MAX_COOLDOWN_SEC = 300.0
+HALF_OPEN_PROBES = 1        # Concurrent probe calls allowed while half-open
+HALF_OPEN_SUCCESSES = 2     # Successful probes needed to close
+
+
+class _ModelCircuit:
+    def __init__(self):
+        self.state = "closed"
+        self.outcomes = deque(maxlen=WINDOW)   # (ok, latency_sec)
+        self.opened_at = 0.0
+        self.cooldown = OPEN_COOLDOWN_SEC
+        self.probes_in_flight = 0
+        self.probe_successes = 0
+        self.last_error = None
+
+
+class CircuitBreaker:
+    """Closed / open / half-open breaker per model id."""
+
+    def __init__(self):
+        self.circuits = {}
+
+    def _circuit(self, model_id: str) -> _ModelCircuit:
+        if model_id not in self.circuits:
+            self.circuits[model_id] = _ModelCircuit()
+        return self.circuits[model_id]
+
+    def allow(self, model_id: str) -> bool:
+        """True if a call to model_id may be attempted right now."""
+        c = self._circuit(model_id)
+        if c.state == "open":
+            if time.monotonic() - c.opened_at < c.cooldown:
+                return False
+            c.state = "half_open"
+            c.probes_in_flight = 0
+            c.probe_successes = 0
+            print(f"[BREAKER] {model_id} half-open — probing")
+        if c.state == "half_open":
+            return c.probes_in_flight < HALF_OPEN_PROBES
+        return True
+
+    def on_start(self, model_id: str):
+        c = self._circuit(model_id)
+        if c.state == "half_open":
+            c.probes_in_flight += 1
+
+    def record_success(self, model_id: str, latency_sec: float):
+        c = self._circuit(model_id)
+        ok = latency_sec < SLOW_CALL_SEC
+        c.outcomes.append((ok, latency_sec))
+        if c.state == "half_open":
+            c.probes_in_flight = max(0, c.probes_in_flight - 1)
+            if not ok:
+                self._open(model_id, c, reopen=True)
+                return
+            c.probe_successes += 1
+            if c.probe_successes >= HALF_OPEN_SUCCESSES:
+                c.state = "closed"
+                c.cooldown = OPEN_COOLDOWN_SEC
+                c.outcomes.clear()
+                print(f"[BREAKER] {model_id} closed — healthy again")
+            return
+        self._evaluate(model_id, c)
+
+    def record_failure(self, model_id: str, error: Exception, latency_sec: float = 0.0):
+        c = self._circuit(model_id)
+        c.outcomes.append((False, latency_sec))
+        c.last_error = str(error)[:200]
+        if c.state == "half_open":
+            c.probes_in_flight = max(0, c.probes_in_flight - 1)
+            self._open(model_id, c, reopen=True)
+            return
+        self._evaluate(model_id, c)
+
+    def record_cancelled(self, model_id: str):
+        """A call was abandoned (e.g. lost a hedge race) — no verdict."""
+        c = self._circuit(model_id)
+        if c.state == "half_open":
+            c.probes_in_flight = max(0, c.probes_in_flight - 1)
+
+    def _evaluate(self, model_id: str, c: _ModelCircuit):
+        if c.state != "closed" or len(c.outcomes) < MIN_CALLS:
+            return
+        failures = sum(1 for ok, _ in c.outcomes if not ok)
+        if failures / len(c.outcomes) >= FAILURE_RATE_OPEN:
+            self._open(model_id, c)
+
+    def _open(self, model_id: str, c: _ModelCircuit, reopen: bool = False):
+        if reopen:
+            c.cooldown = min(c.cooldown * 2, MAX_COOLDOWN_SEC)
+        c.state = "open"
+        c.opened_at = time.monotonic()
+        print(f"[BREAKER] {model_id} open for {c.cooldown:.0f}s (last error: {c.last_error})")
+
+    def health(self) -> dict:
+        """Per-model state and health score (share of recent calls that succeeded)."""
+        now = time.monotonic()
+        report = {}
+        for model_id, c in self.circuits.items():
+            calls = len(c.outcomes)
+            successes = sum(1 for ok, _ in c.outcomes if ok)
+            latencies = [lat for ok, lat in c.outcomes if ok]
+            report[model_id] = {
+                "state": c.state,
+                "health_score": round(successes / calls, 3) if calls else 1.0,
+                "recent_calls": calls,
+                "avg_latency_sec": round(sum(latencies) / len(latencies), 3) if latencies else None,
+                "retry_in_sec": round(max(0.0, c.cooldown - (now - c.opened_at)), 1) if c.state == "open" else 0.0,
+                "last_error": c.last_error,
+            }
+        return report
@@ -0,0 +1,267 @@
+"""
+NEER — City Resolver
+Fuzzy, multilingual lookup of a typed city/district name → CITY_COORDS key.
+
+Farmers type "jodhpur ", "Gurgaon", "जोधपुर" or "Jodpur"; anything that
+isn't an exact CITY_COORDS key used to fall back to the state default
+city, i.e. a far-away forecast cell. Every city is indexed under:
+  - its canonical name, and any parenthesised part ("Murwara (Katni)")
+  - old / alternate names from CITY_ALIASES (Gurgaon → Gurugram, ...)
+and every key — and every query — goes through the same phonetic fold
+(lowercase, letters only, no aspirate h, aa/ee/oo/au → a/i/u/o, w → v,
+no trailing e, e → i, initial Cy → Cai, doubled letters collapsed), so
+common spelling variants collide. Devanagari is transliterated first, with
+Hindi schwa deletion and fixed endings (जोधपुर → jodhpur, हैदराबाद →
+haidarabad, अहमदाबाद → ahmadabad). Hindi names whose vowels or schwas
+differ from the Latin one (मेरठ, कटक, ग्वालियर) are listed in CITY_ALIASES;
+tests/hindi_city_names.py holds a Hindi spelling of every city.
+
+resolve(text) tries the exact folded key, then takes the top candidates
+from a trigram inverted index and scores each as the mean of trigram Dice
+similarity and difflib's character ratio (trigrams alone punish a single
+typo in a short name):
+
+    resolver.resolve("Jodhapur") → ("Jodhpur", 0.795)
+    resolver.lookup("गुड़गांव")   → "Gurugram"          # exact keys only
+"""
+
+import os
+import re
+from collections import Counter
+from difflib import SequenceMatcher
+
+MIN_SCORE = float(os.getenv("CITY_MATCH_THRESHOLD", "0.75"))
+CANDIDATES = 5      # trigram hits re-scored character by character
+
+# Old / colloquial names → canonical CITY_COORDS key
+CITY_ALIASES = {
+    "Gurugram": ["Gurgaon", "गुड़गांव"],
+    "Mumbai": ["Bombay", "बंबई"],
+    "Navi Mumbai": ["New Bombay"],
+    "Kolkata": ["Calcutta", "कलकत्ता"],
+    "Chennai": ["Madras", "मद्रास"],
+    "Bengaluru": ["Bangalore", "बैंगलोर"],
+    "Mysuru": ["Mysore"],
+    "Prayagraj": ["Allahabad", "इलाहाबाद"],
+    "Vadodara": ["Baroda"],
+    "Thiruvananthapuram": ["Trivandrum"],
+    "Kochi": ["Cochin"],
+    "Varanasi": ["Banaras", "Benares", "Kashi", "बनारस", "काशी"],
+    "Belagavi": ["Belgaum"],
+    "Hubballi": ["Hubli"],
+    "Kalaburagi": ["Gulbarga", "कलबुर्गी"],
+    "Mangaluru": ["Mangalore"],
+    "Shivamogga": ["Shimoga"],
+    "Tumakuru": ["Tumkur"],
+    "Visakhapatnam": ["Vizag", "Vishakhapatnam"],
+    "Kozhikode": ["Calicut"],
+    "Thrissur": ["Trichur"],
+    "Tiruchirappalli": ["Trichy", "Tiruchi"],
+    "Pune": ["Poona"],
+    "Shimla": ["Simla"],
+    "Lucknow": ["Lakhnau", "लखनऊ"],
+    "S.A.S. Nagar": ["Mohali"],
+    "English Bazar": ["Malda"],
+    "Faizabad": ["Ayodhya"],
+    # Hindi spellings the transliteration + fold can't reach (Hindi vowel
+    # or schwa differs from the Latin name, or a different name altogether)
+    "Meerut": ["मेरठ"],
+    "Margao": ["Madgaon", "मडगांव"],
+    "Cuttack": ["Katak", "कटक"],
+    "Gwalior": ["ग्वालियर"],
+    "Morena": ["मुरैना"],
+    "Salem": ["सेलम"],
+    "Orai": ["उरई"],
+    "Mussoorie": ["मसूरी"],
+    "Deoghar": ["देवघर"],
+    "Dhamtari": ["धमतरी"],
+    "Lohardaga": ["लोहरदगा"],
+    "Agartala": ["अगरतला"],
+    "Kapurthala": ["कपूरथला"],
+    "Bulandshahr": ["बुलंदशहर"],
+    "Shahjahanpur": ["शाहजहांपुर"],
+    "Alipurduar": ["अलीपुरद्वार"],
+    "Midnapore": ["Medinipur", "मेदिनीपुर"],
+    "Ramanagara": ["रामनगरा"],
+    "Vijayawada": ["विजयवाड़ा"],
+    "Vizianagaram": ["विजयनगरम"],
+    "Rayagada": ["रायगड़ा"],
+    "Bhubaneswar": ["भुवनेश्वर"],
+    "Parbhani": ["परभणी"],
+    "Coimbatore": ["कोयंबटूर"],
+    "Cuddalore": ["कुड्डालोर"],
+    "Nagercoil": ["नागरकोइल"],
+    "Dalhousie": ["डलहौज़ी"],
+    "Beawar": ["ब्यावर"],
+    "Sivasagar": ["Sibsagar", "शिवसागर"],
+    "Lumding": ["लमडिंग"],
+    "Shillong": ["शिलांग"],
+    "Aizawl": ["आइज़ोल"],
+    "Lawngtlai": ["लॉन्ग्तलाई"],
+    "North Lakhimpur": ["उत्तर लखीमपुर"],
+    "South Dumdum": ["दक्षिण दमदम"],
+}
+
+# ============================================================
+# NORMALIZATION
+# ============================================================
+
+_CONSONANTS = {
+    "क": "k", "ख": "kh", "ग": "g", "घ": "gh", "ङ": "n",
+    "च": "ch", "छ": "chh", "ज": "j", "झ": "jh", "ञ": "n",
+    "ट": "t", "ठ": "th", "ड": "d", "ढ": "dh", "ण": "n",
+    "त": "t", "थ": "th", "द": "d", "ध": "dh", "न": "n",
+    "प": "p", "फ": "ph", "ब": "b", "भ": "bh", "म": "m",
+    "य": "y", "र": "r", "ल": "l", "ळ": "l", "व": "v",
+    "श": "sh", "ष": "sh", "स": "s", "ह": "h",
+    "क़": "k", "ख़": "kh", "ग़": "g", "ज़": "z", "ड़": "r", "ढ़": "rh", "फ़": "f", "य़": "y",
+}
+_VOWELS = {
+    "अ": "a", "आ": "a", "इ": "i", "ई": "i", "उ": "u", "ऊ": "u", "ऋ": "ri",
+    "ए": "e", "ऐ": "ai", "ओ": "o", "औ": "au", "ऑ": "o",
+}
+_MATRAS = {
+    "ा": "a", "ि": "i", "ी": "i", "ु": "u", "ू": "u", "ृ": "ri",
+    "े": "e", "ै": "ai", "ो": "o", "ौ": "au", "ॅ": "e", "ॉ": "o",
+}
+_NASALS = {"ं", "ँ"}
+_VIRAMA = "्"
+_NUKTA = "़"
+_NUKTA_FORMS = {"ड": "ड़", "ढ": "ढ़", "क": "क़", "ख": "ख़", "ग": "ग़", "ज": "ज़", "फ": "फ़", "य": "य़"}
+_DEVANAGARI = re.compile(r"[ऀ-ॿ]")
+_LABIALS = {"प", "फ", "ब", "भ", "म"}
+# Place-name endings spelt one fixed way in Latin names; transliterated on
+# their own, schwa deletion would otherwise run across the join (नगर, पुर)
+_SUFFIXES = {
+    "नगर": "nagar", "पुर": "pur", "गढ़": "garh", "गंज": "ganj",
+    "गांव": "gaon", "गाँव": "gaon", "ाबाद": "abad",
+    "पट्टनम": "patnam", "पटनम": "patnam",
+}
+
+
+def _transliterate_word(word: str) -> str:
+    for suffix, latin in _SUFFIXES.items():
+        if word.endswith(suffix) and len(word) > len(suffix):
+            return _transliterate_word(word[:-len(suffix)]) + latin
+
+    # Units: [consonant, vowel, inherent-schwa?]
+    units = []
+    chars = list(word)
+    i = 0
+    while i < len(chars):
+        ch = chars[i]
+        if i + 1 < len(chars) and chars[i + 1] == _NUKTA:
+            ch = _NUKTA_FORMS.get(ch, ch)
+            i += 1
+        if ch in _CONSONANTS:
+            units.append([_CONSONANTS[ch], "a", True])
+        elif ch in _VOWELS:
+            units.append(["", _VOWELS[ch], False])
+        elif units and ch in _MATRAS:
+            units[-1][1:] = [_MATRAS[ch], False]
+        elif units and ch == _VIRAMA:
+            units[-1][1:] = ["", False]
+        elif units and ch in _NASALS:
+            # Word-final nasalisation (झुंझुनूं) isn't written in Latin names
+            if i < len(chars) - 1:
+                units[-1][1] += "m" if chars[i + 1] in _LABIALS else "n"
+            units[-1][2] = False
+        i += 1
+
+    # Schwa deletion, right to left: word-final, and V C _ C V
+    for k in range(len(units) - 1, -1, -1):
+        cons, vowel, schwa = units[k]
+        if not schwa:
+            continue
+        if k == len(units) - 1:
+            delete = k > 0
+        else:
+            nxt = units[k + 1]
+            delete = k > 0 and units[k - 1][1] != "" and nxt[0] != "" and nxt[1] != ""
+        if delete:
+            units[k][1] = ""
+    return "".join(cons + vowel for cons, vowel, _ in units)
+
+
+def transliterate(text: str) -> str:
+    """Devanagari → rough Latin (other characters pass through)."""
+    if not _DEVANAGARI.search(text):
+        return text
+    return " ".join(
+        _transliterate_word(w) if _DEVANAGARI.search(w) else w
+        for w in text.split()
+    )
+
+
+def fold(text: str) -> str:
+    """Phonetic key: spelling variants of the same name fold together."""
+    text = transliterate(text).lower()
+    text = re.sub(r"[^a-z]", "", text)
+    text = re.sub(r"([bcdgjkpt])h", r"\1", text)
+    text = text.replace("aa", "a").replace("ee", "i").replace("oo", "u").replace("au", "o")
+    text = text.replace("w", "v").replace("z", "j").replace("q", "k")
+    text = re.sub(r"ay(?=[^aeiou]|$)", "ai", text)
+    text = re.sub(r"iy(?=[aeiou])", "i", text)     # Ludhiyana / Ludhiana
+    text = re.sub(r"^([^aeiou])y(?=[^aeiou])", r"\1ai", text)    # Hyderabad / Haidarabad
+    # Indore / Indaur, Bangalore / Bangalor
+    if len(text) > 4:
+        text = re.sub(r"(?<=[^aeiou])e$", "", text)
+    text = text.replace("e", "i")       # Meerut / मेरठ, Jeypore / जयपोर
+    text = re.sub(r"(?<=[^aeiou])y$", "i", text)   # Bally / बाली
+    return re.sub(r"(.)\1+", r"\1", text)
+
+
+def _trigrams(key: str) -> set:
+    padded = f"  {key} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+# ============================================================
+# RESOLVER
+# ============================================================
+
+class CityResolver:
+    """Exact + trigram-fuzzy name → canonical city."""
+
+    def __init__(self, names, aliases: dict = None):
+        self.exact = {}         # folded key → canonical name
+        for name in names:
+            forms = [name] + re.findall(r"\(([^)]+)\)", name) + [name.split("(")[0]]
+            forms += (aliases or {}).get(name, [])
+            for form in forms:
+                key = fold(form)
+                if key:
+                    self.exact.setdefault(key, name)
+
+        self.keys = list(self.exact)
+        self.grams = [_trigrams(key) for key in self.keys]
+        self.postings = {}      # trigram → [key index]
+        for i, grams in enumerate(self.grams):
+            for gram in grams:
+                self.postings.setdefault(gram, []).append(i)
+
+    def lookup(self, text: str):
+        """Canonical name for an exact (folded) match, else None."""
+        return self.exact.get(fold(text))
+
+    def resolve(self, text: str, min_score: float = MIN_SCORE):
+        """(canonical name, score 0–1) of the best match, or None below min_score."""
+        key = fold(text)
+        if not key:
+            return None
+        if key in self.exact:
+            return self.exact[key], 1.0
+
+        grams = _trigrams(key)
+        shared = Counter()
+        for gram in grams:
+            shared.update(self.postings.get(gram, ()))
+        best, best_score = None, 0.0
+        for i, common in shared.most_common(CANDIDATES):
+            dice = 2 * common / (len(grams) + len(self.grams[i]))
+            score = (dice + SequenceMatcher(None, key, self.keys[i]).ratio()) / 2
+            if score > best_score:
+                best, best_score = i, score
+        if best is None or best_score < min_score:
+            return None
+        return self.exact[self.keys[best]], round(best_score, 3)
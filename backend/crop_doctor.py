@@ -112,16 +112,16 @@ class CropDoctor:
     Multi-step AI agent for crop disease detection.
 
     Uses two Gemini function references injected at init:
-      - vision_fn(prompt, image_bytes, mime_type) -> str
-      - text_fn(prompt) -> str
+      - async vision_fn(prompt, image_bytes, mime_type) -> str
+      - async text_fn(prompt) -> str
     """
 
     def __init__(self, vision_fn, text_fn):
         self.vision = vision_fn
         self.text = text_fn
 
-    def diagnose(self, image_bytes: bytes, mime_type: str, lang: str = "English",
-                 state: str = None, season: str = None, crop_hint: str = None) -> dict:
+    async def diagnose(self, image_bytes: bytes, mime_type: str, lang: str = "English",
+                       state: str = None, season: str = None, crop_hint: str = None) -> dict:
         """
         Run the full diagnostic pipeline.
         If crop_hint is provided, uses targeted KB diseases for higher accuracy.
@@ -198,7 +198,7 @@ You MUST respond ONLY with a valid JSON object (no markdown, no extra text):
 }}
 Note: "disease_candidates" should be ranked by confidence, and their "confidence_percentage" MUST sum to 100 exactly if disease_found is true. Include at least 2 candidates. If healthy, empty array."""
 
-        raw = self.vision(vision_prompt, image_bytes, mime_type)
+        raw = await self.vision(vision_prompt, image_bytes, mime_type)
         vision_result = self._parse_json(raw)
         steps_completed.append("vision_analysis")
 
@@ -320,7 +320,7 @@ You MUST respond ONLY with a valid JSON object:
   "prevention": ["tip 1", "tip 2", "tip 3"]
 }}"""
 
-            treatment_raw = self.text(treatment_prompt)
+            treatment_raw = await self.text(treatment_prompt)
             treatment_data = self._parse_json(treatment_raw)
 
             severity = vision_result.get("severity", "Moderate")
@@ -0,0 +1,154 @@
+"""
+NEER — Forecast Cache
+TTL cache with stale-while-revalidate in front of Open-Meteo.
+
+Open-Meteo refreshes its forecasts hourly, so fetching on every /weather
+call only repeats the same payload. Entries are keyed on coordinates
+rounded to COORD_DECIMALS (0.1° ≈ 11 km, about the grid of the models
+Open-Meteo serves for India) and are:
+
+  fresh   — until the next hourly update (top of the hour + UPDATE_OFFSET_SEC)
+            → served directly
+  stale   — up to MAX_STALE_SEC after that
+            → served instantly, one background refresh is started
+  expired — older than that
+            → the caller waits for a fetch
+
+If a fetch fails, the last known forecast is served (any age) instead of
+an error. Concurrent fetches for the same cell share one upstream call.
+"""
+
+import asyncio
+import os
+import time
+from collections import OrderedDict
+from datetime import datetime, timezone
+
+from single_flight import SingleFlight
+
+COORD_DECIMALS = int(os.getenv("FORECAST_COORD_DECIMALS", "1"))
+UPDATE_OFFSET_SEC = 5 * 60          # New hourly data is available a few minutes past the hour
+MAX_STALE_SEC = int(os.getenv("FORECAST_MAX_STALE_SEC", str(6 * 3600)))
+MAX_ENTRIES = 5000
+
+
+def next_update(now: float) -> float:
+    """Epoch time of the next hourly model update after now."""
+    return ((now - UPDATE_OFFSET_SEC) // 3600 + 1) * 3600 + UPDATE_OFFSET_SEC
+
+
+class _Entry:
+    def __init__(self, data: dict):
+        self.data = data
+        self.fetched_at = time.time()
+        self.fresh_until = next_update(self.fetched_at)
+        self.last_used = 0.0        # Last time a request read this entry
+
+
+class ForecastCache:
+    """
+    Stale-while-revalidate cache of parsed forecasts per rounded coordinate.
+
+    Uses fetch_fn injected at init:
+      - async fetch_fn(lat, lon) -> dict
+    """
+
+    def __init__(self, fetch_fn, name: str = "open_meteo", decimals: int = COORD_DECIMALS,
+                 max_stale: float = MAX_STALE_SEC, max_entries: int = MAX_ENTRIES):
+        self.fetch = fetch_fn
+        self.decimals = decimals
+        self.max_stale = max_stale
+        self.max_entries = max_entries
+        self.flight = SingleFlight(name)
+        self._entries = OrderedDict()
+        self._stats = {
+            "fresh_hits": 0, "stale_hits": 0, "misses": 0,
+            "refreshes": 0, "refresh_failures": 0, "fallbacks": 0,
+        }
+
+    def key(self, lat: float, lon: float) -> tuple:
+        return (round(lat, self.decimals), round(lon, self.decimals))
+
+    async def get(self, lat: float, lon: float):
+        """
+        Forecast for the cell containing (lat, lon).
+        Returns (data, freshness) where freshness = {"fetched_at", "stale"}.
+        Raises only if the fetch fails and nothing was ever cached for the cell.
+        """
+        key = self.key(lat, lon)
+        entry = self._entries.get(key)
+        now = time.time()
+        if entry is not None:
+            entry.last_used = now
+
+        if entry is not None and now < entry.fresh_until:
+            self._stats["fresh_hits"] += 1
+            return entry.data, self._freshness(entry, stale=False)
+
+        if entry is not None and now < entry.fresh_until + self.max_stale:
+            self._stats["stale_hits"] += 1
+            asyncio.ensure_future(self._background_refresh(key))
+            return entry.data, self._freshness(entry, stale=True)
+
+        self._stats["misses"] += 1
+        try:
+            entry = await self.flight.do(key, self._refresh, key)
+            entry.last_used = now
+            return entry.data, self._freshness(entry, stale=False)
+        except Exception as e:
+            if entry is None:
+                raise
+            self._stats["fallbacks"] += 1
+            print(f"[FORECAST CACHE] Fetch failed for {key}, serving last known forecast: {e}")
+            return entry.data, self._freshness(entry, stale=True)
+
+    def put(self, lat: float, lon: float, data: dict):
+        """Store an already-fetched forecast (e.g. from a bulk prefetch)."""
+        self._store(self.key(lat, lon), data)
+
+    def active_keys(self, window_sec: float) -> list:
+        """Cells that served a request within the last window_sec."""
+        cutoff = time.time() - window_sec
+        return [key for key, entry in self._entries.items() if entry.last_used >= cutoff]
+
+    async def _refresh(self, key: tuple) -> _Entry:
+        self._stats["refreshes"] += 1
+        try:
+            data = await self.fetch(*key)
+        except Exception:
+            self._stats["refresh_failures"] += 1
+            raise
+        return self._store(key, data)
+
+    async def _background_refresh(self, key: tuple):
+        try:
+            await self.flight.do(key, self._refresh, key)
+        except Exception as e:
+            print(f"[FORECAST CACHE] Background refresh failed for {key}: {e}")
+
+    def _store(self, key: tuple, data: dict) -> _Entry:
+        entry = _Entry(data)
+        previous = self._entries.get(key)
+        if previous is not None:
+            entry.last_used = previous.last_used
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        return entry
+
+    @staticmethod
+    def _freshness(entry: _Entry, stale: bool) -> dict:
+        return {
+            "fetched_at": datetime.fromtimestamp(entry.fetched_at, timezone.utc).isoformat(timespec="seconds"),
+            "stale": stale,
+        }
+
+    def stats(self) -> dict:
+        served = self._stats["fresh_hits"] + self._stats["stale_hits"] + self._stats["misses"]
+        return {
+            **self._stats,
+            "entries": len(self._entries),
+            "hit_rate": round((self._stats["fresh_hits"] + self._stats["stale_hits"]) / served, 4) if served else 0.0,
+            "single_flight": self.flight.stats(),
+        }
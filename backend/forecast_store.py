@@ -0,0 +1,299 @@
+"""
+NEER — Forecast Store
+Append-only columnar history of every fetched forecast, per grid cell.
+
+Each WeatherService fetch is recorded in three tables:
+
+    hourly   — the hourly forecast (temp, humidity, rain_prob, wind)
+    daily    — the daily summaries (temp_max/min, rain_mm, rain_prob, wind_max, uv_index)
+    current  — current conditions at fetch time (an observation proxy)
+
+Every row carries `valid` (the time the value is for) and `issued` (when
+we fetched it), both int32 minutes since the epoch in forecast-local time
+(Asia/Kolkata), so lead time = valid - issued. Values are quantized to
+int16 (temperature and wind ×10, percentages ×1, UV ×100; -32768 = missing).
+
+Layout, partitioned by cell and by the month of `valid`:
+
+    <root>/<lat>_<lon>/<table>/2025-06/<column>.i16|.i32   open month:
+                                                           raw appends, np.memmap'd
+    <root>/<lat>_<lon>/<table>/2025-05.npz                 sealed month: sorted by
+                                                           (valid, issued), zlib
+
+A fetch's hourly data starts at today 00:00, so once a cell receives a
+fetch whose earliest valid time is in a later month, the earlier open
+months are sealed. Should rows for a sealed month arrive anyway (a clock
+change, a late write), they go to a fresh open directory beside the .npz;
+queries read both, and the next seal merges them into the .npz. Sealed
+months are decompressed on first use and kept in a small LRU.
+
+    store.query(lat, lon, "2025-05-01", "2025-06-01", latest_only=True)
+    → {"valid", "issued": datetime64[m], "temp", ...: float32}  (NaN = missing)
+
+A month of hourly history for one cell (24 fetches a day × 168 hours)
+is ~120k rows; a range query is one searchsorted per sealed month or
+one mask over the open month.
+"""
+
+import os
+import threading
+from collections import OrderedDict
+from datetime import datetime
+from zoneinfo import ZoneInfo
+
+import numpy as np
+
+from forecast_cache import COORD_DECIMALS
+from weather_service import TIMEZONE
+
+STORE_DIR = os.getenv("FORECAST_STORE_DIR") or os.path.join(os.path.dirname(__file__), "cache", "forecast_store")
+SEALED_CACHE_MONTHS = int(os.getenv("FORECAST_STORE_CACHE_MONTHS", "64"))
+
+MISSING = np.iinfo(np.int16).min
+
+# table → {column: scale}; stored value = round(value × scale) as int16
+TABLES = {
+    "hourly": {"temp": 10, "humidity": 1, "rain_prob": 1, "wind": 10},
+    "daily": {"temp_max": 10, "temp_min": 10, "rain_mm": 10, "rain_prob": 1, "wind_max": 10, "uv_index": 100},
+    "current": {"temp": 10, "feels_like": 10, "humidity": 1, "wind_speed": 10, "weather_code": 1},
+}
+TIME_COLUMNS = ("valid", "issued")
+
+
+def _minutes(times) -> np.ndarray:
+    return np.asarray(times, dtype="datetime64[m]").astype(np.int64).astype(np.int32)
+
+
+def _quantize(values, scale: int) -> np.ndarray:
+    values = np.asarray(values, dtype=np.float64) * scale
+    q = np.full(values.shape, MISSING, dtype=np.int16)
+    ok = ~np.isnan(values)
+    q[ok] = np.clip(np.round(values[ok]), MISSING + 1, np.iinfo(np.int16).max)
+    return q
+
+
+def _dequantize(q: np.ndarray, scale: int) -> np.ndarray:
+    values = q.astype(np.float32) / scale
+    values[q == MISSING] = np.nan
+    return values
+
+
+def columns_to_json(columns: dict) -> dict:
+    """query() result → JSON-ready lists (ISO times, None for missing values)."""
+    return {
+        name: [str(t) for t in values] if name in TIME_COLUMNS
+        else [None if np.isnan(v) else round(float(v), 2) for v in values]
+        for name, values in columns.items()
+    }
+
+
+class ForecastStore:
+    """Per-cell, per-month columnar time series of fetched forecasts."""
+
+    def __init__(self, root: str = STORE_DIR, decimals: int = COORD_DECIMALS):
+        self.root = root
+        self.decimals = decimals
+        self._lock = threading.Lock()
+        self._sealed = OrderedDict()       # npz path → decoded columns (LRU)
+        self._stats = {"forecasts": 0, "rows": 0, "seals": 0, "queries": 0, "write_errors": 0}
+        os.makedirs(self.root, exist_ok=True)
+
+    def cell(self, lat: float, lon: float) -> str:
+        return f"{lat:.{self.decimals}f}_{lon:.{self.decimals}f}"
+
+    def _table_dir(self, cell: str, table: str) -> str:
+        return os.path.join(self.root, cell, table)
+
+    # ── Writing ──
+
+    def record(self, lat: float, lon: float, forecast, issued) -> None:
+        """
+        Append one WeatherService Forecast fetched at `issued` (local datetime).
+        Disk errors are logged and counted, never raised — history is best-effort.
+        """
+        cell = self.cell(lat, lon)
+        issued_min = _minutes([np.datetime64(issued, "m")])[0]
+        rows = {
+            "hourly": (forecast.times, forecast.hourly),
+            "daily": (forecast.dates.astype("datetime64[m]"), forecast.daily),
+        }
+        if forecast.current is not None:
+            rows["current"] = (
+                np.array([np.datetime64(issued, "m")]),
+                {name: [np.nan if forecast.current.get(name) is None else forecast.current[name]]
+                 for name in TABLES["current"]},
+            )
+        with self._lock:
+            try:
+                for table, (valid, columns) in rows.items():
+                    if len(valid):
+                        self._append(cell, table, _minutes(valid), issued_min, columns)
+                self._stats["forecasts"] += 1
+            except OSError as e:
+                self._stats["write_errors"] += 1
+                print(f"[FORECAST STORE] Could not record {cell}: {e}")
+
+    def _append(self, cell: str, table: str, valid: np.ndarray, issued: int, columns: dict):
+        schema = TABLES[table]
+        encoded = {
+            "valid": valid,
+            "issued": np.full(len(valid), issued, dtype=np.int32),
+            **{name: _quantize(columns[name], scale) for name, scale in schema.items()},
+        }
+        months = valid.astype("datetime64[m]").astype("datetime64[M]")
+        for month in np.unique(months):
+            in_month = months == month
+            month_dir = os.path.join(self._table_dir(cell, table), str(month))
+            os.makedirs(month_dir, exist_ok=True)
+            self._repair(month_dir, table)
+            for name, column in encoded.items():
+                with open(self._column_path(month_dir, name), "ab") as f:
+                    f.write(column[in_month].tobytes())
+        self._stats["rows"] += len(valid)
+        self._seal_before(cell, table, months.min())
+
+    @staticmethod
+    def _column_path(month_dir: str, name: str) -> str:
+        return os.path.join(month_dir, f"{name}.{'i32' if name in TIME_COLUMNS else 'i16'}")
+
+    @staticmethod
+    def _dtype(name: str):
+        return np.int32 if name in TIME_COLUMNS else np.int16
+
+    def _rows_on_disk(self, month_dir: str, table: str) -> dict:
+        """Complete rows in each column file of an open month."""
+        rows = {}
+        for name in (*TIME_COLUMNS, *TABLES[table]):
+            path = self._column_path(month_dir, name)
+            size = os.path.getsize(path) if os.path.exists(path) else 0
+            rows[name] = size // np.dtype(self._dtype(name)).itemsize
+        return rows
+
+    def _repair(self, month_dir: str, table: str):
+        """Cut every column back to the shortest one, so an append interrupted
+        halfway can't shift later rows out of line."""
+        rows = self._rows_on_disk(month_dir, table)
+        n = min(rows.values())
+        for name in rows:
+            path = self._column_path(month_dir, name)
+            if os.path.exists(path) and os.path.getsize(path) != n * np.dtype(self._dtype(name)).itemsize:
+                os.truncate(path, n * np.dtype(self._dtype(name)).itemsize)
+
+    def _open_months(self, cell: str, table: str) -> list:
+        table_dir = self._table_dir(cell, table)
+        if not os.path.isdir(table_dir):
+            return []
+        return sorted(m for m in os.listdir(table_dir) if os.path.isdir(os.path.join(table_dir, m)))
+
+    def _seal_before(self, cell: str, table: str, month):
+        for name in self._open_months(cell, table):
+            if np.datetime64(name, "M") < month:
+                self._seal(cell, table, name)
+
+    def _seal(self, cell: str, table: str, month: str):
+        month_dir = os.path.join(self._table_dir(cell, table), month)
+        path = f"{month_dir}.npz"
+        columns = self._read_open(month_dir, table)
+        if os.path.exists(path):
+            # The month was sealed before: merge, don't overwrite
+            sealed = self._read_sealed(path)
+            columns = {name: np.concatenate([sealed[name], column]) for name, column in columns.items()}
+        order = np.lexsort((columns["issued"], columns["valid"]))
+        tmp_path = f"{month_dir}.tmp.npz"
+        np.savez_compressed(tmp_path, **{name: column[order] for name, column in columns.items()})
+        os.replace(tmp_path, path)
+        self._sealed.pop(path, None)
+        for name in os.listdir(month_dir):
+            os.remove(os.path.join(month_dir, name))
+        os.rmdir(month_dir)
+        self._stats["seals"] += 1
+        print(f"[FORECAST STORE] Sealed {cell}/{table}/{month} ({len(order)} rows)")
+
+    def seal_due(self) -> None:
+        """Seal every open month older than the current one (e.g. at startup)."""
+        this_month = np.datetime64(datetime.now(ZoneInfo(TIMEZONE)).replace(tzinfo=None), "M")
+        with self._lock:
+            for cell in os.listdir(self.root):
+                for table in TABLES:
+                    self._seal_before(cell, table, this_month)
+
+    # ── Reading ──
+
+    def _read_open(self, month_dir: str, table: str) -> dict:
+        """Memory-map an open month's columns (the rows every column has, in case a write was cut off)."""
+        n = min(self._rows_on_disk(month_dir, table).values())
+        return {
+            name: np.memmap(self._column_path(month_dir, name), dtype=self._dtype(name), mode="r", shape=(n,))
+            if n else np.zeros(0, dtype=self._dtype(name))
+            for name in (*TIME_COLUMNS, *TABLES[table])
+        }
+
+    def _read_sealed(self, path: str) -> dict:
+        if path in self._sealed:
+            self._sealed.move_to_end(path)
+            return self._sealed[path]
+        with np.load(path) as data:
+            columns = {name: data[name] for name in data.files}
+        self._sealed[path] = columns
+        while len(self._sealed) > SEALED_CACHE_MONTHS:
+            self._sealed.popitem(last=False)
+        return columns
+
+    def query(self, lat: float, lon: float, start, end, table: str = "hourly",
+              latest_only: bool = False) -> dict:
+        """
+        Rows of `table` for the cell containing (lat, lon) with start <= valid < end,
+        sorted by (valid, issued). latest_only keeps the most recently issued
+        value for each valid time.
+        """
+        schema = TABLES[table]
+        cell = self.cell(lat, lon)
+        start_min, end_min = _minutes([np.datetime64(start, "m"), np.datetime64(end, "m")])
+        months = np.arange(np.datetime64(start, "M"), np.datetime64(end, "m").astype("datetime64[M]") + 1)
+        table_dir = self._table_dir(cell, table)
+        self._stats["queries"] += 1
+
+        parts = []
+        with self._lock:
+            for month in months:
+                base = os.path.join(table_dir, str(month))
+                if os.path.exists(f"{base}.npz"):
+                    columns = self._read_sealed(f"{base}.npz")
+                    lo, hi = np.searchsorted(columns["valid"], [start_min, end_min])
+                    parts.append({name: column[lo:hi] for name, column in columns.items()})
+                if os.path.isdir(base):
+                    columns = self._read_open(base, table)
+                    mask = (columns["valid"] >= start_min) & (columns["valid"] < end_min)
+                    parts.append({name: np.asarray(column[mask]) for name, column in columns.items()})
+
+        names = (*TIME_COLUMNS, *schema)
+        merged = {
+            name: np.concatenate([p[name] for p in parts]) if parts
+            else np.zeros(0, dtype=self._dtype(name))
+            for name in names
+        }
+        order = np.lexsort((merged["issued"], merged["valid"]))
+        merged = {name: column[order] for name, column in merged.items()}
+        if latest_only and len(order):
+            last = np.r_[merged["valid"][1:] != merged["valid"][:-1], True]
+            merged = {name: column[last] for name, column in merged.items()}
+
+        result = {name: merged[name].astype("datetime64[m]") for name in TIME_COLUMNS}
+        result.update((name, _dequantize(merged[name], scale)) for name, scale in schema.items())
+        return result
+
+    def stats(self) -> dict:
+        cells = [c for c in os.listdir(self.root) if os.path.isdir(os.path.join(self.root, c))]
+        open_months = sealed_months = disk_bytes = 0
+        for dirpath, dirnames, filenames in os.walk(self.root):
+            open_months += sum(1 for d in dirnames if d[:4].isdigit())
+            sealed_months += sum(1 for f in filenames if f.endswith(".npz"))
+            disk_bytes += sum(os.path.getsize(os.path.join(dirpath, f)) for f in filenames)
+        return {
+            **self._stats,
+            "cells": len(cells),
+            "open_months": open_months,
+            "sealed_months": sealed_months,
+            "disk_bytes": disk_bytes,
+            "cached_sealed_months": len(self._sealed),
+        }
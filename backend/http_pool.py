@@ -0,0 +1,133 @@
+"""
+NEER — Pooled async HTTP client
+One shared httpx.AsyncClient per upstream API, instead of a fresh
+blocking urllib connection (DNS + TCP + TLS) per request.
+
+  - Keep-alive connection pool (HTTP_MAX_CONNECTIONS), HTTP/2 when the
+    optional `h2` package is installed (`pip install httpx[http2]`)
+  - At most HTTP_MAX_CONCURRENCY requests in flight per upstream, so a
+    burst of farmers can't open hundreds of sockets at once
+  - Retries on transport errors, 429 and 5xx with full-jitter exponential
+    backoff (Retry-After is honoured, capped at MAX_BACKOFF_SEC)
+
+    from http_pool import open_meteo
+    data = await open_meteo.get_json("/v1/forecast", params)
+
+Call `await close_all()` on shutdown.
+"""
+
+import asyncio
+import os
+import random
+
+import httpx
+
+try:
+    import h2  # noqa: F401 — only needed for HTTP/2 support in httpx
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+HTTP_MAX_CONNECTIONS = int(os.getenv("HTTP_MAX_CONNECTIONS", "20"))
+HTTP_MAX_CONCURRENCY = int(os.getenv("HTTP_MAX_CONCURRENCY", "16"))
+HTTP_RETRIES = int(os.getenv("HTTP_RETRIES", "2"))
+HTTP_TIMEOUT_SEC = 10
+BACKOFF_BASE_SEC = 0.25
+MAX_BACKOFF_SEC = 5.0
+RETRY_STATUS = {429, 500, 502, 503, 504}
+USER_AGENT = "NEER-FarmerAI/1.0"
+
+
+class PooledClient:
+    """Lazily created, shared AsyncClient for one base URL."""
+
+    def __init__(self, name: str, base_url: str, max_connections: int = HTTP_MAX_CONNECTIONS,
+                 max_concurrency: int = HTTP_MAX_CONCURRENCY, retries: int = HTTP_RETRIES):
+        self.name = name
+        self.base_url = base_url
+        self.max_connections = max_connections
+        self.retries = retries
+        self._client = None
+        self._slots = asyncio.Semaphore(max_concurrency)
+        self._stats = {"requests": 0, "retries": 0, "failures": 0}
+        self.in_flight = 0
+
+    def _get_client(self) -> httpx.AsyncClient:
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                base_url=self.base_url,
+                http2=HTTP2_AVAILABLE,
+                timeout=HTTP_TIMEOUT_SEC,
+                limits=httpx.Limits(
+                    max_connections=self.max_connections,
+                    max_keepalive_connections=self.max_connections,
+                ),
+                headers={"User-Agent": USER_AGENT},
+            )
+        return self._client
+
+    @staticmethod
+    def _backoff(attempt: int, response: httpx.Response = None) -> float:
+        retry_after = response.headers.get("Retry-After") if response is not None else None
+        if retry_after and retry_after.isdigit():
+            return min(float(retry_after), MAX_BACKOFF_SEC)
+        return random.uniform(0, min(BACKOFF_BASE_SEC * 2 ** attempt, MAX_BACKOFF_SEC))
+
+    async def get_json(self, path: str, params: dict = None):
+        """GET path and decode JSON, retrying transient failures."""
+        async with self._slots:
+            self.in_flight += 1
+            try:
+                for attempt in range(self.retries + 1):
+                    self._stats["requests"] += 1
+                    last_try = attempt == self.retries
+                    try:
+                        response = await self._get_client().get(path, params=params)
+                    except httpx.TransportError as e:
+                        if last_try:
+                            self._stats["failures"] += 1
+                            raise
+                        print(f"[HTTP {self.name}] {type(e).__name__}, retrying ({attempt + 1}/{self.retries})")
+                        self._stats["retries"] += 1
+                        await asyncio.sleep(self._backoff(attempt))
+                        continue
+
+                    if response.status_code in RETRY_STATUS and not last_try:
+                        print(f"[HTTP {self.name}] {response.status_code}, retrying ({attempt + 1}/{self.retries})")
+                        self._stats["retries"] += 1
+                        await asyncio.sleep(self._backoff(attempt, response))
+                        continue
+                    if response.is_error:
+                        self._stats["failures"] += 1
+                    response.raise_for_status()
+                    return response.json()
+            finally:
+                self.in_flight -= 1
+
+    async def aclose(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    def stats(self) -> dict:
+        return {
+            **self._stats,
+            "in_flight": self.in_flight,
+            "http2": HTTP2_AVAILABLE,
+            "max_connections": self.max_connections,
+        }
+
+
+open_meteo = PooledClient("open_meteo", "https://api.open-meteo.com")
+
+_CLIENTS = [open_meteo]
+
+
+async def close_all():
+    """Close every pooled client (FastAPI shutdown)."""
+    for client in _CLIENTS:
+        await client.aclose()
+
+
+def pool_stats() -> dict:
+    return {client.name: client.stats() for client in _CLIENTS}
@@ -0,0 +1,353 @@
+"""
+NEER — Intent Pre-Router
+Answers simple, unambiguous /chat questions without a Gemini round trip.
+
+A large share of chat traffic is "what is PM-KISAN" or "weather in
+Jodhpur tomorrow". Those are recognised locally with keyword cues plus
+dictionaries built from schemes.json (scheme ids, names, acronyms) and
+crop_calendar.json (city names, aliases and Devanagari forms, matched
+exactly after city_resolver's phonetic fold):
+
+  scheme_info — exactly one scheme named + an info/benefit/apply cue
+                → answered from a template over schemes.json (0 API calls)
+  weather     — exactly one known city + a weather cue
+                → one WeatherScout tool-mode call, answered from a template
+
+Anything else — several intents, long or personal questions, chat context,
+Hindi or Hinglish scheme questions (schemes.json and the answer template
+are English-only) — returns None and falls back to the full Gemini
+orchestration.
+
+Cues match whole words or phrases ("kal" is not "Kalyan", "rain" is not
+"rainfed"); a cue ending in "*" also matches as a word prefix
+("benefit*" → benefits).
+"""
+
+import re
+
+from scheme_navigator import SCHEMES_DB
+from city_resolver import CITY_ALIASES
+from weather_scout import CALENDAR_KB, CITY_COORDS, CITY_RESOLVER
+
+MAX_WORDS = 14      # Longer messages are rarely "simple"
+
+_DEVANAGARI = re.compile(r"[ऀ-ॿ]")
+
+# Extra spellings farmers use that can't be derived from schemes.json
+SCHEME_ALIASES = {
+    "pm_kisan": ["pm kisan", "pmkisan", "kisan samman nidhi", "पीएम किसान", "किसान सम्मान निधि"],
+    "pmfby": ["fasal bima", "crop insurance scheme", "फसल बीमा"],
+    "kcc": ["kisan credit card", "किसान क्रेडिट कार्ड"],
+    "pmkisan_maan_dhan": ["maan dhan", "kisan pension", "मानधन"],
+    "mgnrega": ["nrega", "manrega", "मनरेगा"],
+    "e_nam": ["enam", "e nam"],
+}
+
+# Other named things an answer can be specific to (find_entities)
+BANK_ALIASES = {
+    "sbi": ["sbi", "state bank", "state bank of india", "एसबीआई", "स्टेट बैंक"],
+    "pnb": ["pnb", "punjab national bank", "पंजाब नेशनल बैंक"],
+    "bank_of_baroda": ["bob", "bank of baroda", "baroda bank", "बैंक ऑफ बड़ौदा"],
+    "bank_of_india": ["boi", "bank of india"],
+    "central_bank": ["central bank", "central bank of india"],
+    "canara": ["canara", "canara bank", "केनरा बैंक"],
+    "union_bank": ["union bank", "union bank of india"],
+    "indian_bank": ["indian bank"],
+    "iob": ["iob", "indian overseas bank"],
+    "uco": ["uco", "uco bank"],
+    "idbi": ["idbi", "idbi bank"],
+    "hdfc": ["hdfc", "hdfc bank"],
+    "icici": ["icici", "icici bank"],
+    "axis": ["axis bank"],
+    "kotak": ["kotak", "kotak bank"],
+    "nabard": ["nabard", "नाबार्ड"],
+    "cooperative_bank": ["cooperative bank", "co operative bank", "sahkari bank", "सहकारी बैंक"],
+    "gramin_bank": ["gramin bank", "grameen bank", "rrb", "ग्रामीण बैंक"],
+}
+CROP_ALIASES = {
+    "wheat": ["gehun", "gehu", "गेहूं", "गेहूँ"],
+    "rice": ["paddy", "dhan", "chawal", "धान", "चावल"],
+    "maize": ["corn", "makka", "मक्का"],
+    "cotton": ["kapas", "कपास"],
+    "soybean": ["soya", "soyabean", "सोयाबीन"],
+    "groundnut": ["peanut", "moongphali", "मूंगफली"],
+    "jowar": ["sorghum", "ज्वार"],
+    "bajra": ["pearl millet", "बाजरा"],
+    "sugarcane": ["ganna", "गन्ना"],
+    "jute": ["पटसन"],
+    "mustard": ["sarson", "सरसों"],
+    "gram": ["chickpea", "chana", "चना"],
+    "lentil": ["masoor", "मसूर"],
+    "barley": ["jau", "जौ"],
+    "peas": ["matar", "मटर"],
+    "potato": ["aloo", "आलू"],
+    "onion": ["pyaz", "pyaaz", "प्याज"],
+    "watermelon": ["tarbooz", "तरबूज"],
+    "muskmelon": ["kharbooja", "खरबूजा"],
+    "cucumber": ["kheera", "खीरा"],
+    "moong": ["mung", "मूंग"],
+    "sunflower": ["surajmukhi", "सूरजमुखी"],
+    "tomato": ["tamatar", "टमाटर"],
+}
+STATE_ALIASES = {
+    "Andhra Pradesh": ["आंध्र प्रदेश"], "Arunachal Pradesh": ["अरुणाचल प्रदेश"], "Assam": ["असम"],
+    "Bihar": ["बिहार"], "Chhattisgarh": ["छत्तीसगढ़"], "Goa": ["गोवा"], "Gujarat": ["गुजरात"],
+    "Haryana": ["हरियाणा"], "Himachal Pradesh": ["हिमाचल प्रदेश", "himachal"], "Jharkhand": ["झारखंड"],
+    "Karnataka": ["कर्नाटक"], "Kerala": ["केरल"], "Madhya Pradesh": ["मध्य प्रदेश", "mp"],
+    "Maharashtra": ["महाराष्ट्र"], "Manipur": ["मणिपुर"], "Meghalaya": ["मेघालय"], "Mizoram": ["मिज़ोरम"],
+    "Nagaland": ["नागालैंड"], "Odisha": ["ओडिशा", "orissa"], "Punjab": ["पंजाब"],
+    "Rajasthan": ["राजस्थान"], "Sikkim": ["सिक्किम"], "Tamil Nadu": ["तमिलनाडु", "tamilnadu"],
+    "Telangana": ["तेलंगाना"], "Tripura": ["त्रिपुरा"], "Uttar Pradesh": ["उत्तर प्रदेश"],
+    "Uttarakhand": ["उत्तराखंड"], "West Bengal": ["पश्चिम बंगाल", "bengal"],
+}
+
+SCHEME_CUES = [
+    "what is", "what's", "whats", "about", "detail*", "benefit*", "apply", "applying", "application",
+    "how to", "how much", "tell me", "info", "information", "amount", "money",
+]
+WEATHER_CUES = [
+    "weather", "mausam", "mosam", "rain", "rains", "rainy", "raining", "rainfall", "barish", "baarish",
+    "temperature", "tapman", "forecast*",
+    "मौसम", "बारिश", "तापमान",
+]
+TOMORROW_CUES = ["tomorrow", "kal", "कल"]
+# Cues that mean the farmer wants judgement, not facts — leave those to the model
+OTHER_INTENT_CUES = [
+    "disease*", "pest*", "spray*", "should i", "eligib*", "my", "mera", "meri", "mere", "rog", "keet",
+    "रोग*", "कीट*", "मेरा", "मेरी", "मेरे",
+]
+# Romanized Hindi function words: a scheme question using them wants a
+# Hinglish answer, which the English-only template can't give
+HINGLISH_WORDS = {
+    "kya", "hai", "h", "hota", "hoti", "kitna", "kitne", "kitni", "kaise", "kab", "kaun", "kahan",
+    "paisa", "paise", "milta", "milti", "milega", "batao", "bataiye", "mein", "ka", "ki", "ke", "ko",
+    "se", "aur", "karna", "kare", "chahiye",
+}
+
+
+def _normalize(text: str) -> str:
+    text = text.lower().replace("-", " ").replace("_", " ")
+    text = re.sub(r"[()?,.!।]", " ", text)
+    return re.sub(r"\s+", " ", text).strip()
+
+
+def _build_scheme_aliases() -> list:
+    """[(normalized alias, scheme)] longest first."""
+    aliases = []
+    for scheme in SCHEMES_DB:
+        names = {scheme["id"].replace("_", " ")}
+        full = scheme["name"]
+        names.add(full.split("(")[0])
+        names.update(re.findall(r"\(([^)]+)\)", full))
+        names.update(SCHEME_ALIASES.get(scheme["id"], []))
+        for name in names:
+            norm = _normalize(name)
+            # "PM Kisan Maan Dhan Yojana" is usually asked about without "Yojana"
+            short = re.sub(r" (yojana|scheme|mission|programme)$", "", norm)
+            for alias in {norm, short}:
+                if len(alias) >= 3:
+                    aliases.append((alias, scheme))
+    aliases.sort(key=lambda a: -len(a[0]))
+    return aliases
+
+
+def _build_entity_aliases() -> list:
+    """[(normalized alias, entity tag)] over schemes, banks, crops and states, longest first."""
+    aliases = [(alias, f"scheme:{scheme['id']}") for alias, scheme in _SCHEME_ALIASES]
+    crops = {c.split("/")[0].lower(): c.split("/") for season in CALENDAR_KB["seasons"].values()
+             for c in season["crops"]}
+    named = [
+        ("bank", BANK_ALIASES),
+        ("crop", {crop: names + CROP_ALIASES.get(crop, []) for crop, names in crops.items()}),
+        ("crop", {crop: names for crop, names in CROP_ALIASES.items() if crop not in crops}),
+        ("state", {state: [state] + STATE_ALIASES.get(state, []) for state in CALENDAR_KB["state_default_city"]}),
+    ]
+    for kind, table in named:
+        for key, names in table.items():
+            aliases.extend((_normalize(name), f"{kind}:{key}") for name in names)
+    aliases.sort(key=lambda a: -len(a[0]))
+    return aliases
+
+
+_SCHEME_ALIASES = _build_scheme_aliases()
+_ENTITY_ALIASES = _build_entity_aliases()
+_MAX_CITY_WORDS = max(
+    len(_normalize(name).split())
+    for name in [*CITY_COORDS, *(a for names in CITY_ALIASES.values() for a in names)]
+)
+
+
+def _has_cue(text: str, cues: list) -> bool:
+    """True if text contains a cue as whole words ("cue*": as a word prefix)."""
+    padded = f" {text} "
+    return any(
+        f" {cue[:-1]}" in padded if cue.endswith("*") else f" {cue} " in padded
+        for cue in cues
+    )
+
+
+def _is_hinglish(text: str) -> bool:
+    return any(word in HINGLISH_WORDS for word in text.split())
+
+
+def _find_aliases(text: str, aliases: list) -> list:
+    """Values of the aliases named in text; a match inside a longer match doesn't count."""
+    padded = f" {text} "
+    spans = []
+    for alias, value in aliases:
+        start = padded.find(f" {alias} ")
+        if start == -1:
+            continue
+        span = (start, start + len(alias) + 2)
+        if any(s[0] <= span[0] and span[1] <= s[1] for s, _ in spans):
+            continue
+        spans.append((span, value))
+    return [value for _, value in spans]
+
+
+def _find_schemes(text: str) -> list:
+    """Distinct schemes named in text."""
+    found = {}
+    for scheme in _find_aliases(text, _SCHEME_ALIASES):
+        found[scheme["id"]] = scheme
+    return list(found.values())
+
+
+def _find_cities(text: str) -> list:
+    # Whitespace split: \w stops at Devanagari vowel signs
+    words = text.split()
+    found = set()
+    for n in range(_MAX_CITY_WORDS, 0, -1):
+        for i in range(len(words) - n + 1):
+            city = CITY_RESOLVER.lookup(" ".join(words[i:i + n]))
+            if city:
+                found.add(city)
+    return sorted(found)
+
+
+def find_entities(message: str) -> frozenset:
+    """
+    Schemes, banks, crops, states and cities named in a message, as tags
+    ("bank:sbi", "city:Jodhpur", ...). Two questions about different ones
+    need different answers however similar the rest of the wording is.
+    """
+    text = _normalize(message)
+    found = set(_find_aliases(text, _ENTITY_ALIASES))
+    found.update(f"city:{city}" for city in _find_cities(text))
+    return frozenset(found)
+
+
+def mentions_weather(message: str) -> bool:
+    """True if the message asks about weather (time-sensitive, never cache the answer)."""
+    return _has_cue(_normalize(message), WEATHER_CUES)
+
+
+class IntentRouter:
+    """
+    Local classifier + template answers for simple chat questions.
+
+    Uses weather_fn injected at init (WeatherScout tool mode):
+      - async weather_fn(city, state, lang) -> dict
+    """
+
+    def __init__(self, weather_fn):
+        self.weather = weather_fn
+        self.counts = {"scheme_info": 0, "weather": 0, "fallback": 0}
+        self.latency = {"routed": [0, 0.0], "orchestrated": [0, 0.0]}   # [count, total seconds]
+
+    def classify(self, message: str):
+        """Return (intent, slots) for a confidently recognised message, else None."""
+        text = _normalize(message)
+        if not text or len(text.split()) > MAX_WORDS or _has_cue(text, OTHER_INTENT_CUES):
+            return None
+
+        schemes = _find_schemes(text)
+        is_weather = _has_cue(text, WEATHER_CUES)
+
+        if schemes and not is_weather:
+            if len(schemes) != 1 or _DEVANAGARI.search(message) or _is_hinglish(text):
+                return None
+            if _has_cue(text, SCHEME_CUES) or len(text.split()) <= 4:
+                return "scheme_info", {"scheme": schemes[0]}
+            return None
+
+        if is_weather and not schemes:
+            cities = _find_cities(text)
+            if len(cities) != 1:
+                return None
+            return "weather", {
+                "city": cities[0],
+                "tomorrow": _has_cue(text, TOMORROW_CUES),
+                "lang": "Hindi" if _DEVANAGARI.search(message) else "English",
+            }
+        return None
+
+    async def answer(self, message: str):
+        """Templated answer for a recognised message, or None to fall back."""
+        intent = self.classify(message)
+        if intent is None:
+            self.counts["fallback"] += 1
+            return None
+
+        name, slots = intent
+        if name == "scheme_info":
+            text = self._scheme_answer(slots["scheme"])
+        else:
+            data = await self.weather(slots["city"], "", slots["lang"])
+            if data.get("status") != "success":
+                self.counts["fallback"] += 1
+                return None
+            text = self._weather_answer(data, slots["tomorrow"], slots["lang"])
+
+        self.counts[name] += 1
+        print(f"[INTENT ROUTER] Answered '{name}' locally")
+        return text
+
+    def _scheme_answer(self, s: dict) -> str:
+        lines = [f"**{s['name']}** — {s['short']}", "", f"- **Benefits:** {s['benefits']}"]
+        if s.get("apply_steps"):
+            lines.append("- **How to apply:**")
+            lines.extend(f"  {i}. {step}" for i, step in enumerate(s["apply_steps"], 1))
+        if s.get("apply_url"):
+            lines.append(f"- **Official portal:** [{s['name'].split('(')[0].strip()}]({s['apply_url']})")
+        return "\n".join(lines)
+
+    def _weather_answer(self, data: dict, tomorrow_only: bool, lang: str) -> str:
+        hi = lang == "Hindi"
+        cur = data["current"]
+        forecast = data["forecast"]
+        tmr = forecast[1] if len(forecast) > 1 else forecast[0]
+
+        lines = [f"**{data['city']} — {'मौसम' if hi else 'Weather'}**"]
+        if not tomorrow_only:
+            lines.append(
+                f"- {'अभी' if hi else 'Now'}: {cur['temp']}°C ({'महसूस' if hi else 'feels like'} {cur['feels_like']}°C), "
+                f"{cur['weather_label']}, {'नमी' if hi else 'humidity'} {cur['humidity']}%, "
+                f"{'हवा' if hi else 'wind'} {cur['wind_speed']} km/h"
+            )
+        lines.append(
+            f"- {'कल' if hi else 'Tomorrow'} ({tmr['date']}): {tmr['temp_min']}–{tmr['temp_max']}°C, "
+            f"{'बारिश' if hi else 'rain'} {tmr['rain_mm']} mm ({tmr['rain_prob']}%), "
+            f"{'हवा' if hi else 'wind'} {tmr['wind_max']} km/h"
+        )
+        if data["alerts"]:
+            lines.append("")
+            lines.extend(f"- {a['icon']} **{a['title']}:** {a['message']}" for a in data["alerts"])
+        return "\n".join(lines)
+
+    def record_latency(self, path: str, seconds: float):
+        """path: 'routed' or 'orchestrated'."""
+        entry = self.latency[path]
+        entry[0] += 1
+        entry[1] += seconds
+
+    def stats(self) -> dict:
+        routed = self.counts["scheme_info"] + self.counts["weather"]
+        total = routed + self.counts["fallback"]
+        avg = {path: round(total_sec / n * 1000, 1) if n else None
+               for path, (n, total_sec) in self.latency.items()}
+        return {
+            **self.counts,
+            "hit_rate": round(routed / total, 4) if total else 0.0,
+            "avg_latency_ms": avg,
+        }
@@ -0,0 +1,313 @@
+"""
+NEER — Async LLM Gateway
+Non-blocking access to the Gemini cascading model system.
+
+Every call goes through the SDK's async client (client.aio), so a slow or
+rate-limited model never blocks the FastAPI event loop. The cascade:
+  1. Ask the ModelRouter for the first model in GEMINI_MODELS that still
+     has RPM/RPD headroom (no request is wasted on an exhausted model).
+  2. On an unexpected 429, cool that model down and route to the next one.
+  3. If no model has headroom, wait (asyncio.sleep) until the router says
+     one frees up — at most RETRY_DELAY_SEC — and retry, up to MAX_RETRIES
+     times.
+
+A per-model CircuitBreaker remembers models that are timing out,
+returning 5xx or returning malformed responses (e.g. no text). Timeouts
+and 5xx cascade to the next model instead of failing the request, and
+open circuits are skipped without a round trip.
+
+Optional hedging (GEMINI_HEDGE=1): if the chosen model has not answered
+within its recent p90 latency, the same request is also sent to the next
+model with headroom; whichever answers first wins and the other is
+cancelled. Hedges are capped at HEDGE_MAX_RATE of calls so they cannot
+burn the quota, and wins are counted per endpoint.
+
+A composite task — a chat with tool rounds, several model round trips
+plus tool I/O — runs with run(..., composite=True) and makes each round
+trip through step(): every one is charged to the model's quota, bounded
+by CALL_TIMEOUT_SEC and recorded in the breaker and latency tracker on
+its own, so a slow tool can't open a healthy model's circuit.
+
+Agents receive the gateway's coroutine functions as their injected
+text_fn / vision_fn and simply `await` them.
+"""
+
+import asyncio
+import contextvars
+import os
+import time
+from collections import deque
+
+import httpx
+from google.genai import errors as genai_errors
+from google.genai import types as genai_types
+
+from circuit_breaker import CircuitBreaker
+from model_router import ModelRouter, QuotaExhaustedError, parse_retry_after
+
+# Ordered list of models to try. Each has independent rate limits
+# (budgets live in model_router.MODEL_QUOTAS).
+GEMINI_MODELS = [
+    "gemini-2.0-flash",        # Primary: 15 RPM, 1500 RPD
+    "gemini-2.0-flash-lite",   # Fallback 1: 30 RPM, 1500 RPD
+    "gemini-2.5-flash-lite",   # Fallback 2: 30 RPM, 1500 RPD
+]
+
+MAX_RETRIES = 2         # Number of full cascade retry rounds
+RETRY_DELAY_SEC = 5     # Max seconds to wait between retry rounds
+CALL_TIMEOUT_SEC = 60   # A single model call taking longer than this is a failure
+
+# Hedged requests (off by default)
+HEDGE_ENABLED = os.getenv("GEMINI_HEDGE", "0") == "1"
+HEDGE_PERCENTILE = float(os.getenv("GEMINI_HEDGE_PERCENTILE", "0.9"))
+HEDGE_MAX_RATE = float(os.getenv("GEMINI_HEDGE_MAX_RATE", "0.1"))   # max share of calls that may hedge
+HEDGE_DEFAULT_DELAY_SEC = 3.0   # Used until a model has enough latency samples
+HEDGE_MIN_SAMPLES = 20
+HEDGE_WINDOW = 200              # Calls considered for latency percentiles and the hedge cap
+
+# Endpoint path of the current request, set by the API middleware so
+# gateway stats can be broken down per endpoint.
+current_endpoint = contextvars.ContextVar("current_endpoint", default="internal")
+
+
+def is_rate_limit_error(err: Exception) -> bool:
+    """Check if an exception is a Gemini 429 / quota error."""
+    err_str = str(err).lower()
+    return "429" in err_str or "quota" in err_str or "resource_exhausted" in err_str
+
+
+def is_transient_error(err: Exception) -> bool:
+    """Check if an exception is a model-side failure (5xx, timeout, connection)."""
+    return isinstance(err, (genai_errors.ServerError, TimeoutError, ConnectionError, httpx.TransportError))
+
+
+def is_caller_error(err: Exception) -> bool:
+    """Check if an exception is a 4xx for our own request (bad argument, auth, ...)."""
+    return isinstance(err, genai_errors.ClientError) and not is_rate_limit_error(err)
+
+
+class ModelsUnavailableError(Exception):
+    """Raised when every model's circuit is open."""
+
+
+class LatencyTracker:
+    """Rolling window of successful call latencies per model."""
+
+    def __init__(self, window: int = HEDGE_WINDOW):
+        self.window = window
+        self.samples = {}
+
+    def record(self, model_id: str, seconds: float):
+        self.samples.setdefault(model_id, deque(maxlen=self.window)).append(seconds)
+
+    def percentile(self, model_id: str, q: float):
+        samples = self.samples.get(model_id)
+        if not samples or len(samples) < HEDGE_MIN_SAMPLES:
+            return None
+        ordered = sorted(samples)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+class GeminiGateway:
+    """
+    Async cascade over GEMINI_MODELS.
+
+    run(task) is the generic entry point: task is an async callable that
+    receives a model id and performs the actual request. generate_text and
+    generate_vision are thin wrappers used as the agents' text_fn / vision_fn.
+    """
+
+    def __init__(self, client, models: list = None, router: ModelRouter = None,
+                 max_retries: int = MAX_RETRIES, retry_delay: float = RETRY_DELAY_SEC,
+                 hedge: bool = HEDGE_ENABLED, breaker: CircuitBreaker = None):
+        self.client = client
+        self.models = list(models or GEMINI_MODELS)
+        self.router = router or ModelRouter()
+        self.breaker = breaker or CircuitBreaker()
+        self.max_retries = max_retries
+        self.retry_delay = retry_delay
+        self.hedge_enabled = hedge
+        self.latency = LatencyTracker()
+        self._hedge_window = deque(maxlen=HEDGE_WINDOW)   # True for calls that hedged
+        self._hedge_stats = {}
+
+    async def run(self, task, label: str = "CASCADE", hedge: bool = False, composite: bool = False):
+        """
+        Run `await task(model_id)` through the cascade.
+        Rate limits and transient model failures cascade to the next model;
+        other errors are raised immediately. With hedge=True (and hedging
+        enabled) a slow call is raced against the next model. With
+        composite=True the task is not timed as one call: it makes its
+        model round trips through step().
+        """
+        last_error = None
+        for attempt in range(self.max_retries + 1):
+            tried = set()
+            while True:
+                model_id = self._next_model(tried)
+                if model_id is None:
+                    break
+                tried.add(model_id)
+                try:
+                    if composite:
+                        return await task(model_id)
+                    if hedge and self.hedge_enabled:
+                        return await self._hedged(task, model_id, tried, label)
+                    return await self._timed(task, model_id)
+                except Exception as e:
+                    last_error = e
+                    if is_rate_limit_error(e):
+                        print(f"[{label}] {model_id} rate-limited. Trying next model...")
+                        self.router.record_rate_limit(model_id, parse_retry_after(e))
+                        continue
+                    if is_transient_error(e):
+                        print(f"[{label}] {model_id} failed ({type(e).__name__}). Trying next model...")
+                        continue
+                    # Caller error (bad request etc.): raise immediately
+                    raise
+
+            if not any(self.breaker.allow(m) for m in self.models):
+                raise last_error or ModelsUnavailableError("All Gemini models are unhealthy (circuit open)")
+
+            # No model has headroom left in this round
+            if attempt < self.max_retries:
+                delay = min(max(self.router.next_available_in(self.models), 0.05), self.retry_delay)
+                print(f"[{label}] All models exhausted. Waiting {delay:.1f}s before retry {attempt + 1}...")
+                await asyncio.sleep(delay)
+
+        raise last_error or QuotaExhaustedError("429: local quota exhausted for all Gemini models")
+
+    def _next_model(self, tried: set):
+        """First model with quota headroom whose circuit allows a call."""
+        blocked = {m for m in self.models if m not in tried and not self.breaker.allow(m)}
+        return self.router.acquire(self.models, exclude=tried | blocked)
+
+    async def _timed(self, task, model_id: str):
+        """
+        One model call, feeding latency and outcome to the tracker and breaker.
+        Rate limits and caller errors are no verdict on the model; any other
+        error — 5xx, timeout, or a malformed response such as an
+        AttributeError on a None response.text — is a failure.
+        """
+        self.breaker.on_start(model_id)
+        start = time.monotonic()
+        try:
+            result = await asyncio.wait_for(task(model_id), CALL_TIMEOUT_SEC)
+        except asyncio.CancelledError:
+            self.breaker.record_cancelled(model_id)
+            raise
+        except Exception as e:
+            if is_rate_limit_error(e) or is_caller_error(e):
+                self.breaker.record_cancelled(model_id)
+            else:
+                self.breaker.record_failure(model_id, e, time.monotonic() - start)
+            raise
+        elapsed = time.monotonic() - start
+        self.latency.record(model_id, elapsed)
+        self.breaker.record_success(model_id, elapsed)
+        return result
+
+    async def step(self, model_id: str, call, charge: bool = True):
+        """
+        One model round trip `await call()` inside a composite run() task.
+        run() already charged the model for the task's first round trip
+        (pass charge=False there); every later one is charged here.
+        """
+        if charge:
+            self.router.charge(model_id)
+        return await self._timed(lambda _: call(), model_id)
+
+    def _hedge_delay(self, model_id: str) -> float:
+        delay = self.latency.percentile(model_id, HEDGE_PERCENTILE)
+        return delay if delay is not None else HEDGE_DEFAULT_DELAY_SEC
+
+    def _hedge_allowed(self) -> bool:
+        hedges = sum(self._hedge_window)
+        return hedges < HEDGE_MAX_RATE * max(len(self._hedge_window), 1)
+
+    async def _hedged(self, task, model_id: str, tried: set, label: str):
+        """Race the primary against the next model if it exceeds its hedge delay."""
+        stats = self._hedge_stats.setdefault(
+            current_endpoint.get(), {"calls": 0, "hedged": 0, "hedge_wins": 0, "primary_wins": 0}
+        )
+        stats["calls"] += 1
+
+        primary = asyncio.ensure_future(self._timed(task, model_id))
+        backup = None
+        # Whatever ends this call (a winner, both failing, or the caller
+        # cancelling us mid-wait), no racer is left running unowned
+        try:
+            done, _ = await asyncio.wait({primary}, timeout=self._hedge_delay(model_id))
+            hedge_model = None
+            if not done and self._hedge_allowed():
+                hedge_model = self._next_model(tried)
+            self._hedge_window.append(hedge_model is not None)
+            if hedge_model is None:
+                return await primary
+
+            tried.add(hedge_model)
+            stats["hedged"] += 1
+            print(f"[{label}] {model_id} slow — hedging with {hedge_model}")
+            backup = asyncio.ensure_future(self._timed(task, hedge_model))
+            pending = {primary, backup}
+            primary_error = None
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for finished in done:
+                    if finished.exception() is None:
+                        stats["hedge_wins" if finished is backup else "primary_wins"] += 1
+                        return finished.result()
+                    if finished is primary:
+                        primary_error = finished.exception()
+                    elif is_rate_limit_error(finished.exception()):
+                        self.router.record_rate_limit(hedge_model, parse_retry_after(finished.exception()))
+            # Both failed: surface the primary's error to the cascade
+            raise primary_error
+        finally:
+            for racer in (primary, backup):
+                if racer is not None and not racer.done():
+                    racer.cancel()
+
+    def hedge_stats(self) -> dict:
+        """Per-endpoint hedge counts and how often the hedge won."""
+        return {
+            "enabled": self.hedge_enabled,
+            "max_rate": HEDGE_MAX_RATE,
+            "delays_sec": {m: round(self._hedge_delay(m), 3) for m in self.models},
+            "endpoints": self._hedge_stats,
+        }
+
+    def model_health(self) -> dict:
+        """Circuit state, health score and quota headroom per model."""
+        health = self.breaker.health()
+        quota = self.router.snapshot()
+        return {
+            model_id: {**health.get(model_id, {"state": "closed", "health_score": 1.0, "recent_calls": 0}),
+                       "quota": quota.get(model_id)}
+            for model_id in self.models
+        }
+
+    async def generate_text(self, prompt: str) -> str:
+        """Generate text content via the cascade."""
+        async def task(model_id):
+            response = await self.client.aio.models.generate_content(
+                model=model_id,
+                contents=prompt
+            )
+            return response.text.strip()
+
+        return await self.run(task, label="CASCADE", hedge=True)
+
+    async def generate_vision(self, prompt: str, image_bytes: bytes, mime_type: str) -> str:
+        """Generate vision content via the cascade."""
+        async def task(model_id):
+            response = await self.client.aio.models.generate_content(
+                model=model_id,
+                contents=[
+                    genai_types.Part.from_text(text=prompt),
+                    genai_types.Part.from_bytes(data=image_bytes, mime_type=mime_type)
+                ]
+            )
+            return response.text.strip()
+
+        return await self.run(task, label="VISION CASCADE", hedge=True)
@@ -1,7 +1,6 @@
 import os
 import sys
 import json
-import time
 
 # Force UTF-8 encoding for standard output and error to prevent charmap encoding issues on Windows
 import codecs
@@ -11,12 +10,14 @@ if sys.stderr.encoding.lower() != 'utf-8':
     sys.stderr = codecs.getwriter('utf-8')(sys.stderr.buffer, 'strict')
 
 import asyncio
+import time
 import uuid
-from datetime import datetime
+from datetime import datetime, timedelta
 from typing import Optional
 from dotenv import load_dotenv
 from fastapi import FastAPI, UploadFile, File, Form, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse
 from fastapi.staticfiles import StaticFiles
 from pydantic import BaseModel
 import shutil
@@ -58,83 +59,30 @@ if not GOOGLE_API_KEY:
 
 gemini_client = genai.Client(api_key=GOOGLE_API_KEY)
 
-# Ordered list of models to try. Each has independent rate limits.
-GEMINI_MODELS = [
-    "gemini-2.0-flash",        # Primary: 15 RPM, 1500 RPD
-    "gemini-2.0-flash-lite",   # Fallback 1: 30 RPM, 1500 RPD
-    "gemini-2.5-flash-lite",   # Fallback 2: 30 RPM, 1500 RPD
-]
-
-MAX_RETRIES = 2         # Number of full cascade retry rounds
-RETRY_DELAY_SEC = 5     # Seconds to wait between retry rounds
-
-
-def _is_rate_limit_error(err: Exception) -> bool:
-    """Check if an exception is a Gemini 429 / quota error."""
-    err_str = str(err).lower()
-    return "429" in err_str or "quota" in err_str or "resource_exhausted" in err_str
+# All Gemini traffic goes through the async gateway so no endpoint blocks
+# the event loop (see llm_gateway.py for the cascade itself).
+from llm_gateway import GeminiGateway, current_endpoint, is_rate_limit_error as _is_rate_limit_error
 
+gemini_gateway = GeminiGateway(gemini_client)
 
-def gemini_generate_text(prompt: str) -> str:
-    """
-    Generate text content via Gemini, cascading through models on 429 errors.
-    Retries the full cascade with a delay if all models are exhausted.
-    """
-    last_error = None
-    for attempt in range(MAX_RETRIES + 1):
-        for model_id in GEMINI_MODELS:
-            try:
-                response = gemini_client.models.generate_content(
-                    model=model_id,
-                    contents=prompt
-                )
-                return response.text.strip()
-            except Exception as e:
-                last_error = e
-                if _is_rate_limit_error(e):
-                    print(f"[CASCADE] {model_id} rate-limited. Trying next model...")
-                    continue
-                else:
-                    # Non-rate-limit error: raise immediately
-                    raise
-
-        # All models in this round were rate-limited
-        if attempt < MAX_RETRIES:
-            print(f"[CASCADE] All models exhausted. Waiting {RETRY_DELAY_SEC}s before retry {attempt + 1}...")
-            time.sleep(RETRY_DELAY_SEC)
 
-    raise last_error  # All retries exhausted
+@app.middleware("http")
+async def tag_endpoint(request, call_next):
+    """Label gateway calls with the endpoint that triggered them (hedge stats)."""
+    current_endpoint.set(request.url.path)
+    return await call_next(request)
 
+gemini_generate_text = gemini_gateway.generate_text
+gemini_generate_vision = gemini_gateway.generate_vision
 
-def gemini_generate_vision(prompt: str, image_bytes: bytes, mime_type: str) -> str:
-    """
-    Generate vision content via Gemini, cascading through models on 429 errors.
-    """
-    last_error = None
-    for attempt in range(MAX_RETRIES + 1):
-        for model_id in GEMINI_MODELS:
-            try:
-                response = gemini_client.models.generate_content(
-                    model=model_id,
-                    contents=[
-                        genai_types.Part.from_text(text=prompt),
-                        genai_types.Part.from_bytes(data=image_bytes, mime_type=mime_type)
-                    ]
-                )
-                return response.text.strip()
-            except Exception as e:
-                last_error = e
-                if _is_rate_limit_error(e):
-                    print(f"[VISION CASCADE] {model_id} rate-limited. Trying next model...")
-                    continue
-                else:
-                    raise
+# Content-addressed response cache; each call site gets its own TTL.
+from response_cache import ResponseCache
 
-        if attempt < MAX_RETRIES:
-            print(f"[VISION CASCADE] All models exhausted. Waiting {RETRY_DELAY_SEC}s before retry {attempt + 1}...")
-            time.sleep(RETRY_DELAY_SEC)
+llm_cache = ResponseCache()
 
-    raise last_error
+WEATHER_ADVISORY_TTL_SEC = 60 * 60       # Open-Meteo updates hourly
+SCHEME_RANKING_TTL_SEC = 24 * 60 * 60    # schemes.json changes with deploys only
+FARM_ADVISOR_TTL_SEC = 60 * 60
 
 
 # ============================================================
@@ -151,20 +99,33 @@ crop_doctor = CropDoctor(
 # ============================================================
 # SCHEME NAVIGATOR AGENT
 # ============================================================
-from scheme_navigator import SchemeNavigator
+from scheme_navigator import SchemeNavigator, is_ranking_reply
 
 scheme_navigator = SchemeNavigator(
-    text_fn=gemini_generate_text
+    text_fn=llm_cache.wrap(gemini_generate_text, ttl=SCHEME_RANKING_TTL_SEC, site="scheme_ranking",
+                           validate=is_ranking_reply)
 )
 
 
 # ============================================================
 # WEATHER SCOUT AGENT
 # ============================================================
+from advisory_buckets import is_advisory_template
+from forecast_store import TABLES as FORECAST_STORE_TABLES, ForecastStore, columns_to_json
 from weather_scout import WeatherScout
+from weather_service import WeatherService
+
+# Record every fetched forecast in the local per-cell history (FORECAST_STORE=0 to disable)
+FORECAST_STORE_ENABLED = os.getenv("FORECAST_STORE", "1") == "1"
+forecast_store = ForecastStore() if FORECAST_STORE_ENABLED else None
+
+# One cached Open-Meteo superset per location, shared by /weather, /farm-advisor and chat
+weather_service = WeatherService(store=forecast_store)
 
 weather_scout = WeatherScout(
-    text_fn=gemini_generate_text
+    text_fn=llm_cache.wrap(gemini_generate_text, ttl=WEATHER_ADVISORY_TTL_SEC, site="weather_advisory",
+                           validate=is_advisory_template),
+    weather_service=weather_service
 )
 
 
@@ -177,6 +138,7 @@ with open("schemes.json", "r", encoding="utf-8") as f:
 class ChatRequest(BaseModel):
     message: str
     context: Optional[str] = None
+    user_id: Optional[str] = None   # Enables server-side conversation memory
 
 class LoginRequest(BaseModel):
     phone: str
@@ -204,6 +166,8 @@ class WeatherRequest(BaseModel):
     state: str = "Rajasthan"
     lang: str = "English"
     crop_type: Optional[str] = None
+    lat: Optional[float] = None    # GPS fix / village centroid — overrides city
+    lon: Optional[float] = None
 
 
 class CommunityPostRequest(BaseModel):
@@ -241,6 +205,9 @@ class FarmAdvisorRequest(BaseModel):
     task_type: str   # e.g. "irrigation", "fertilizer", "pesticide"
     date: str        # YYYY-MM-DD
     lang: str = "English"
+    lat: Optional[float] = None
+    lon: Optional[float] = None
+    llm_phrasing: Optional[bool] = None    # None → FARM_ADVISOR_LLM_PHRASING
 
 # ============================================================
 # ENDPOINTS
@@ -309,48 +276,127 @@ async def update_profile_endpoint(request: ProfileUpdate):
         return res
     raise HTTPException(status_code=404, detail="User not found")
 
-@app.post("/chat")
-async def chat_endpoint(request: ChatRequest):
+# ============================================================
+# CHAT ORCHESTRATOR — shared by /chat and /chat/stream
+# ============================================================
+
+# Tool definitions for Gemini
+CHAT_TOOLS = [
+    {
+        "function_declarations": [
+            {
+                "name": "get_weather_update",
+                "description": "Get live weather, 7-day forecast, farming alerts and current season activity for a specific city and state in India.",
+                "parameters": {
+                    "type": "OBJECT",
+                    "properties": {
+                        "city": {"type": "STRING", "description": "The name of the city/district (e.g., 'Jodhpur')."},
+                        "state": {"type": "STRING", "description": "The name of the Indian state (e.g., 'Rajasthan')."},
+                        "lang": {"type": "STRING", "description": "The language for the response ('English' or 'Hindi').", "default": "English"},
+                        "crop_type": {"type": "STRING", "description": "Optional crop type to get specific advice for."}
+                    },
+                    "required": ["city", "state"]
+                }
+            },
+            {
+                "name": "find_government_schemes",
+                "description": "Find eligible Indian government agricultural schemes (PM-Kisan, KCC, etc.) with priority tiers, based on location and land size.",
+                "parameters": {
+                    "type": "OBJECT",
+                    "properties": {
+                        "state": {"type": "STRING", "description": "The Indian state (e.g., 'Punjab')."},
+                        "land_size": {"type": "NUMBER", "description": "The farmer's land size in acres (e.g., 5.5)."},
+                        "lang": {"type": "STRING", "description": "The language for the response ('English' or 'Hindi').", "default": "English"},
+                        "crop_context": {"type": "STRING", "description": "Optional context about current crops or health."}
+                    },
+                    "required": ["state", "land_size"]
+                }
+            }
+        ]
+    }
+]
+
+MAX_TOOL_ROUNDS = 3   # Max model turns that may request tools
+
+from tool_payloads import compact_tool_result, payload_stats
+
+# Per-user conversation memory (recent turns + compact summary)
+from chat_sessions import SessionStore
+
+chat_sessions = SessionStore(summarize_fn=gemini_generate_text)
+
+
+def _chat_history(request: ChatRequest):
+    """Session and prior turns for the requesting user (None if anonymous)."""
+    if not request.user_id:
+        return None, None
+    session = chat_sessions.get(request.user_id)
+    return session, session.history()
+
+
+# Simple scheme/weather questions are answered locally, without Gemini
+from intent_router import IntentRouter, find_entities, mentions_weather
+
+intent_router = IntentRouter(weather_fn=weather_scout.get_weather_data)
+
+# Answers to reworded repeats of earlier questions (local vector index)
+from semantic_cache import SemanticCache
+
+# Answers are only shared between questions naming the same schemes, banks, crops and places
+semantic_cache = SemanticCache(entities_fn=find_entities)
+
+
+async def _preroute(request: ChatRequest, session):
+    """Templated answer for a simple question (None → use the orchestrator)."""
+    if request.context:
+        # The farmer is asking about something on screen — needs the model
+        return None
+    start = time.monotonic()
+    try:
+        answer = await intent_router.answer(request.message)
+    except Exception as e:
+        print(f"[INTENT ROUTER] Failed, falling back: {e}")
+        return None
+    if answer is None:
+        return None
+    intent_router.record_latency("routed", time.monotonic() - start)
+    if session:
+        chat_sessions.record(session, request.message, answer)
+    return answer
+
+
+async def _cached_answer(request: ChatRequest, session, history):
+    """Answer to a near-duplicate of an earlier self-contained question, if any."""
+    # A follow-up ("what about for wheat?") only means something with its turns
+    if request.context or history or mentions_weather(request.message):
+        return None
+    try:
+        answer = await asyncio.to_thread(semantic_cache.get, request.message)
+    except Exception as e:
+        print(f"[SEMANTIC CACHE] Lookup failed, falling back: {e}")
+        return None
+    if answer is not None and session:
+        chat_sessions.record(session, request.message, answer)
+    return answer
+
+
+async def _remember_answer(request: ChatRequest, history, tools_used: set, answer: str):
     """
-    NEER Smart Orchestrator — Using Gemini Function Calling to use farming tools.
+    Cache an orchestrated answer for reworded repeats — only when it depends on
+    nothing but the question: no prior turns or on-screen context, no weather.
     """
-    context_info = f"\nRELEVANT CONTEXT (User was just looking at these items/schemes):\n{request.context}" if request.context else ""
-    
-    # Tool definitions for Gemini
-    tools = [
-        {
-            "function_declarations": [
-                {
-                    "name": "get_weather_update",
-                    "description": "Get live weather, farming alerts, and AI advisory for a specific city and state in India.",
-                    "parameters": {
-                        "type": "OBJECT",
-                        "properties": {
-                            "city": {"type": "STRING", "description": "The name of the city/district (e.g., 'Jodhpur')."},
-                            "state": {"type": "STRING", "description": "The name of the Indian state (e.g., 'Rajasthan')."},
-                            "lang": {"type": "STRING", "description": "The language for the response ('English' or 'Hindi').", "default": "English"},
-                            "crop_type": {"type": "STRING", "description": "Optional crop type to get specific advice for."}
-                        },
-                        "required": ["city", "state"]
-                    }
-                },
-                {
-                    "name": "find_government_schemes",
-                    "description": "Find and rank relevant Indian government agricultural schemes (PM-Kisan, KCC, etc.) based on location and land size.",
-                    "parameters": {
-                        "type": "OBJECT",
-                        "properties": {
-                            "state": {"type": "STRING", "description": "The Indian state (e.g., 'Punjab')."},
-                            "land_size": {"type": "NUMBER", "description": "The farmer's land size in acres (e.g., 5.5)."},
-                            "lang": {"type": "STRING", "description": "The language for the response ('English' or 'Hindi').", "default": "English"},
-                            "crop_context": {"type": "STRING", "description": "Optional context about current crops or health."}
-                        },
-                        "required": ["state", "land_size"]
-                    }
-                }
-            ]
-        }
-    ]
+    if (request.context or history or "get_weather_update" in tools_used
+            or mentions_weather(request.message)):
+        return
+    try:
+        await asyncio.to_thread(semantic_cache.set, request.message, answer)
+    except Exception as e:
+        print(f"[SEMANTIC CACHE] Store failed: {e}")
+
+
+def _chat_config(context: Optional[str]) -> genai_types.GenerateContentConfig:
+    """System instruction + tools for one orchestrated chat."""
+    context_info = f"\nRELEVANT CONTEXT (User was just looking at these items/schemes):\n{context}" if context else ""
 
     system_instruction = f"""
     You are 'NEER', a highly professional, polite, and direct agricultural consultant for Indian farmers.
@@ -365,65 +411,95 @@ async def chat_endpoint(request: ChatRequest):
     5. FOCUS: Concrete, actionable advice.
     """
 
+    return genai_types.GenerateContentConfig(
+        system_instruction=system_instruction,
+        tools=CHAT_TOOLS
+    )
+
+
+async def _execute_tool(call) -> dict:
+    """
+    Run one Gemini function call against the native agents in tool mode:
+    deterministic data only, no nested Gemini call (the chat model writes
+    the prose itself).
+    """
+    res_data = {}
+    if call.name == "get_weather_update":
+        res_data = await weather_scout.get_weather_data(**call.args)
+    elif call.name == "find_government_schemes":
+        # Adapter for land_size type and crop_context
+        args = dict(call.args)
+        if isinstance(args.get("crop_context"), str):
+            args["crop_context"] = {"summary": args["crop_context"]}
+        res_data = await scheme_navigator.find_eligible_schemes(**args)
+    return res_data
+
+
+async def _tool_response_part(call) -> genai_types.Part:
+    """Execute a function call and wrap its compacted result (or error) for Gemini."""
+    try:
+        res_data = compact_tool_result(call.name, await _execute_tool(call))
+    except Exception as e:
+        print(f"[ORCHESTRATOR] Tool {call.name} failed: {e}")
+        res_data = {"status": "error", "message": str(e)}
+    return genai_types.Part.from_function_response(
+        name=call.name,
+        response={"result": res_data}
+    )
+
+
+def _function_calls(response) -> list:
+    """All function calls requested in one model turn."""
+    if not response.candidates or not response.candidates[0].content:
+        return []
+    return [part.function_call for part in response.candidates[0].content.parts or [] if part.function_call]
+
+
+@app.post("/chat")
+async def chat_endpoint(request: ChatRequest):
+    """
+    NEER Smart Orchestrator — Using Gemini Function Calling to use farming tools.
+    """
+    session, history = _chat_history(request)
+    answer = await _preroute(request, session) or await _cached_answer(request, session, history)
+    if answer is not None:
+        return {"response": answer}
+
+    config = _chat_config(request.context)
+    start = time.monotonic()
+    tools_used = set()
+
     try:
-        # We'll use a standard chat-like flow with function calling
-        # For simplicity in this cascading setup, we'll implement a manual loop or use the SDK's higher-level features if stable
         # Here we manually handle the call to maintain our cascading model logic
-        
-        def run_orchestrated_task(model_id):
-            chat = gemini_client.chats.create(
-                model=model_id,
-                config=genai_types.GenerateContentConfig(
-                    system_instruction=system_instruction,
-                    tools=tools
-                )
-            )
+        async def run_orchestrated_task(model_id):
+            chat = gemini_client.aio.chats.create(model=model_id, config=config, history=history)
             
-            response = chat.send_message(request.message)
+            # run() charged the model for this first round trip
+            response = await gemini_gateway.step(
+                model_id, lambda: chat.send_message(request.message), charge=False
+            )
             
-            # Check for function calls
-            if response.candidates[0].content.parts:
-                for part in response.candidates[0].content.parts:
-                    if part.function_call:
-                        call = part.function_call
-                        res_data = {}
-                        
-                        if call.name == "get_weather_update":
-                            res_data = weather_scout.get_weather(**call.args)
-                        elif call.name == "find_government_schemes":
-                            # Adapter for land_size type and crop_context
-                            args = dict(call.args)
-                            if isinstance(args.get("crop_context"), str):
-                                args["crop_context"] = {"summary": args["crop_context"]}
-                            res_data = scheme_navigator.find_schemes(**args)
-                        
-                        # Send the tool result back to Gemini
-                        response = chat.send_message(
-                            genai_types.Content(
-                                parts=[genai_types.Part.from_function_response(
-                                    name=call.name,
-                                    response={"result": res_data}
-                                )]
-                            )
-                        )
+            # Execute every function call of a turn concurrently and send
+            # all results back to Gemini in a single follow-up message
+            for _ in range(MAX_TOOL_ROUNDS):
+                calls = _function_calls(response)
+                if not calls:
+                    break
+                tools_used.update(call.name for call in calls)
+                parts = await asyncio.gather(*[_tool_response_part(call) for call in calls])
+                response = await gemini_gateway.step(model_id, lambda: chat.send_message(list(parts)))
             
             return response.text.strip()
 
         # Cascade implementation for the orchestrated task
-        last_error = None
-        for attempt in range(MAX_RETRIES + 1):
-            for model_id in GEMINI_MODELS:
-                try:
-                    return {"response": run_orchestrated_task(model_id)}
-                except Exception as e:
-                    last_error = e
-                    if _is_rate_limit_error(e):
-                        print(f"[ORCHESTRATOR] {model_id} busy. Cascading...")
-                        continue
-                    raise
-            if attempt < MAX_RETRIES:
-                time.sleep(RETRY_DELAY_SEC)
-        raise last_error
+        # Tool rounds and tool I/O are not one model call: composite mode
+        # times, charges and health-checks each send_message on its own
+        answer = await gemini_gateway.run(run_orchestrated_task, label="ORCHESTRATOR", composite=True)
+        intent_router.record_latency("orchestrated", time.monotonic() - start)
+        await _remember_answer(request, history, tools_used, answer)
+        if session:
+            chat_sessions.record(session, request.message, answer)
+        return {"response": answer}
 
     except Exception as e:
         if _is_rate_limit_error(e):
@@ -431,6 +507,106 @@ async def chat_endpoint(request: ChatRequest):
         raise HTTPException(status_code=500, detail=f"Orchestration failed: {str(e)}")
 
 
+def _sse(event: str, data: dict) -> str:
+    """Format one server-sent event."""
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+@app.post("/chat/stream")
+async def chat_stream_endpoint(request: ChatRequest):
+    """
+    Streaming variant of /chat (Server-Sent Events).
+
+    Events:
+      start  — sent immediately, before any model call
+      token  — {"text": ...} as soon as Gemini streams it
+      tool   — {"name", "status": "running" | "done"} around tool execution
+      done   — {"response": full text}
+      error  — {"status": 429 | 500, "detail": ...}
+
+    The cascade picks the model when the stream is opened (first chunk);
+    once tokens have been sent the model can no longer be switched.
+    """
+    config = _chat_config(request.context)
+    session, history = _chat_history(request)
+
+    async def open_stream(chat, message):
+        stream = await chat.send_message_stream(message)
+        try:
+            first = await stream.__anext__()
+        except StopAsyncIteration:
+            first = None
+        return stream, first
+
+    async def chunks(stream, first):
+        if first is not None:
+            yield first
+        async for chunk in stream:
+            yield chunk
+
+    async def event_stream():
+        yield _sse("start", {})
+        routed = await _preroute(request, session) or await _cached_answer(request, session, history)
+        if routed is not None:
+            yield _sse("token", {"text": routed})
+            yield _sse("done", {"response": routed})
+            return
+
+        start = time.monotonic()
+        try:
+            async def start_task(model_id):
+                chat = gemini_client.aio.chats.create(model=model_id, config=config, history=history)
+                stream, first = await open_stream(chat, request.message)
+                return model_id, chat, stream, first
+
+            model_id, chat, stream, first = await gemini_gateway.run(start_task, label="STREAM")
+
+            full_text = []
+            tools_used = set()
+            for _ in range(MAX_TOOL_ROUNDS + 1):
+                calls = []
+                async for chunk in chunks(stream, first):
+                    parts = chunk.candidates[0].content.parts if chunk.candidates and chunk.candidates[0].content else None
+                    for part in parts or []:
+                        if part.function_call:
+                            calls.append(part.function_call)
+                        elif part.text:
+                            full_text.append(part.text)
+                            yield _sse("token", {"text": part.text})
+                if not calls:
+                    break
+
+                # All calls of this turn run concurrently; results go back in one message
+                tools_used.update(call.name for call in calls)
+                for call in calls:
+                    yield _sse("tool", {"name": call.name, "status": "running"})
+                tasks = [asyncio.ensure_future(_tool_response_part(call)) for call in calls]
+                for finished in asyncio.as_completed(tasks):
+                    part = await finished
+                    yield _sse("tool", {"name": part.function_response.name, "status": "done"})
+                results = [task.result() for task in tasks]
+                stream, first = await gemini_gateway.step(model_id, lambda: open_stream(chat, results))
+
+            answer = "".join(full_text).strip()
+            intent_router.record_latency("orchestrated", time.monotonic() - start)
+            await _remember_answer(request, history, tools_used, answer)
+            if session:
+                chat_sessions.record(session, request.message, answer)
+            yield _sse("done", {"response": answer})
+
+        except Exception as e:
+            if _is_rate_limit_error(e):
+                yield _sse("error", {"status": 429, "detail": "All Gemini models are temporarily busy."})
+            else:
+                yield _sse("error", {"status": 500, "detail": f"Orchestration failed: {str(e)}"})
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
 @app.post("/detect")
 async def detect_endpoint(
     image: UploadFile = File(...),
@@ -451,7 +627,7 @@ async def detect_endpoint(
             raise HTTPException(status_code=400, detail="File too large. Maximum size is 5MB.")
 
         # Run the Crop Doctor Agent pipeline
-        result = crop_doctor.diagnose(
+        result = await crop_doctor.diagnose(
             image_bytes=contents,
             mime_type=image.content_type,
             lang=lang,
@@ -507,7 +683,7 @@ async def detect_endpoint(
 async def schemes_endpoint(request: SchemeRequest):
     """Scheme Navigator Agent — smart scheme matching with color-coded tiers."""
     try:
-        result = scheme_navigator.find_schemes(
+        result = await scheme_navigator.find_schemes(
             state=request.state,
             land_size=request.land_size,
             lang=request.lang,
@@ -525,11 +701,13 @@ async def schemes_endpoint(request: SchemeRequest):
 async def weather_endpoint(request: WeatherRequest):
     """Weather Scout Agent — live weather intelligence for farmers."""
     try:
-        result = weather_scout.get_weather(
+        result = await weather_scout.get_weather(
             city=request.city,
             state=request.state,
             lang=request.lang,
-            crop_type=request.crop_type
+            crop_type=request.crop_type,
+            lat=request.lat,
+            lon=request.lon
         )
         return result
     except ValueError as ve:
@@ -575,6 +753,120 @@ async def save_user_calendar(request: dict):
 def read_root():
     return {"message": "NEER AI Backend is running."}
 
+# ============================================================
+# INTERNAL ENDPOINTS (observability)
+# ============================================================
+
+@app.get("/internal/llm-cache")
+async def llm_cache_stats():
+    """Hit rate, bytes and evictions of the LLM response cache."""
+    return llm_cache.stats()
+
+
+@app.get("/internal/hedging")
+async def hedging_stats():
+    """How often hedged Gemini requests were fired and won, per endpoint."""
+    return gemini_gateway.hedge_stats()
+
+
+@app.get("/internal/model-health")
+async def model_health():
+    """Circuit breaker state, health score and quota headroom per Gemini model."""
+    return gemini_gateway.model_health()
+
+
+@app.get("/internal/tool-payloads")
+async def tool_payload_stats():
+    """Estimated tokens per tool result sent to Gemini, before and after projection."""
+    return payload_stats()
+
+
+@app.get("/internal/chat-sessions")
+async def chat_session_stats():
+    """Live chat sessions, LRU/idle evictions and memory compactions."""
+    return chat_sessions.stats()
+
+
+@app.get("/internal/chat-routing")
+async def chat_routing_stats():
+    """Share of chat messages answered by the intent pre-router, and latency per path."""
+    return intent_router.stats()
+
+
+@app.get("/internal/semantic-cache")
+async def semantic_cache_stats():
+    """Near-duplicate answer cache: hit rate, entries per language, search time."""
+    return semantic_cache.stats()
+
+
+@app.get("/internal/forecast-cache")
+async def forecast_cache_stats():
+    """Fresh / stale hits, refreshes and last-known fallbacks of the Open-Meteo cache."""
+    return weather_service.stats()
+
+
+@app.get("/internal/http-pool")
+async def http_pool_stats():
+    """Requests, retries and in-flight calls of the pooled upstream HTTP clients."""
+    return pool_stats()
+
+
+@app.get("/internal/weather-prefetch")
+async def weather_prefetch_stats():
+    """Bulk forecast prefetch runs: cells warmed, requests made, failures."""
+    return weather_prefetcher.stats()
+
+
+@app.get("/internal/weather-rules")
+async def weather_rule_stats():
+    """Compiled weather_farming_rules currently in effect (hot-reloaded from crop_calendar.json)."""
+    from rule_engine import weather_rules
+    return weather_rules.stats()
+
+
+@app.get("/internal/advisory-buckets")
+async def advisory_bucket_stats():
+    """Today's weather advisories: distinct raw inputs vs shared feature buckets."""
+    return weather_scout.advisory_stats.stats()
+
+
+@app.get("/internal/forecast-store")
+async def forecast_store_stats():
+    """Local forecast history: cells, rows recorded, open vs sealed months, disk use."""
+    if forecast_store is None:
+        return {"enabled": False}
+    return {"enabled": True, **await asyncio.to_thread(forecast_store.stats)}
+
+
+@app.get("/internal/forecast-history")
+async def forecast_history(lat: float, lon: float, start: str, end: str,
+                           table: str = "hourly", latest_only: bool = True):
+    """Recorded forecasts for one cell with start <= valid time < end (YYYY-MM-DD[THH:MM])."""
+    if forecast_store is None:
+        raise HTTPException(status_code=404, detail="Forecast store is disabled")
+    if table not in FORECAST_STORE_TABLES:
+        raise HTTPException(status_code=400, detail=f"table must be one of {sorted(FORECAST_STORE_TABLES)}")
+    try:
+        columns = await asyncio.to_thread(forecast_store.query, lat, lon, start, end, table, latest_only)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="start/end must be ISO dates")
+    return {
+        "cell": forecast_store.cell(lat, lon),
+        "table": table,
+        "rows": len(columns["valid"]),
+        **columns_to_json(columns),
+    }
+
+
+@app.get("/internal/single-flight")
+async def single_flight_stats():
+    """How many concurrent identical upstream calls were coalesced."""
+    return {
+        "llm": llm_cache.flight.stats(),
+        "open_meteo": weather_service.forecasts.flight.stats(),
+        "open_meteo_day": weather_service.day_flight.stats(),
+    }
+
 @app.post("/upload")
 async def upload_image(image: UploadFile = File(...)):
     allowed_types = ["image/jpeg", "image/png", "image/jpg", "image/webp"]
@@ -714,7 +1006,7 @@ Each object must have:
 Return ONLY the JSON array. No markdown, no code fences, no extra text."""
     
     try:
-        raw = gemini_generate_text(prompt)
+        raw = await gemini_generate_text(prompt)
         # Strip markdown code fences if Gemini added them
         raw = raw.strip()
         if raw.startswith("```"):
@@ -742,124 +1034,99 @@ Return ONLY the JSON array. No markdown, no code fences, no extra text."""
 
 
 # ============================================================
-# FARM ADVISOR — live weather + AI time-slot recommendations
+# WEATHER PREFETCH — keeps the forecast cache warm in bulk
 # ============================================================
-import urllib.request as _ureq
-import urllib.parse as _uparse
-
-def _fetch_hourly_weather(lat: float, lon: float, date: str) -> dict:
-    """Fetch hourly weather for a specific date from Open-Meteo."""
-    params = {
-        "latitude": lat,
-        "longitude": lon,
-        "hourly": "temperature_2m,relative_humidity_2m,precipitation_probability,wind_speed_10m",
-        "daily": "temperature_2m_max,temperature_2m_min,precipitation_sum,precipitation_probability_max",
-        "timezone": "Asia/Kolkata",
-        "start_date": date,
-        "end_date": date,
-    }
-    url = f"https://api.open-meteo.com/v1/forecast?{_uparse.urlencode(params)}"
-    req = _ureq.Request(url, headers={"User-Agent": "NEER-FarmerAI/1.0"})
-    with _ureq.urlopen(req, timeout=10) as resp:
-        data = json.loads(resp.read().decode())
-    
-    hourly = data.get("hourly", {})
-    times = hourly.get("time", [])
-    temps = hourly.get("temperature_2m", [])
-    humidity = hourly.get("relative_humidity_2m", [])
-    rain_prob = hourly.get("precipitation_probability", [])
-    wind = hourly.get("wind_speed_10m", [])
-    
-    daily = data.get("daily", {})
-    
-    hours = []
-    for i, t in enumerate(times):
-        hour_str = t.split("T")[1] if "T" in t else t[-5:]
-        hours.append({
-            "hour": hour_str,
-            "temp": temps[i] if i < len(temps) else None,
-            "humidity": humidity[i] if i < len(humidity) else None,
-            "rain_prob": rain_prob[i] if i < len(rain_prob) else None,
-            "wind": wind[i] if i < len(wind) else None,
-        })
-    
-    return {
-        "hours": hours,
-        "temp_max": daily.get("temperature_2m_max", [None])[0],
-        "temp_min": daily.get("temperature_2m_min", [None])[0],
-        "rain_total": daily.get("precipitation_sum", [0])[0],
-        "rain_prob_max": daily.get("precipitation_probability_max", [0])[0],
-    }
+from http_pool import close_all as close_http_pools, pool_stats
+from weather_prefetch import ForecastPrefetcher, PREFETCH_SCOPE, ACTIVE_WINDOW_SEC
+from weather_scout import CITY_COORDS, _get_coordinates as _city_coordinates
+
+
+def _prefetch_locations() -> list:
+    """(lat, lon) of every location in PREFETCH_SCOPE."""
+    if PREFETCH_SCOPE == "all":
+        return [(c["lat"], c["lon"]) for c in CITY_COORDS.values()]
+
+    coords = weather_service.forecasts.active_keys(ACTIVE_WINDOW_SEC)
+    cutoff = (datetime.utcnow() - timedelta(seconds=ACTIVE_WINDOW_SEC)).isoformat()
+    for user in local_db.select_all("users"):
+        if user.get("state") and (user.get("last_login") or "") >= cutoff:
+            c = _city_coordinates(user.get("district"), user["state"])
+            coords.append((c["lat"], c["lon"]))
+    return coords
+
+
+weather_prefetcher = ForecastPrefetcher(
+    cache=weather_service.forecasts,
+    bulk_fetch_fn=weather_service.fetch_bulk,
+    locations_fn=_prefetch_locations,
+)
+_prefetch_task = None
+
+
+@app.on_event("startup")
+async def _start_weather_prefetch():
+    global _prefetch_task
+    if PREFETCH_SCOPE != "off":
+        _prefetch_task = asyncio.ensure_future(weather_prefetcher.run_forever())
+
+
+@app.on_event("startup")
+async def _seal_forecast_history():
+    # Months that stopped receiving fetches while the server was down
+    if forecast_store is not None:
+        await asyncio.to_thread(forecast_store.seal_due)
+
+
+@app.on_event("shutdown")
+async def _shutdown_background_work():
+    if _prefetch_task:
+        _prefetch_task.cancel()
+    await close_http_pools()
+
+
+# ============================================================
+# FARM ADVISOR — live weather + scored time-slot recommendations
+# ============================================================
+from task_windows import apply_phrasing, is_phrasing_reply, phrasing_prompt, plan_task
+
+farm_advisor_text = llm_cache.wrap(gemini_generate_text, ttl=FARM_ADVISOR_TTL_SEC, site="farm_advisor",
+                                   validate=is_phrasing_reply)
+
+# Let Gemini reword the computed schedule (default: template text, no LLM call)
+FARM_ADVISOR_LLM_PHRASING = os.getenv("FARM_ADVISOR_LLM_PHRASING", "0") == "1"
 
 
 @app.post("/farm-advisor")
 async def farm_advisor(request: FarmAdvisorRequest):
-    from weather_scout import _get_coordinates, STATE_CITY
+    from weather_scout import _resolve_location
     
-    coords = _get_coordinates("", request.state)
+    _, coords, _ = _resolve_location("", request.state, request.lat, request.lon)
     
     try:
-        weather = _fetch_hourly_weather(coords["lat"], coords["lon"], request.date)
+        weather = await weather_service.day(coords["lat"], coords["lon"], request.date)
     except Exception as e:
         raise HTTPException(status_code=503, detail=f"Weather fetch failed: {str(e)}")
     
-    # Build a concise hour table for the prompt (every 3 hours)
-    hour_table = "\n".join(
-        f"  {h['hour']}: {h['temp']}°C, Humidity {h['humidity']}%, Rain {h['rain_prob']}%, Wind {h['wind']} km/h"
-        for h in weather["hours"] if h["temp"] is not None and int(h["hour"][:2]) % 3 == 0
-    )
-    
-    lang_note = "Respond in Hindi." if request.lang == "Hindi" else "Respond in English."
-    
-    prompt = f"""You are NEER's Smart Farm Advisor. A farmer is growing {request.crop} in {request.state}, India.
-Today's date: {request.date}
-Task to advise on: {request.task_type.upper()}
-
-TODAY'S HOURLY WEATHER FORECAST:
-{hour_table}
-
-Daily Summary:
-- Max temp: {weather['temp_max']}°C, Min: {weather['temp_min']}°C
-- Total rainfall expected: {weather['rain_total']} mm
-- Max rain probability: {weather['rain_prob_max']}%
-
-{lang_note}
-
-Based on the EXACT hourly weather, give a precise schedule for today's {request.task_type} task.
-Return ONLY valid JSON (no markdown, no code fences):
-{{
-  "times_today": <integer — how many sessions today>,
-  "skip_today": <boolean — true if weather makes this task inadvisable today>,
-  "skip_reason": <string or null>,
-  "weather_summary": <one short sentence summarizing today's weather relevance>,
-  "schedule": [
-    {{
-      "time": "HH:MM AM/PM",
-      "duration_minutes": <integer>,
-      "action": <specific action description>,
-      "reason": <why this time — reference actual temp/humidity from forecast>
-    }}
-  ],
-  "pro_tip": <one extra tip for today specifically>
-}}"""
-    
-    try:
-        raw = gemini_generate_text(prompt).strip()
-        if raw.startswith("```"):
-            raw = raw.split("\n", 1)[1] if "\n" in raw else raw[3:]
-            raw = raw.rsplit("```", 1)[0].strip()
-        advice = json.loads(raw)
-        advice["weather_raw"] = {
-            "temp_max": weather["temp_max"],
-            "temp_min": weather["temp_min"],
-            "rain_total": weather["rain_total"],
-            "rain_prob_max": weather["rain_prob_max"],
-        }
-        return advice
-    except json.JSONDecodeError as e:
-        raise HTTPException(status_code=500, detail=f"AI response parse failed: {str(e)}")
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+    plan = plan_task(weather, request.task_type, request.crop, request.lang)
+    plan["source"] = "rules"
+
+    use_llm = FARM_ADVISOR_LLM_PHRASING if request.llm_phrasing is None else request.llm_phrasing
+    if use_llm:
+        # Gemini only rewords the text; times, durations and skip_today stay as computed
+        prompt = phrasing_prompt(plan, request.crop, request.state, request.task_type, request.lang)
+        try:
+            plan = apply_phrasing(plan, await farm_advisor_text(prompt, lang=request.lang))
+            plan["source"] = "rules+llm"
+        except Exception as e:
+            print(f"[FARM ADVISOR] Phrasing failed, using template text: {e}")
+
+    plan["weather_raw"] = {
+        "temp_max": weather["temp_max"],
+        "temp_min": weather["temp_min"],
+        "rain_total": weather["rain_total"],
+        "rain_prob_max": weather["rain_prob_max"],
+    }
+    return plan
 
 
 if __name__ == "__main__":
@@ -17,15 +17,15 @@ mcp = FastMCP("NEER-Agricultural-Assistant")
 GOOGLE_API_KEY = os.getenv("GOOGLE_API_KEY")
 client = genai.Client(api_key=GOOGLE_API_KEY)
 
-def gemini_text(prompt: str) -> str:
-    response = client.models.generate_content(
+async def gemini_text(prompt: str) -> str:
+    response = await client.aio.models.generate_content(
         model="gemini-2.0-flash",
         contents=prompt
     )
     return response.text.strip()
 
-def gemini_vision(prompt: str, image_bytes: bytes, mime_type: str) -> str:
-    response = client.models.generate_content(
+async def gemini_vision(prompt: str, image_bytes: bytes, mime_type: str) -> str:
+    response = await client.aio.models.generate_content(
         model="gemini-2.0-flash",
         contents=[prompt, {"mime_type": mime_type, "data": image_bytes}]
     )
@@ -47,7 +47,7 @@ async def get_farming_weather(city: str, state: str, lang: str = "English", crop
         lang: 'English' or 'Hindi'.
         crop_type: Optional crop name for specific advice.
     """
-    res = weather_agent.get_weather(city, state, lang, crop_type)
+    res = await weather_agent.get_weather(city, state, lang, crop_type)
     return json.dumps(res, indent=2, ensure_ascii=False)
 
 @mcp.tool()
@@ -62,7 +62,7 @@ async def find_govt_schemes(state: str, land_size: float, lang: str = "English",
         crop_context: Optional text about current crops or health.
     """
     ctx = {"summary": crop_context} if crop_context else None
-    res = scheme_agent.find_schemes(state, land_size, lang, ctx)
+    res = await scheme_agent.find_schemes(state, land_size, lang, ctx)
     return json.dumps(res, indent=2, ensure_ascii=False)
 
 @mcp.tool()
@@ -85,7 +85,7 @@ async def diagnose_crop_health(image_path: str, lang: str = "English", state: st
     ext = image_path.split('.')[-1].lower()
     mime = f"image/{ext}" if ext != 'jpg' else "image/jpeg"
     
-    res = crop_agent.diagnose(img_bytes, mime, lang, state)
+    res = await crop_agent.diagnose(img_bytes, mime, lang, state)
     return json.dumps(res, indent=2, ensure_ascii=False)
 
 if __name__ == "__main__":
@@ -0,0 +1,161 @@
+"""
+NEER — Quota-aware Model Router
+Routes each Gemini call straight to a model that still has headroom.
+
+Instead of discovering exhaustion by sending a request and catching a 429,
+every model keeps two local token buckets:
+  - minute bucket: capacity = RPM, refills RPM tokens per 60 s
+  - day bucket:    capacity = RPD, refills RPD tokens per 24 h
+A call is only routed to a model when both buckets hold a token and the
+model is not cooling down. When Gemini does return a 429 anyway (another
+worker, another app on the same key), the model is cooled down for the
+server-suggested retry delay, or a default derived from its RPM.
+"""
+
+import re
+import time
+
+# Free-tier budgets per model (requests per minute / per day).
+MODEL_QUOTAS = {
+    "gemini-2.0-flash":      {"rpm": 15, "rpd": 1500},
+    "gemini-2.0-flash-lite": {"rpm": 30, "rpd": 1500},
+    "gemini-2.5-flash-lite": {"rpm": 30, "rpd": 1500},
+}
+
+DEFAULT_COOLDOWN_SEC = 10   # Used when a 429 carries no retry hint
+
+_RETRY_DELAY_RE = re.compile(r"retry(?:_delay|delay| in| after)['\"]?\s*[:=]?\s*['\"]?(\d+(?:\.\d+)?)\s*s", re.IGNORECASE)
+
+
+class QuotaExhaustedError(Exception):
+    """Raised when no model has local headroom left (reported as a 429)."""
+
+
+def parse_retry_after(err: Exception):
+    """
+    Extract the server-suggested retry delay (seconds) from a Gemini error.
+    Looks at RetryInfo in the structured error details first, then falls
+    back to scanning the message. Returns None if no hint is present.
+    """
+    details = getattr(err, "details", None)
+    if isinstance(details, dict):
+        for item in details.get("error", {}).get("details", []) or []:
+            delay = item.get("retryDelay") if isinstance(item, dict) else None
+            if isinstance(delay, str) and delay.endswith("s"):
+                try:
+                    return float(delay[:-1])
+                except ValueError:
+                    pass
+
+    match = _RETRY_DELAY_RE.search(str(err))
+    if match:
+        return float(match.group(1))
+    return None
+
+
+class TokenBucket:
+    """Classic token bucket: `capacity` tokens, refilled at `rate` tokens/sec."""
+
+    def __init__(self, capacity: float, period_sec: float):
+        self.capacity = float(capacity)
+        self.rate = capacity / period_sec
+        self.tokens = float(capacity)
+        self.updated = time.monotonic()
+
+    def _refill(self, now: float):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def available(self, now: float) -> bool:
+        self._refill(now)
+        return self.tokens >= 1
+
+    def take(self, now: float):
+        self._refill(now)
+        self.tokens -= 1
+
+    def drain(self, now: float):
+        self._refill(now)
+        self.tokens = min(self.tokens, 0.0)
+
+    def wait_time(self, now: float) -> float:
+        """Seconds until one token is available."""
+        self._refill(now)
+        if self.tokens >= 1:
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+
+class ModelRouter:
+    """
+    Tracks per-model RPM/RPD budgets and cool-downs.
+
+    acquire(models) returns the first model (in cascade order) with headroom
+    and consumes one request from its budget, or None if none has any.
+    Models without a quota entry are treated as unlimited.
+    """
+
+    def __init__(self, quotas: dict = None):
+        self.quotas = dict(quotas or MODEL_QUOTAS)
+        self.minute = {}
+        self.day = {}
+        self.cooldown_until = {}
+        for model_id, quota in self.quotas.items():
+            self.minute[model_id] = TokenBucket(quota["rpm"], 60)
+            self.day[model_id] = TokenBucket(quota["rpd"], 86400)
+
+    def _wait_time(self, model_id: str, now: float) -> float:
+        wait = max(0.0, self.cooldown_until.get(model_id, 0.0) - now)
+        if model_id in self.minute:
+            wait = max(wait, self.minute[model_id].wait_time(now), self.day[model_id].wait_time(now))
+        return wait
+
+    def acquire(self, models: list, exclude=()):
+        """Pick the first model with headroom and charge it one request."""
+        now = time.monotonic()
+        for model_id in models:
+            if model_id in exclude or self._wait_time(model_id, now) > 0:
+                continue
+            if model_id in self.minute:
+                self.minute[model_id].take(now)
+                self.day[model_id].take(now)
+            return model_id
+        return None
+
+    def charge(self, model_id: str):
+        """Charge one more request to a model already chosen by acquire()."""
+        now = time.monotonic()
+        if model_id in self.minute:
+            self.minute[model_id].take(now)
+            self.day[model_id].take(now)
+
+    def next_available_in(self, models: list) -> float:
+        """Seconds until any of `models` has headroom again."""
+        now = time.monotonic()
+        return min(self._wait_time(m, now) for m in models)
+
+    def record_rate_limit(self, model_id: str, retry_after: float = None):
+        """Learn from a 429: drain the minute bucket and cool the model down."""
+        now = time.monotonic()
+        if retry_after is None:
+            quota = self.quotas.get(model_id)
+            retry_after = 60 / quota["rpm"] if quota else DEFAULT_COOLDOWN_SEC
+            retry_after = max(retry_after, DEFAULT_COOLDOWN_SEC)
+        if model_id in self.minute:
+            self.minute[model_id].drain(now)
+        self.cooldown_until[model_id] = max(self.cooldown_until.get(model_id, 0.0), now + retry_after)
+        print(f"[ROUTER] {model_id} cooling down for {retry_after:.1f}s")
+
+    def snapshot(self) -> dict:
+        """Current headroom per model (for logging / internal endpoints)."""
+        now = time.monotonic()
+        state = {}
+        for model_id in self.quotas:
+            self.minute[model_id]._refill(now)
+            self.day[model_id]._refill(now)
+            state[model_id] = {
+                "minute_tokens": round(self.minute[model_id].tokens, 2),
+                "day_tokens": round(self.day[model_id].tokens, 2),
+                "cooldown_sec": round(max(0.0, self.cooldown_until.get(model_id, 0.0) - now), 1),
+            }
+        return state
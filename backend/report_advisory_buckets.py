@@ -0,0 +1,71 @@
+"""
+Report: how many weather advisories the feature buckets share today.
+
+Fetches today's forecast for every city in crop_calendar.json (bulk
+Open-Meteo requests), builds the advisory inputs WeatherScout would use,
+and compares distinct raw prompts (exact numbers + city) with distinct
+advisory buckets — i.e. Gemini calls per day before vs after.
+
+    python report_advisory_buckets.py
+    python report_advisory_buckets.py wheat mustard     # also per crop
+"""
+
+import asyncio
+import sys
+from collections import Counter
+from datetime import datetime
+
+from advisory_buckets import AdvisoryBucketStats, advisory_features, template_values
+from http_pool import close_all
+from rule_engine import weather_facts, weather_rules
+from weather_prefetch import PREFETCH_CHUNK_SIZE
+from weather_scout import CITY_COORDS, _get_current_season
+from weather_service import WeatherService
+
+LANGS = ["English", "Hindi"]
+
+
+async def fetch_all(service: WeatherService) -> dict:
+    names = list(CITY_COORDS)
+    forecasts = {}
+    for i in range(0, len(names), PREFETCH_CHUNK_SIZE):
+        chunk = names[i:i + PREFETCH_CHUNK_SIZE]
+        coords = [(CITY_COORDS[n]["lat"], CITY_COORDS[n]["lon"]) for n in chunk]
+        forecasts.update(zip(chunk, await service.fetch_bulk(coords)))
+    return forecasts
+
+
+def report(forecasts: dict, crops: list):
+    _, season_data = _get_current_season()
+    activity = season_data["activities"].get(str(datetime.now().month), "General field maintenance")
+
+    stats = AdvisoryBucketStats()
+    bucket_sizes = Counter()
+    for city, weather in forecasts.items():
+        for lang in LANGS:
+            for crop in [None, *crops]:
+                alerts = weather_rules.evaluate(weather_facts(weather), lang, crop)
+                features = advisory_features(weather, alerts, season_data["label"], activity, lang, crop)
+                values = template_values(weather, city)
+                stats.record({"values": values, "current": weather.current, "features": features}, features)
+                bucket_sizes[repr(sorted(features.items()))] += 1
+
+    s = stats.stats()
+    print(f"\n── Advisory buckets for {len(forecasts)} cities × {len(LANGS)} languages × {1 + len(crops)} crop settings")
+    print(f"  raw prompts (exact numbers + city) : {s['raw_prompts']:6,}")
+    print(f"  distinct buckets (Gemini calls)    : {s['buckets']:6,}")
+    print(f"  calls saved                        : {s['llm_calls_saved_pct']:6.1f}%")
+    print("  largest buckets                    : " + ", ".join(str(n) for _, n in bucket_sizes.most_common(5)))
+
+
+async def main(crops: list):
+    service = WeatherService()
+    try:
+        forecasts = await fetch_all(service)
+    finally:
+        await close_all()
+    report(forecasts, crops)
+
+
+if __name__ == "__main__":
+    asyncio.run(main(sys.argv[1:]))
@@ -0,0 +1,278 @@
+"""
+NEER — LLM Response Cache
+Content-addressed cache in front of gemini_generate_text.
+
+Many prompts (weather advisories, scheme rankings, farm-advisor schedules)
+are byte-identical across farmers in the same district on the same day.
+Each call site wraps the text function with its own TTL:
+
+    text_fn = llm_cache.wrap(gemini_generate_text, ttl=3600, site="weather_advisory")
+
+A site can pass validate=fn: replies it rejects (and empty replies) are
+returned to the caller but never cached.
+
+Tiers:
+  1. Memory — OrderedDict LRU bounded by entry count and total bytes
+  2. Disk   — one JSON file per entry under cache/llm/, survives restarts.
+               Read and written off the event loop; a background sweep every
+               DISK_SWEEP_SEC (or as soon as writes pass a cap) deletes
+               expired files and trims the oldest writes to the entry / byte
+               caps
+
+Keys are sha256(language + prompt), independent of which cascade model
+produced the answer. Concurrent misses on the same key share one Gemini
+call (single-flight). stats() reports hits, misses, bytes and evictions.
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+import time
+from collections import OrderedDict
+
+from single_flight import SingleFlight
+
+CACHE_DIR = os.path.join(os.path.dirname(__file__), "cache", "llm")
+
+MAX_MEMORY_ENTRIES = 5000
+MAX_MEMORY_BYTES = 16 * 1024 * 1024   # 16 MB
+MAX_DISK_ENTRIES = 50000
+MAX_DISK_BYTES = 256 * 1024 * 1024    # 256 MB
+DISK_SWEEP_SEC = 600
+
+
+def cache_key(prompt: str, lang: str = "") -> str:
+    """Model-agnostic content hash of a prompt and its response language."""
+    return hashlib.sha256(f"{lang}\x00{prompt}".encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    """
+    Two-tier (memory LRU + disk) TTL cache for LLM text responses.
+    """
+
+    def __init__(self, cache_dir: str = CACHE_DIR,
+                 max_entries: int = MAX_MEMORY_ENTRIES, max_bytes: int = MAX_MEMORY_BYTES,
+                 max_disk_entries: int = MAX_DISK_ENTRIES, max_disk_bytes: int = MAX_DISK_BYTES):
+        self.cache_dir = cache_dir
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.max_disk_entries = max_disk_entries
+        self.max_disk_bytes = max_disk_bytes
+        self._memory = OrderedDict()   # key -> (expires_at, value, size)
+        self._bytes = 0
+        self._stats = {
+            "memory_hits": 0, "disk_hits": 0, "misses": 0,
+            "evictions": 0, "expirations": 0, "writes": 0,
+            "disk_evictions": 0, "disk_sweeps": 0,
+        }
+        self._disk = {"entries": 0, "bytes": 0}    # as of the last sweep
+        self._next_sweep = 0.0                     # first write sweeps leftovers
+        self._sweep_task = None
+        self._site_stats = {}
+        self.flight = SingleFlight("llm")
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    # ── Disk tier ──
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, key[:2], f"{key}.json")
+
+    def _disk_get(self, key: str):
+        """(entry or None, expired?) — runs in a worker thread."""
+        path = self._path(key)
+        if not os.path.exists(path):
+            return None, False
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                entry = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return None, False
+        if entry["expires_at"] <= time.time():
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            return None, True
+        return entry, False
+
+    def _disk_set(self, key: str, value: str, expires_at: float, site: str):
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump({"expires_at": expires_at, "site": site, "value": value}, f, ensure_ascii=False)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            print(f"[LLM CACHE] Disk write failed: {e}")
+
+    def _sweep_disk(self) -> dict:
+        """Delete expired entries, then the oldest writes beyond the caps."""
+        now = time.time()
+        files = []      # (mtime, size, path)
+        expired = evicted = 0
+        for root, _, names in os.walk(self.cache_dir):
+            for name in names:
+                if not name.endswith(".json"):
+                    continue
+                path = os.path.join(root, name)
+                try:
+                    stat = os.stat(path)
+                    with open(path, "r", encoding="utf-8") as f:
+                        expires_at = json.load(f)["expires_at"]
+                except (OSError, ValueError, KeyError, TypeError):
+                    expires_at = 0      # unreadable: drop it
+                if expires_at <= now:
+                    try:
+                        os.remove(path)
+                        expired += 1
+                    except OSError:
+                        pass
+                    continue
+                files.append((stat.st_mtime, stat.st_size, path))
+
+        files.sort()
+        total = sum(size for _, size, _ in files)
+        while files and (len(files) > self.max_disk_entries or total > self.max_disk_bytes):
+            _, size, path = files.pop(0)
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            total -= size
+            evicted += 1
+        return {"entries": len(files), "bytes": total, "expired": expired, "evicted": evicted}
+
+    async def _sweep(self):
+        try:
+            result = await asyncio.to_thread(self._sweep_disk)
+        except Exception as e:
+            print(f"[LLM CACHE] Disk sweep failed: {e}")
+            return
+        self._disk = {"entries": result["entries"], "bytes": result["bytes"]}
+        self._stats["expirations"] += result["expired"]
+        self._stats["disk_evictions"] += result["evicted"]
+        self._stats["disk_sweeps"] += 1
+
+    def _maybe_sweep(self):
+        now = time.monotonic()
+        over_cap = (self._disk["entries"] > self.max_disk_entries
+                    or self._disk["bytes"] > self.max_disk_bytes)
+        if (now < self._next_sweep and not over_cap) or (self._sweep_task and not self._sweep_task.done()):
+            return
+        self._next_sweep = now + DISK_SWEEP_SEC
+        self._sweep_task = asyncio.ensure_future(self._sweep())
+
+    # ── Memory tier ──
+
+    def _memory_set(self, key: str, value: str, expires_at: float):
+        size = len(key) + len(value.encode("utf-8"))
+        if key in self._memory:
+            self._bytes -= self._memory.pop(key)[2]
+        self._memory[key] = (expires_at, value, size)
+        self._bytes += size
+        while self._memory and (len(self._memory) > self.max_entries or self._bytes > self.max_bytes):
+            _, (_, _, evicted_size) = self._memory.popitem(last=False)
+            self._bytes -= evicted_size
+            self._stats["evictions"] += 1
+
+    # ── Public API ──
+
+    async def get(self, key: str):
+        """Return the cached value for key, or None on miss / expiry."""
+        entry = self._memory.get(key)
+        if entry is not None:
+            if entry[0] > time.time():
+                self._memory.move_to_end(key)
+                self._stats["memory_hits"] += 1
+                return entry[1]
+            self._bytes -= self._memory.pop(key)[2]
+            self._stats["expirations"] += 1
+
+        disk_entry, expired = await asyncio.to_thread(self._disk_get, key)
+        if expired:
+            self._stats["expirations"] += 1
+        if disk_entry is not None:
+            self._memory_set(key, disk_entry["value"], disk_entry["expires_at"])
+            self._stats["disk_hits"] += 1
+            return disk_entry["value"]
+
+        self._stats["misses"] += 1
+        return None
+
+    async def set(self, key: str, value: str, ttl: float, site: str = ""):
+        """Store value in both tiers for ttl seconds."""
+        expires_at = time.time() + ttl
+        self._memory_set(key, value, expires_at)
+        await asyncio.to_thread(self._disk_set, key, value, expires_at, site)
+        self._stats["writes"] += 1
+        # Upper bound until the next sweep recounts (overwrites count twice)
+        self._disk["entries"] += 1
+        self._disk["bytes"] += len(value.encode("utf-8"))
+        self._maybe_sweep()
+
+    def wrap(self, text_fn, ttl: float, site: str, validate=None):
+        """
+        Wrap an async text_fn(prompt) with this cache.
+        The returned coroutine function also accepts an optional lang.
+
+        Empty replies are never cached, nor any reply validate(value) rejects
+        (returns False or raises) — the value is still returned, so the
+        caller's own fallback handles it, but one bad completion can't be
+        served to every identical request for the whole TTL.
+        """
+        site_stats = self._site_stats.setdefault(
+            site, {"hits": 0, "misses": 0, "rejected": 0, "ttl_sec": ttl}
+        )
+
+        async def cached_text(prompt: str, lang: str = "") -> str:
+            key = cache_key(prompt, lang)
+            value = await self.get(key)
+            if value is not None:
+                site_stats["hits"] += 1
+                return value
+            site_stats["misses"] += 1
+            return await self.flight.do(key, self._fill, key, text_fn, prompt, ttl, site, validate)
+
+        return cached_text
+
+    async def _fill(self, key: str, text_fn, prompt: str, ttl: float, site: str, validate=None) -> str:
+        value = await text_fn(prompt)
+        if self._cacheable(value, validate):
+            await self.set(key, value, ttl, site)
+        else:
+            self._site_stats[site]["rejected"] += 1
+            print(f"[LLM CACHE] Not caching invalid {site} reply: {value[:80]!r}")
+        return value
+
+    @staticmethod
+    def _cacheable(value: str, validate) -> bool:
+        if not value or not value.strip():
+            return False
+        if validate is None:
+            return True
+        try:
+            return bool(validate(value))
+        except Exception:
+            return False
+
+    def stats(self) -> dict:
+        """Hit rate, size and eviction counters for tuning."""
+        hits = self._stats["memory_hits"] + self._stats["disk_hits"]
+        lookups = hits + self._stats["misses"]
+        return {
+            **self._stats,
+            "hits": hits,
+            "hit_rate": round(hits / lookups, 4) if lookups else 0.0,
+            "memory_entries": len(self._memory),
+            "memory_bytes": self._bytes,
+            "max_memory_bytes": self.max_bytes,
+            "disk_entries": self._disk["entries"],
+            "disk_bytes": self._disk["bytes"],
+            "max_disk_entries": self.max_disk_entries,
+            "max_disk_bytes": self.max_disk_bytes,
+            "sites": self._site_stats,
+            "single_flight": self.flight.stats(),
+        }
@@ -0,0 +1,197 @@
+"""
+NEER — Weather Rule Engine
+Compiles crop_calendar.json's weather_farming_rules into executable alerts.
+
+Each rule's `threshold` string is parsed once at load into a predicate;
+title, icon and advice are indexed per language. Adding a rule (or
+changing a threshold) is a data edit — no code change, no restart.
+
+Threshold grammar:
+    clause [AND clause ...]         clause := <fact> <op> <number>
+    op: >=  <=  >  <  ==  !=
+
+Facts (tomorrow's forecast unless noted):
+    temp_min, temp_max, rain_mm, rain_prob, wind_speed
+    humidity, temp          — current conditions
+    no_rain_days            — days with < 1 mm rain among the next 3
+    danger_alerts           — danger rules already fired (rules run in list order)
+
+Predicates combine clauses with `&`, so the same compiled rule evaluates
+one location (Python scalars) or many at once (NumPy arrays).
+
+Crop-specific thresholds: a rule may carry
+    "crop_thresholds": {"wheat": "temp_max >= 35"}
+which replaces `threshold` when the request's crop matches (case-insensitive).
+
+Hot reload: the file's mtime is checked at most every RELOAD_CHECK_SEC; a
+changed file is recompiled, and an invalid edit keeps the previous rules.
+"""
+
+import json
+import operator
+import os
+import re
+import time
+
+_CALENDAR_PATH = os.path.join(os.path.dirname(__file__), "crop_calendar.json")
+
+RELOAD_CHECK_SEC = 2.0
+
+OPS = {
+    ">=": operator.ge, "<=": operator.le, ">": operator.gt,
+    "<": operator.lt, "==": operator.eq, "!=": operator.ne,
+}
+FACTS = {
+    "temp_min", "temp_max", "rain_mm", "rain_prob", "wind_speed",
+    "humidity", "temp", "no_rain_days", "danger_alerts",
+}
+# Request language → suffix of the rule's title_/advice_ fields (default: en)
+LANG_CODES = {"English": "en", "Hindi": "hi"}
+
+_CLAUSE = re.compile(r"^\s*([a-z_]+)\s*(>=|<=|==|!=|>|<)\s*(-?\d+(?:\.\d+)?)\s*$")
+
+
+class RuleSyntaxError(ValueError):
+    pass
+
+
+def compile_threshold(text: str):
+    """'a >= 1 AND b < 2' → predicate(facts) usable on scalars or arrays."""
+    clauses = []
+    for part in re.split(r"\s+AND\s+", text.strip()):
+        match = _CLAUSE.match(part)
+        if not match:
+            raise RuleSyntaxError(f"Cannot parse clause '{part}' in '{text}'")
+        fact, op, value = match.groups()
+        if fact not in FACTS:
+            raise RuleSyntaxError(f"Unknown fact '{fact}' in '{text}'")
+        clauses.append((fact, OPS[op], float(value)))
+
+    def predicate(facts: dict):
+        result = True
+        for fact, op, value in clauses:
+            result = result & op(facts[fact], value)
+        return result
+
+    return predicate
+
+
+class CompiledRule:
+    def __init__(self, raw: dict):
+        self.condition = raw["condition"]
+        self.alert_type = raw["alert_type"]
+        self.threshold = raw["threshold"]
+        self.predicate = compile_threshold(raw["threshold"])
+        self.crop_predicates = {
+            crop.lower(): compile_threshold(threshold)
+            for crop, threshold in raw.get("crop_thresholds", {}).items()
+        }
+        # One ready-made alert per language code present in the data
+        codes = {key.split("_", 1)[1] for key in raw if key.startswith("advice_")}
+        self.alerts = {
+            code: {
+                "type": self.alert_type,
+                "icon": raw.get("icon", ""),
+                "title": raw.get(f"title_{code}") or raw.get("title_en") or self.condition,
+                "message": raw[f"advice_{code}"],
+            }
+            for code in codes
+        }
+
+    def predicate_for(self, crop: str = None):
+        if crop:
+            return self.crop_predicates.get(crop.lower(), self.predicate)
+        return self.predicate
+
+    def alert(self, lang: str) -> dict:
+        code = LANG_CODES.get(lang, "en")
+        return dict(self.alerts.get(code) or self.alerts["en"])
+
+
+def weather_facts(forecast) -> dict:
+    """Facts for one location from a WeatherService Forecast."""
+    current = forecast.current
+    daily = forecast.daily
+    # Check tomorrow's forecast if available
+    t = forecast.tomorrow_index
+    return {
+        "temp_min": float(daily["temp_min"][t]),
+        "temp_max": float(daily["temp_max"][t]),
+        "rain_mm": float(daily["rain_mm"][t]),
+        "rain_prob": float(daily["rain_prob"][t]),
+        "wind_speed": float(daily["wind_max"][t]),
+        # Null current values compare False like the NaN daily columns
+        "humidity": float("nan") if current["humidity"] is None else current["humidity"],
+        "temp": float("nan") if current["temp"] is None else current["temp"],
+        "no_rain_days": int((daily["rain_mm"][:3] < 1).sum()),
+        "danger_alerts": 0,
+    }
+
+
+class RuleEngine:
+    """Compiled weather_farming_rules with mtime-based hot reload."""
+
+    def __init__(self, path: str = _CALENDAR_PATH):
+        self.path = path
+        self._rules = []
+        self._next_check = 0.0
+        self.reloads = 0
+        self.last_error = None
+        self._mtime = os.path.getmtime(path)
+        self._load()
+
+    def _load(self):
+        with open(self.path, "r", encoding="utf-8") as f:
+            raw_rules = json.load(f)["weather_farming_rules"]
+        self._rules = [CompiledRule(r) for r in raw_rules]
+        self.reloads += 1
+
+    def rules(self) -> list:
+        """Current compiled rules, reloading the file if it changed."""
+        now = time.monotonic()
+        if now >= self._next_check:
+            self._next_check = now + RELOAD_CHECK_SEC
+            try:
+                mtime = os.path.getmtime(self.path)
+                if mtime != self._mtime:
+                    # Remember the version even if it's broken, so it's only tried once
+                    self._mtime = mtime
+                    self._load()
+                    self.last_error = None
+                    print(f"[RULES] Reloaded {len(self._rules)} weather rules")
+            except (OSError, ValueError, KeyError) as e:
+                # Keep serving the last good rules
+                self.last_error = str(e)
+                print(f"[RULES] Reload failed, keeping previous rules: {e}")
+        return self._rules
+
+    def fire(self, facts: dict, crop: str = None) -> list:
+        """
+        [(rule, result)] in rule order. result is a bool for scalar facts or
+        a boolean array for array facts.
+        """
+        facts = dict(facts)
+        fired = []
+        for rule in self.rules():
+            result = rule.predicate_for(crop)(facts)
+            fired.append((rule, result))
+            if rule.alert_type == "danger":
+                facts["danger_alerts"] = facts["danger_alerts"] + result
+        return fired
+
+    def evaluate(self, facts: dict, lang: str = "English", crop: str = None) -> list:
+        """Alert dicts for one location."""
+        return [rule.alert(lang) for rule, result in self.fire(facts, crop) if result]
+
+    def stats(self) -> dict:
+        return {
+            "rules": [
+                {"condition": r.condition, "threshold": r.threshold, "crops": sorted(r.crop_predicates)}
+                for r in self._rules
+            ],
+            "reloads": self.reloads,
+            "last_error": self.last_error,
+        }
+
+
+weather_rules = RuleEngine()
@@ -9,6 +9,10 @@ Pipeline:
     → Rank by relevance, assign color tiers
     → If crop health context exists, prioritize disease/insurance schemes
 
+Tool mode (find_eligible_schemes) runs Step 1 plus the rule-based
+pre-tiers only, for callers such as the chat orchestrator that phrase
+the answer themselves.
+
 Tier System:
   🔴 critical  — Immediate relief (crop insurance when disease severe)
   🟡 recommended — High-benefit match for farmer's situation
@@ -27,6 +31,22 @@ with open(_SCHEMES_PATH, "r", encoding="utf-8") as f:
     SCHEMES_DB = json.load(f)
 
 
+def parse_json_reply(raw: str):
+    """JSON object from an AI reply, with or without a ```json fence."""
+    text = raw.strip()
+    if "```json" in text:
+        text = text.split("```json")[1].split("```")[0].strip()
+    elif "```" in text:
+        text = text.split("```")[1].split("```")[0].strip()
+    return json.loads(text)
+
+
+def is_ranking_reply(raw: str) -> bool:
+    """True if raw is a ranking the navigator can use (the response cache's validator)."""
+    ranking = parse_json_reply(raw)
+    return isinstance(ranking, dict) and isinstance(ranking.get("ranked_schemes"), list)
+
+
 def _parse_land_limit(text):
     """Try to extract numeric acre limit from text, or return None."""
     if text is None:
@@ -39,14 +59,14 @@ class SchemeNavigator:
     Multi-step agent for government scheme matching.
 
     Uses text_fn injected at init:
-      - text_fn(prompt) -> str
+      - async text_fn(prompt) -> str
     """
 
     def __init__(self, text_fn):
         self.text = text_fn
 
-    def find_schemes(self, state: str, land_size: float, lang: str = "English",
-                     crop_context: dict = None) -> dict:
+    async def find_schemes(self, state: str, land_size: float, lang: str = "English",
+                           crop_context: dict = None) -> dict:
         """
         Run the full scheme matching pipeline.
         
@@ -136,7 +156,7 @@ You MUST respond ONLY with valid JSON (no markdown):
 }}"""
 
         try:
-            raw = self.text(ranking_prompt)
+            raw = await self.text(ranking_prompt)
             ranking = self._parse_json(raw)
         except Exception as e:
             print(f"[SCHEME NAV] AI ranking failed: {e}, using pre-tier fallback")
@@ -154,6 +174,26 @@ You MUST respond ONLY with valid JSON (no markdown):
             "schemes": result_schemes
         }
 
+    async def find_eligible_schemes(self, state: str, land_size: float, lang: str = "English",
+                                    crop_context: dict = None) -> dict:
+        """
+        Tool mode: eligibility filter + rule-based pre-tiers, no Gemini call.
+        Same response shape as find_schemes.
+        """
+        print(f"[SCHEME NAV] Tool mode: filtering schemes for {state}, {land_size} acres...")
+        eligible = self._filter_eligible(state, land_size)
+        pre_tiered = self._pre_assign_tiers(eligible, crop_context)
+        ranking = self._fallback_ranking(pre_tiered, lang)
+        result_schemes = self._merge_results(pre_tiered, ranking)
+
+        return {
+            "status": "success",
+            "agent_steps": ["eligibility_filter", "pre_tiers"],
+            "total_schemes": len(result_schemes),
+            "summary": ranking["summary"] if result_schemes else "No matching schemes found for your state and land size.",
+            "schemes": result_schemes
+        }
+
     def _filter_eligible(self, state: str, land_size: float) -> list:
         """Filter schemes by state and land size."""
         eligible = []
@@ -271,13 +311,8 @@ You MUST respond ONLY with valid JSON (no markdown):
 
     def _parse_json(self, raw: str) -> dict:
         """Parse JSON from AI response."""
-        text = raw.strip()
-        if "```json" in text:
-            text = text.split("```json")[1].split("```")[0].strip()
-        elif "```" in text:
-            text = text.split("```")[1].split("```")[0].strip()
         try:
-            return json.loads(text)
-        except json.JSONDecodeError as e:
+            return parse_json_reply(raw)
+        except ValueError as e:
             print(f"[SCHEME NAV] JSON parse error: {e}")
             raise ValueError(f"AI returned invalid JSON: {e}")
@@ -0,0 +1,270 @@
+"""
+NEER — Semantic Answer Cache
+Near-duplicate question cache for /chat, CPU-only, no network model.
+
+Farmers ask the same thing many ways ("PM kisan kitna paisa", "how much
+money PM-KISAN gives"). Each question is normalized and embedded as a
+hashed character n-gram TF-IDF vector; the vectors of all cached questions
+live in one float32 NumPy matrix per language, so a lookup is a single
+matrix-vector product. An answer is reused when cosine similarity ≥
+SIMILARITY_THRESHOLD and both questions name the same numbers and entities
+("2 acre" vs "5 acre", or "... at SBI" vs "... at PNB", never match —
+similarity alone can't tell one name swapped in a long question). Entities
+come from an injected entities_fn (intent_router.find_entities: schemes,
+banks, crops, states, cities).
+
+  - Features are hashed into DIM buckets with a sign hash, so memory is
+    fixed per entry (DIM × 4 bytes) however large the vocabulary grows.
+  - IDF is tracked per bucket and applied when a vector is built; stored
+    rows keep the IDF of the moment they were inserted.
+  - Each language index is a ring buffer of MAX_ENTRIES rows; when full the
+    oldest entry is overwritten. Rows also expire after their TTL.
+  - Lookups run in a worker thread; each index has a lock so a search
+    never sees the matrix halfway through a write or a resize.
+
+Callers decide what is cacheable — time-sensitive answers (weather) and
+context-dependent turns must never be stored.
+"""
+
+import os
+import re
+import threading
+import time
+import zlib
+
+import numpy as np
+
+DIM = int(os.getenv("SEMANTIC_CACHE_DIM", "512"))
+MAX_ENTRIES = int(os.getenv("SEMANTIC_CACHE_MAX_ENTRIES", "100000"))
+SIMILARITY_THRESHOLD = float(os.getenv("SEMANTIC_CACHE_THRESHOLD", "0.9"))
+DEFAULT_TTL_SEC = 24 * 3600
+NGRAM_SIZES = (2, 3, 4)
+INITIAL_ROWS = 1024     # Matrix grows by doubling up to MAX_ENTRIES
+SCAN_CHUNK = 32768      # Rows scored per matmul, bounds temporary memory
+
+_DEVANAGARI = re.compile(r"[ऀ-ॿ]")
+# Filler that changes wording but not the question
+_FILLER = {
+    "please", "pls", "plz", "tell", "me", "about", "the", "a", "an", "of", "for", "ji", "sir", "bhai",
+    "batao", "bataiye", "bataye", "hai", "h", "ka", "ki", "ke", "ko", "kya", "what", "is", "does",
+    "do", "can", "you", "i", "to", "in", "under", "which", "scheme", "yojana",
+    "get", "gets", "give", "gives", "milta", "milti", "milega", "milte", "mein",
+    "कृपया", "बताओ", "बताइए", "है", "का", "की", "के", "को", "क्या", "योजना", "मिलता", "मिलेगा", "में",
+}
+_SYNONYMS = {
+    "paisa": "money", "paise": "money", "rupees": "money", "rs": "money", "amount": "money",
+    "kitna": "how much", "kitne": "how much", "kaise": "how", "avedan": "apply",
+    "aavedan": "apply", "labh": "benefit", "fayda": "benefit", "benefits": "benefit",
+}
+
+
+def detect_lang(text: str) -> str:
+    """Script-level language tag — cached answers are only reused within one."""
+    return "hi" if _DEVANAGARI.search(text) else "en"
+
+
+def normalize_question(text: str) -> str:
+    text = text.lower().replace("-", " ").replace("_", " ")
+    words = re.findall(r"\w+", text, re.UNICODE)
+    words = [_SYNONYMS.get(w, w) for w in words if w not in _FILLER]
+    return " ".join(words)
+
+
+def _numbers(text: str) -> frozenset:
+    return frozenset(re.findall(r"\d+(?:\.\d+)?", text))
+
+
+def _features(norm: str) -> dict:
+    """Hashed, signed char n-gram counts: bucket → signed count."""
+    feats = {}
+    for word in norm.split():
+        padded = f" {word} "
+        for n in NGRAM_SIZES:
+            for i in range(max(1, len(padded) - n + 1)):
+                h = zlib.crc32(padded[i:i + n].encode("utf-8"))
+                bucket = h % DIM
+                sign = 1.0 if (h >> 31) & 1 else -1.0
+                feats[bucket] = feats.get(bucket, 0.0) + sign
+    return feats
+
+
+class _LanguageIndex:
+    """Ring buffer of unit vectors + answers for one language."""
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self.vectors = np.zeros((min(INITIAL_ROWS, max_entries), DIM), dtype=np.float32)
+        self.expires = np.zeros(len(self.vectors), dtype=np.float64)
+        self.answers = [None] * len(self.vectors)
+        self.questions = [None] * len(self.vectors)   # Normalized text per row
+        # Numbers + entities that must match, interned as ids so a search can
+        # mask rows with a different guard before the argmax (-1 = empty row)
+        self.guard_ids = np.full(len(self.vectors), -1, dtype=np.int64)
+        self._guard_id = {}                          # guard → id
+        self._guard_uses = {}                        # id → (guard, rows using it)
+        self._next_guard_id = 0
+        self.exact = {}                              # Normalized text → row
+        self.df = np.zeros(DIM, dtype=np.float64)    # Per-bucket document frequency
+        self.docs = 0
+        self.size = 0
+        self.next_row = 0
+        self.lock = threading.Lock()
+
+    def vectorize(self, feats: dict) -> np.ndarray:
+        vec = np.zeros(DIM, dtype=np.float32)
+        if not feats:
+            return vec
+        buckets = np.fromiter(feats.keys(), dtype=np.int64, count=len(feats))
+        counts = np.fromiter(feats.values(), dtype=np.float64, count=len(feats))
+        tf = np.sign(counts) * (1.0 + np.log(np.maximum(np.abs(counts), 1.0)))
+        idf = np.log((1.0 + self.docs) / (1.0 + self.df[buckets])) + 1.0
+        vec[buckets] = tf * idf
+        norm = np.linalg.norm(vec)
+        return vec / norm if norm else vec
+
+    def _grow(self):
+        rows = min(len(self.vectors) * 2, self.max_entries)
+        extra = rows - len(self.vectors)
+        self.vectors = np.vstack([self.vectors, np.zeros((extra, DIM), dtype=np.float32)])
+        self.expires = np.concatenate([self.expires, np.zeros(extra)])
+        self.answers.extend([None] * extra)
+        self.questions.extend([None] * extra)
+        self.guard_ids = np.concatenate([self.guard_ids, np.full(extra, -1, dtype=np.int64)])
+
+    def _set_guard(self, row: int, guard: frozenset):
+        old = int(self.guard_ids[row])
+        if old >= 0:
+            old_guard, uses = self._guard_uses[old]
+            if uses == 1:
+                del self._guard_uses[old], self._guard_id[old_guard]
+            else:
+                self._guard_uses[old] = (old_guard, uses - 1)
+        gid = self._guard_id.get(guard)
+        if gid is None:
+            gid = self._guard_id[guard] = self._next_guard_id
+            self._next_guard_id += 1
+        self._guard_uses[gid] = (guard, self._guard_uses.get(gid, (guard, 0))[1] + 1)
+        self.guard_ids[row] = gid
+
+    def add(self, norm: str, guard: frozenset, answer: str, ttl: float):
+        with self.lock:
+            self._add(norm, guard, answer, ttl)
+
+    def _add(self, norm: str, guard: frozenset, answer: str, ttl: float):
+        feats = _features(norm)
+        self.df[list(feats.keys())] += 1
+        self.docs += 1
+
+        row = self.exact.get(norm)
+        if row is None:
+            if self.next_row == len(self.vectors) and len(self.vectors) < self.max_entries:
+                self._grow()
+            row = self.next_row % self.max_entries
+            self.next_row = row + 1
+            old = self.questions[row]
+            if old is not None and self.exact.get(old) == row:
+                del self.exact[old]
+            self.size = min(self.size + 1, self.max_entries)
+
+        self.vectors[row] = self.vectorize(feats)
+        self.expires[row] = time.time() + ttl
+        self.answers[row] = answer
+        self.questions[row] = norm
+        self._set_guard(row, guard)
+        self.exact[norm] = row
+
+    def search(self, norm: str, guard: frozenset):
+        """(answer, similarity) of the best live match, or (None, best score)."""
+        with self.lock:
+            return self._search(norm, guard)
+
+    def _search(self, norm: str, guard: frozenset):
+        now = time.time()
+        gid = self._guard_id.get(guard)
+        if gid is None:
+            # No stored question names these entities / numbers
+            return None, 0.0
+        row = self.exact.get(norm)
+        if row is not None and self.expires[row] > now and self.guard_ids[row] == gid:
+            return self.answers[row], 1.0
+
+        q = self.vectorize(_features(norm))
+        used = len(self.vectors) if self.size == self.max_entries else self.next_row
+        best_row, best_score = -1, 0.0
+        for start in range(0, used, SCAN_CHUNK):
+            scores = self.vectors[start:start + SCAN_CHUNK][:used - start] @ q
+            end = start + len(scores)
+            scores[(self.expires[start:end] <= now) | (self.guard_ids[start:end] != gid)] = -1.0
+            i = int(np.argmax(scores)) if len(scores) else -1
+            if i >= 0 and scores[i] > best_score:
+                best_row, best_score = start + i, float(scores[i])
+
+        if best_row >= 0 and best_score >= SIMILARITY_THRESHOLD:
+            return self.answers[best_row], best_score
+        return None, best_score
+
+
+class SemanticCache:
+    """
+    Per-language near-duplicate answer cache.
+
+    Optional entities_fn injected at init:
+      - entities_fn(question) -> frozenset of named things the answer depends on
+    """
+
+    def __init__(self, max_entries: int = MAX_ENTRIES, ttl: float = DEFAULT_TTL_SEC, entities_fn=None):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.entities = entities_fn
+        self.indexes = {}
+        self._indexes_lock = threading.Lock()
+        self._stats = {"hits": 0, "exact_hits": 0, "misses": 0, "writes": 0}
+        self._search_ms = 0.0
+
+    def _index(self, lang: str) -> _LanguageIndex:
+        with self._indexes_lock:
+            if lang not in self.indexes:
+                self.indexes[lang] = _LanguageIndex(self.max_entries)
+            return self.indexes[lang]
+
+    def _guard(self, question: str) -> frozenset:
+        guard = _numbers(question)
+        if self.entities:
+            guard |= self.entities(question)
+        return guard
+
+    def get(self, question: str):
+        """Cached answer for a question close enough to one seen before, else None."""
+        norm = normalize_question(question)
+        if not norm:
+            return None
+        start = time.perf_counter()
+        answer, score = self._index(detect_lang(question)).search(norm, self._guard(question))
+        self._search_ms += (time.perf_counter() - start) * 1000
+
+        if answer is None:
+            self._stats["misses"] += 1
+            return None
+        self._stats["hits"] += 1
+        if score == 1.0:
+            self._stats["exact_hits"] += 1
+        print(f"[SEMANTIC CACHE] Hit (similarity {score:.2f})")
+        return answer
+
+    def set(self, question: str, answer: str, ttl: float = None):
+        norm = normalize_question(question)
+        if not norm or not answer:
+            return
+        self._index(detect_lang(question)).add(norm, self._guard(question), answer, ttl or self.ttl)
+        self._stats["writes"] += 1
+
+    def stats(self) -> dict:
+        lookups = self._stats["hits"] + self._stats["misses"]
+        return {
+            **self._stats,
+            "hit_rate": round(self._stats["hits"] / lookups, 4) if lookups else 0.0,
+            "avg_search_ms": round(self._search_ms / lookups, 3) if lookups else 0.0,
+            "threshold": SIMILARITY_THRESHOLD,
+            "entries": {lang: idx.size for lang, idx in self.indexes.items()},
+            "matrix_bytes": sum(idx.vectors.nbytes for idx in self.indexes.values()),
+        }
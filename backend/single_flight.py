@@ -0,0 +1,53 @@
+"""
+NEER — Single-flight request coalescing
+Concurrent identical requests share one outstanding upstream call.
+
+When a weather alert goes out, hundreds of farmers in the same city hit
+/weather within seconds. Instead of each request triggering its own
+Open-Meteo fetch and Gemini advisory call, the first caller for a key
+starts the upstream call and every concurrent caller with the same key
+awaits that same result (or exception).
+
+The upstream call runs as its own task, so a caller that disconnects
+(cancelled request) does not cancel the work the others are waiting on.
+"""
+
+import asyncio
+
+
+class SingleFlight:
+    """Deduplicate concurrent async calls by key."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self._inflight = {}
+        self.calls = 0       # upstream calls actually made
+        self.shared = 0      # callers served by someone else's call
+
+    async def do(self, key, fn, *args, **kwargs):
+        """Return `await fn(*args, **kwargs)`, sharing it with concurrent callers of the same key."""
+        task = self._inflight.get(key)
+        if task is not None:
+            self.shared += 1
+            return await asyncio.shield(task)
+
+        self.calls += 1
+        task = asyncio.ensure_future(fn(*args, **kwargs))
+        self._inflight[key] = task
+        task.add_done_callback(lambda t: self._finish(key, t))
+        return await asyncio.shield(task)
+
+    def _finish(self, key, task):
+        self._inflight.pop(key, None)
+        # Mark the exception as retrieved even if every caller went away
+        if not task.cancelled():
+            task.exception()
+
+    def stats(self) -> dict:
+        total = self.calls + self.shared
+        return {
+            "upstream_calls": self.calls,
+            "shared": self.shared,
+            "in_flight": len(self._inflight),
+            "coalesce_rate": round(self.shared / total, 4) if total else 0.0,
+        }
@@ -0,0 +1,98 @@
+"""
+NEER — Spatial Index
+Nearest known location for an arbitrary lat/lon, in O(log n).
+
+Points are stored as 3D unit vectors, so straight-line (chord) distance
+orders points exactly like great-circle distance — no special cases at
+the poles or the antimeridian. A static KD-tree over those vectors
+(median splits on the widest axis, LEAF_SIZE points per leaf) answers a
+nearest-neighbour query by visiting a handful of leaves; building it is
+O(n log n) NumPy work, so a gazetteer of hundreds of thousands of villages
+loads in about a second.
+
+    index = SpatialIndex(names, lats, lons)
+    name, lat, lon, km = index.nearest(26.3, 73.0)
+"""
+
+import math
+
+import numpy as np
+
+EARTH_RADIUS_KM = 6371.0
+LEAF_SIZE = 16
+
+
+def _to_xyz(lats, lons) -> np.ndarray:
+    lat = np.radians(np.asarray(lats, dtype=float))
+    lon = np.radians(np.asarray(lons, dtype=float))
+    return np.stack([np.cos(lat) * np.cos(lon), np.cos(lat) * np.sin(lon), np.sin(lat)], axis=-1)
+
+
+def chord_to_km(chord_sq: float) -> float:
+    """Squared chord length on the unit sphere → great-circle distance in km."""
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(chord_sq) / 2))
+
+
+class SpatialIndex:
+    """Static KD-tree over named (lat, lon) points."""
+
+    def __init__(self, names: list, lats, lons):
+        self.names = list(names)
+        self.lats = np.asarray(lats, dtype=float)
+        self.lons = np.asarray(lons, dtype=float)
+        self.xyz = _to_xyz(self.lats, self.lons)
+        self.order = np.arange(len(self.names))
+        # Node: (start, end, axis, split, left, right); leaves have axis -1
+        self.nodes = []
+        if self.names:
+            self._build(0, len(self.names))
+
+    def _build(self, start: int, end: int) -> int:
+        node_id = len(self.nodes)
+        self.nodes.append(None)
+        if end - start <= LEAF_SIZE:
+            self.nodes[node_id] = (start, end, -1, 0.0, -1, -1)
+            return node_id
+
+        idx = self.order[start:end]
+        points = self.xyz[idx]
+        axis = int(np.argmax(points.max(axis=0) - points.min(axis=0)))
+        mid = (end - start) // 2
+        part = np.argpartition(points[:, axis], mid)
+        self.order[start:end] = idx[part]
+        split = float(self.xyz[self.order[start + mid], axis])
+
+        left = self._build(start, start + mid)
+        right = self._build(start + mid, end)
+        self.nodes[node_id] = (start, end, axis, split, left, right)
+        return node_id
+
+    def nearest(self, lat: float, lon: float):
+        """(name, lat, lon, distance_km) of the closest indexed point, or None if empty."""
+        if not self.nodes:
+            return None
+        q = _to_xyz(lat, lon)
+        best_sq, best_i = math.inf, -1
+        stack = [(0, 0.0)]     # (node, lower bound on squared distance)
+        while stack:
+            node_id, bound = stack.pop()
+            if bound >= best_sq:
+                continue
+            start, end, axis, split, left, right = self.nodes[node_id]
+            if axis < 0:
+                idx = self.order[start:end]
+                d = ((self.xyz[idx] - q) ** 2).sum(axis=1)
+                i = int(np.argmin(d))
+                if d[i] < best_sq:
+                    best_sq, best_i = float(d[i]), int(idx[i])
+                continue
+            diff = q[axis] - split
+            near, far = (left, right) if diff < 0 else (right, left)
+            # Visit the near side first (pushed last)
+            stack.append((far, diff * diff))
+            stack.append((near, bound))
+
+        return self.names[best_i], float(self.lats[best_i]), float(self.lons[best_i]), chord_to_km(best_sq)
+
+    def __len__(self):
+        return len(self.names)
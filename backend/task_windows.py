@@ -0,0 +1,333 @@
+"""
+NEER — Farm Task Windows
+Deterministic time-slot planner for /farm-advisor.
+
+Every hour of the day is scored for the requested task from the hourly
+forecast (rain probability, wind, humidity, temperature):
+
+  1. Hard limits per task (TASK_PROFILES) — e.g. pesticide needs rain
+     probability ≤ 20% for the spray hour AND the next 4 hours
+     (rain-fastness), wind ≤ 15 km/h (drift), 40–85% humidity.
+     An hour that breaks any limit scores 0.
+  2. Soft score in (0, 1] for the rest — lower rain chance, lower wind,
+     temperature nearer the middle of the task's range, and a bonus for
+     the task's preferred part of the day (cool mornings/evenings for
+     irrigation and spraying).
+
+Runs of usable hours become windows, and every start hour inside a run
+whose duration fits is a candidate slot. The best `sessions` slots at
+least min_gap hours apart become the schedule — two slots may come from
+one long run (a very hot day's second irrigation). No usable hour → skip_today, with the
+limit that ruled the day out as the reason. Irrigation is also skipped
+when the day's rain total makes it unnecessary.
+
+plan_task() returns the /farm-advisor JSON shape with template text in
+English/Hindi; phrasing_prompt()/apply_phrasing() optionally let Gemini
+reword the text fields without touching times, durations or skip_today.
+"""
+
+import json
+import math
+
+import numpy as np
+
+SCORE_THRESHOLD = 0.0      # any hour that passes the hard limits is usable
+PREFERRED_BONUS = 1.0
+OFF_PEAK_FACTOR = 0.75
+IRRIGATION_SKIP_RAIN_MM = 10
+HOT_DAY_C = 35              # longer irrigation
+VERY_HOT_DAY_C = 38         # second irrigation session
+
+TASK_PROFILES = {
+    "irrigation":  {"hours": (5, 19), "preferred": [(5, 9), (16, 19)], "max_rain_prob": 60, "lookahead": 0,
+                    "max_wind": 20, "temp": (5, 38), "humidity": None, "duration": 60, "sessions": 1, "min_gap": 6},
+    "fertilizer":  {"hours": (6, 18), "preferred": [(6, 10), (16, 18)], "max_rain_prob": 40, "lookahead": 6,
+                    "max_wind": 15, "temp": (10, 32), "humidity": None, "duration": 45, "sessions": 1, "min_gap": 6},
+    "pesticide":   {"hours": (6, 18), "preferred": [(6, 10), (16, 18)], "max_rain_prob": 20, "lookahead": 4,
+                    "max_wind": 15, "temp": (10, 30), "humidity": (40, 85), "duration": 60, "sessions": 1, "min_gap": 6},
+    "sowing":      {"hours": (6, 18), "preferred": [(6, 11)], "max_rain_prob": 50, "lookahead": 0,
+                    "max_wind": 25, "temp": (8, 36), "humidity": None, "duration": 180, "sessions": 1, "min_gap": 6},
+    "harvesting":  {"hours": (8, 18), "preferred": [(10, 16)], "max_rain_prob": 30, "lookahead": 2,
+                    "max_wind": 25, "temp": (5, 40), "humidity": (0, 80), "duration": 180, "sessions": 1, "min_gap": 6},
+    "preparation": {"hours": (6, 18), "preferred": [(6, 11), (15, 18)], "max_rain_prob": 50, "lookahead": 0,
+                    "max_wind": 30, "temp": (5, 38), "humidity": None, "duration": 120, "sessions": 1, "min_gap": 6},
+    "other":       {"hours": (6, 18), "preferred": [(6, 11), (15, 18)], "max_rain_prob": 60, "lookahead": 0,
+                    "max_wind": 30, "temp": (5, 40), "humidity": None, "duration": 60, "sessions": 1, "min_gap": 6},
+}
+
+# ============================================================
+# TEXT TEMPLATES (English / Hindi)
+# ============================================================
+
+ACTIONS = {
+    "irrigation": {"English": "Irrigate {crop}", "Hindi": "{crop} की सिंचाई करें"},
+    "fertilizer": {"English": "Apply fertilizer to {crop}", "Hindi": "{crop} में खाद डालें"},
+    "pesticide": {"English": "Spray pesticide on {crop}", "Hindi": "{crop} पर कीटनाशक का छिड़काव करें"},
+    "sowing": {"English": "Sow {crop}", "Hindi": "{crop} की बुवाई करें"},
+    "harvesting": {"English": "Harvest {crop}", "Hindi": "{crop} की कटाई करें"},
+    "preparation": {"English": "Prepare the field for {crop}", "Hindi": "{crop} के लिए खेत तैयार करें"},
+    "other": {"English": "Field work for {crop}", "Hindi": "{crop} के लिए खेत का काम"},
+}
+PRO_TIPS = {
+    "irrigation": {"English": "Water at the root zone; evening or early-morning watering loses the least to evaporation.",
+                   "Hindi": "जड़ों के पास पानी दें; सुबह जल्दी या शाम की सिंचाई में वाष्पीकरण से सबसे कम नुकसान होता है।"},
+    "fertilizer": {"English": "Apply on moist soil and avoid the hours before rain so nutrients are not washed away.",
+                   "Hindi": "नम मिट्टी में खाद डालें और बारिश से पहले न डालें ताकि पोषक तत्व बह न जाएं।"},
+    "pesticide": {"English": "Spray with the wind at your back and wear a mask and gloves.",
+                  "Hindi": "हवा की दिशा में पीठ करके छिड़काव करें और मास्क व दस्ताने पहनें।"},
+    "sowing": {"English": "Check that the soil has enough moisture before sowing.",
+               "Hindi": "बुवाई से पहले जांच लें कि मिट्टी में पर्याप्त नमी है।"},
+    "harvesting": {"English": "Dry the harvested produce fully before storage.",
+                   "Hindi": "भंडारण से पहले कटी फसल को अच्छी तरह सुखा लें।"},
+    "preparation": {"English": "Work the soil when it is moist but not sticky.",
+                    "Hindi": "मिट्टी नम हो पर चिपचिपी न हो, तब जुताई करें।"},
+    "other": {"English": "Plan field work for the cooler part of the day.",
+              "Hindi": "खेत का काम दिन के ठंडे समय में करें।"},
+}
+SLOT_REASON = {
+    "English": "{temp}°C, humidity {humidity}%, rain chance {rain_prob}%, wind {wind} km/h{why}",
+    "Hindi": "{temp}°C, नमी {humidity}%, बारिश की संभावना {rain_prob}%, हवा {wind} km/h{why}",
+}
+PREFERRED_WHY = {"English": " — best time of day for this task", "Hindi": " — इस काम के लिए दिन का सबसे अच्छा समय"}
+SKIP_REASONS = {
+    "rain": {"English": "Rain chance reaches {value}% during the usable hours (limit {limit}%).",
+             "Hindi": "काम के समय बारिश की संभावना {value}% तक है (सीमा {limit}%)।"},
+    "wind": {"English": "Wind reaches {value} km/h (limit {limit} km/h).",
+             "Hindi": "हवा {value} km/h तक है (सीमा {limit} km/h)।"},
+    "temp": {"English": "Temperature is outside the safe range for this task ({value}°C).",
+             "Hindi": "तापमान इस काम के लिए उपयुक्त नहीं है ({value}°C)।"},
+    "humidity": {"English": "Humidity is outside the suitable range ({value}%).",
+                 "Hindi": "नमी उपयुक्त सीमा से बाहर है ({value}%)।"},
+    "data": {"English": "No hourly forecast available for this day.",
+             "Hindi": "इस दिन का घंटेवार पूर्वानुमान उपलब्ध नहीं है।"},
+    "rain_total": {"English": "About {value} mm of rain is expected — no irrigation needed.",
+                   "Hindi": "लगभग {value} mm बारिश की संभावना है — सिंचाई की ज़रूरत नहीं।"},
+}
+SUMMARY = {
+    "English": "High {temp_max}°C / low {temp_min}°C, {rain_total} mm rain expected (up to {rain_prob_max}% chance).",
+    "Hindi": "अधिकतम {temp_max}°C / न्यूनतम {temp_min}°C, {rain_total} mm बारिश की संभावना (अधिकतम {rain_prob_max}%)।",
+}
+
+
+# ============================================================
+# SCORING
+# ============================================================
+
+def _rolling_max(values: np.ndarray, ahead: int) -> np.ndarray:
+    """max(values[i : i + ahead + 1]) for every i (window clipped at the end of the day)."""
+    out = values.copy()
+    for k in range(1, ahead + 1):
+        out[:-k] = np.fmax(out[:-k], values[k:])
+    return out
+
+
+def score_hours(arrays: dict, profile: dict):
+    """
+    (scores, limits) for the hour/temp/humidity/rain_prob/wind columns of a
+    Forecast.day view — score per hour (0 = unusable) and the per-limit pass masks.
+    """
+    hour = arrays["hour"]
+    temp, humidity, wind = arrays["temp"], arrays["humidity"], arrays["wind"]
+    rain_ahead = _rolling_max(arrays["rain_prob"], profile["lookahead"])
+
+    t_lo, t_hi = profile["temp"]
+    first, last = profile["hours"]
+    # Hours with a missing reading can't be judged: never usable, never blamed
+    in_hours = (hour >= first) & (hour <= last) & ~np.isnan(temp + wind + arrays["rain_prob"])
+    limits = {
+        "rain": rain_ahead <= profile["max_rain_prob"],
+        "wind": wind <= profile["max_wind"],
+        "temp": (temp >= t_lo) & (temp <= t_hi),
+    }
+    if profile["humidity"]:
+        h_lo, h_hi = profile["humidity"]
+        limits["humidity"] = (humidity >= h_lo) & (humidity <= h_hi)
+    usable = in_hours.copy()
+    for passed in limits.values():
+        usable &= passed
+
+    preferred = np.zeros(len(hour), dtype=bool)
+    for start, end in profile["preferred"]:
+        preferred |= (hour >= start) & (hour <= end)
+
+    with np.errstate(invalid="ignore"):
+        rain_term = 1 - rain_ahead / max(profile["max_rain_prob"], 1)
+        wind_term = 1 - wind / profile["max_wind"]
+        temp_term = 1 - np.abs(temp - (t_lo + t_hi) / 2) / ((t_hi - t_lo) / 2)
+        soft = 0.4 * rain_term + 0.3 * wind_term + 0.3 * temp_term
+        soft = np.clip(soft, 0.01, 1) * np.where(preferred, PREFERRED_BONUS, OFF_PEAK_FACTOR)
+    scores = np.where(usable, soft, 0.0)
+    return scores, {"in_hours": in_hours, "preferred": preferred, "rain_ahead": rain_ahead, **limits}
+
+
+def find_windows(scores: np.ndarray, hours: np.ndarray, duration_min: int) -> list:
+    """
+    Runs of usable hours → [{"start", "end", "slot_start", "slot_hours", "score", "slots"}].
+    slots: every candidate {"slot_start", "slot_hours", "score"} of `duration_min`
+    inside the run; slot_start/slot_hours/score describe the best of them.
+    """
+    need = max(1, math.ceil(duration_min / 60))
+    windows = []
+    usable = scores > SCORE_THRESHOLD
+    i, n = 0, len(scores)
+    while i < n:
+        if not usable[i]:
+            i += 1
+            continue
+        j = i
+        while j + 1 < n and usable[j + 1] and hours[j + 1] == hours[j] + 1:
+            j += 1
+        length = min(need, j - i + 1)
+        slots = [
+            {"slot_start": s, "slot_hours": length, "score": round(float(scores[s:s + length].sum() / length), 3)}
+            for s in range(i, j - length + 2)
+        ]
+        best = max(slots, key=lambda slot: slot["score"])
+        windows.append({"start": int(hours[i]), "end": int(hours[j]) + 1, **best, "slots": slots})
+        i = j + 1
+    return windows
+
+
+def _clock(hour: int) -> str:
+    return f"{hour % 12 or 12:02d}:00 {'AM' if hour < 12 else 'PM'}"
+
+
+def _fmt(value) -> str:
+    if value is None or math.isnan(value):
+        return "–"
+    return f"{float(value):g}"
+
+
+def _skip_reason(arrays: dict, limits: dict, profile: dict, lang: str) -> str:
+    """Phrase the limit that ruled out the most working hours."""
+    in_hours = limits["in_hours"]
+    if not in_hours.any():
+        return SKIP_REASONS["data"][lang]
+    failures = {name: int((in_hours & ~limits[name]).sum()) for name in ("rain", "wind", "temp", "humidity") if name in limits}
+    name = max(failures, key=failures.get)
+    source = {"rain": limits["rain_ahead"], "wind": arrays["wind"], "temp": arrays["temp"], "humidity": arrays["humidity"]}[name]
+    worst = source[in_hours & ~limits[name]]
+    if name == "temp":
+        # The reading furthest outside the range, hot or cold
+        mid = sum(profile["temp"]) / 2
+        value = worst[np.nanargmax(np.abs(worst - mid))]
+    else:
+        value = np.nanmax(worst)
+    limit = {"rain": profile["max_rain_prob"], "wind": profile["max_wind"]}.get(name, "")
+    return SKIP_REASONS[name][lang].format(value=_fmt(round(float(value), 1)), limit=limit)
+
+
+def plan_task(day: dict, task_type: str, crop: str, lang: str = "English") -> dict:
+    """/farm-advisor response for one columnar day view (Forecast.day) — no LLM."""
+    lang = "Hindi" if lang == "Hindi" else "English"
+    task = task_type.strip().lower()
+    task = task if task in TASK_PROFILES else "other"
+    profile = TASK_PROFILES[task]
+
+    duration, sessions = profile["duration"], profile["sessions"]
+    if task == "irrigation" and day["temp_max"] is not None:
+        if day["temp_max"] >= HOT_DAY_C:
+            duration += 30
+        if day["temp_max"] >= VERY_HOT_DAY_C:
+            sessions = 2
+
+    scores, limits = score_hours(day, profile)
+    windows = find_windows(scores, day["hour"], duration)
+
+    plan = {
+        "times_today": 0,
+        "skip_today": False,
+        "skip_reason": None,
+        "weather_summary": SUMMARY[lang].format(**{k: _fmt(day[k]) for k in ("temp_max", "temp_min", "rain_total", "rain_prob_max")}),
+        "schedule": [],
+        "pro_tip": PRO_TIPS[task][lang],
+        "windows": [{k: w[k] for k in ("start", "end", "score")} for w in windows],
+    }
+
+    if task == "irrigation" and (day["rain_total"] or 0) >= IRRIGATION_SKIP_RAIN_MM:
+        plan.update(skip_today=True, skip_reason=SKIP_REASONS["rain_total"][lang].format(value=_fmt(day["rain_total"])))
+        return plan
+    if not windows:
+        plan.update(skip_today=True, skip_reason=_skip_reason(day, limits, profile, lang))
+        return plan
+
+    chosen = []
+    candidates = sorted((slot for w in windows for slot in w["slots"]), key=lambda slot: -slot["score"])
+    for slot in candidates:
+        start = int(day["hour"][slot["slot_start"]])
+        if all(abs(start - int(day["hour"][c["slot_start"]])) >= profile["min_gap"] for c in chosen):
+            chosen.append(slot)
+        if len(chosen) == sessions:
+            break
+    chosen.sort(key=lambda slot: slot["slot_start"])
+
+    action = ACTIONS[task][lang].format(crop=crop)
+    for slot in chosen:
+        i = slot["slot_start"]
+        why = PREFERRED_WHY[lang] if limits["preferred"][i] else ""
+        plan["schedule"].append({
+            "time": _clock(int(day["hour"][i])),
+            "duration_minutes": min(duration, slot["slot_hours"] * 60),
+            "action": action,
+            "reason": SLOT_REASON[lang].format(
+                temp=_fmt(day["temp"][i]), humidity=_fmt(day["humidity"][i]),
+                rain_prob=_fmt(day["rain_prob"][i]), wind=_fmt(day["wind"][i]), why=why,
+            ),
+        })
+    plan["times_today"] = len(plan["schedule"])
+    return plan
+
+
+# ============================================================
+# OPTIONAL LLM PHRASING
+# ============================================================
+
+TEXT_FIELDS = ("skip_reason", "weather_summary", "pro_tip")
+
+
+def phrasing_prompt(plan: dict, crop: str, state: str, task_type: str, lang: str) -> str:
+    """Ask Gemini to reword the plan's text only; the schedule itself is fixed."""
+    fixed = {k: plan[k] for k in ("skip_today", *TEXT_FIELDS)}
+    fixed["schedule"] = plan["schedule"]
+    return f"""You are NEER's Smart Farm Advisor. A farmer is growing {crop} in {state}, India.
+Task: {task_type.upper()}
+
+The schedule below was computed from the hourly forecast and is final — do NOT change
+times, durations, the number of sessions or skip_today. Rewrite only the text fields
+(weather_summary, skip_reason, pro_tip, and each slot's action and reason) to be
+specific, practical and friendly for a farmer. Keep every number that appears.
+Respond in {lang}.
+
+{json.dumps(fixed, ensure_ascii=False, indent=2)}
+
+Return ONLY the same JSON structure (no markdown, no code fences)."""
+
+
+def _load_phrasing(raw: str):
+    raw = raw.strip()
+    if raw.startswith("```"):
+        raw = raw.split("\n", 1)[1] if "\n" in raw else raw[3:]
+        raw = raw.rsplit("```", 1)[0].strip()
+    return json.loads(raw)
+
+
+def is_phrasing_reply(raw: str) -> bool:
+    """True if raw is a JSON object apply_phrasing() can read (the response cache's validator)."""
+    return isinstance(_load_phrasing(raw), dict)
+
+
+def apply_phrasing(plan: dict, raw: str) -> dict:
+    """Copy reworded text fields from Gemini's JSON onto the plan; structure stays as computed."""
+    reworded = _load_phrasing(raw)
+
+    phrased = dict(plan)
+    for field in TEXT_FIELDS:
+        if plan[field] is not None and isinstance(reworded.get(field), str):
+            phrased[field] = reworded[field]
+    slots = reworded.get("schedule")
+    if isinstance(slots, list) and len(slots) == len(plan["schedule"]):
+        phrased["schedule"] = [
+            {**slot, **{k: new[k] for k in ("action", "reason") if isinstance(new, dict) and isinstance(new.get(k), str)}}
+            for slot, new in zip(plan["schedule"], slots)
+        ]
+    return phrased
@@ -10,7 +10,7 @@ async def test_diagnose():
     
     try:
         print("Calling Crop Doctor...")
-        result = crop_doctor.diagnose(
+        result = await crop_doctor.diagnose(
             image_bytes=image_bytes,
             mime_type="image/jpeg",
             lang="English"
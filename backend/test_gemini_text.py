@@ -7,7 +7,7 @@ async def test_text():
     load_dotenv()
     try:
         print("Calling Google Gemini (Text)...")
-        res = gemini_generate_text("Hi, are you working?")
+        res = await gemini_generate_text("Hi, are you working?")
         print(f"Response: {res}")
     except Exception as e:
         print(f"Error: {e}")
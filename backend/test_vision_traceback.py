@@ -11,7 +11,7 @@ async def test_vision_traceback():
     
     try:
         print("Calling Google Gemini (Vision)...")
-        res = gemini_generate_vision("What is in this image?", image_bytes, "image/jpeg")
+        res = await gemini_generate_vision("What is in this image?", image_bytes, "image/jpeg")
         print(f"Response: {res}")
     except Exception as e:
         print("--- TRACEBACK ---")
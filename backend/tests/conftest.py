@@ -0,0 +1,45 @@
+import os
+from datetime import date, timedelta
+
+import pytest
+
+# main.py needs a key at import; nothing here calls Gemini or Open-Meteo
+os.environ.setdefault("GEMINI_API_KEY", "test")
+os.environ.setdefault("FORECAST_STORE", "0")
+os.environ.setdefault("PREFETCH_SCOPE", "off")
+
+
+def open_meteo_payload(days: int = 7, start: date = None) -> dict:
+    """An Open-Meteo /v1/forecast payload with every variable the app asks for."""
+    start = start or date.today()
+    dates = [(start + timedelta(days=i)).isoformat() for i in range(days)]
+    times = [f"{d}T{h:02d}:00" for d in dates for h in range(24)]
+    n = len(times)
+    return {
+        "current": {
+            "temperature_2m": 31.4, "relative_humidity_2m": 40, "apparent_temperature": 33.0,
+            "weather_code": 1, "wind_speed_10m": 7.2, "wind_direction_10m": 90,
+        },
+        "daily": {
+            "time": dates,
+            "weather_code": [1] * days,
+            "temperature_2m_max": [34.5] * days,
+            "temperature_2m_min": [21.0] * days,
+            "precipitation_sum": [0.0] * days,
+            "precipitation_probability_max": [10] * days,
+            "wind_speed_10m_max": [12.0] * days,
+            "uv_index_max": [7.5] * days,
+        },
+        "hourly": {
+            "time": times,
+            "temperature_2m": [25.0 + (i % 24) / 4 for i in range(n)],
+            "relative_humidity_2m": [50] * n,
+            "precipitation_probability": [10] * n,
+            "wind_speed_10m": [8.0] * n,
+        },
+    }
+
+
+@pytest.fixture
+def payload():
+    return open_meteo_payload()
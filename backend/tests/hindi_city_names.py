@@ -0,0 +1,160 @@
+"""Common Hindi (Devanagari) spelling of every CITY_COORDS key."""
+
+HINDI_CITY_NAMES = {
+    # Andhra Pradesh
+    "Visakhapatnam": "विशाखापत्तनम", "Vijayawada": "विजयवाड़ा", "Guntur": "गुंटूर", "Nellore": "नेल्लोर",
+    "Kurnool": "कुरनूल", "Rajahmundry": "राजमुंदरी", "Tirupati": "तिरुपति", "Kakinada": "काकीनाडा",
+    "Kadapa": "कडप्पा", "Anantapur": "अनंतपुर", "Vizianagaram": "विजयनगरम", "Eluru": "एलुरु",
+    "Ongole": "ओंगोल", "Nandyal": "नंद्याल", "Machilipatnam": "मछलीपट्टनम", "Adoni": "अदोनी",
+    "Tenali": "तेनाली", "Chittoor": "चित्तूर", "Hindupur": "हिंदुपुर", "Proddatur": "प्रोद्दटूर",
+    "Bhimavaram": "भीमावरम", "Madanapalle": "मदनपल्ले", "Guntakal": "गुंतकल", "Srikakulam": "श्रीकाकुलम",
+    # Arunachal Pradesh
+    "Itanagar": "ईटानगर", "Pasighat": "पासीघाट", "Tawang": "तवांग", "Ziro": "ज़ीरो", "Roing": "रोइंग",
+    "Tezu": "तेज़ू", "Bomdila": "बोमडिला", "Aalo": "आलो", "Changlang": "चांगलांग",
+    # Assam
+    "Guwahati": "गुवाहाटी", "Silchar": "सिलचर", "Dibrugarh": "डिब्रूगढ़", "Jorhat": "जोरहाट",
+    "Nagaon": "नगांव", "Tinsukia": "तिनसुकिया", "Tezpur": "तेजपुर", "Bongaigaon": "बोंगाईगांव",
+    "Diphu": "दीफू", "Dhubri": "धुबरी", "North Lakhimpur": "उत्तर लखीमपुर", "Lumding": "लमडिंग",
+    "Goalpara": "ग्वालपाड़ा", "Sivasagar": "शिवसागर", "Barpeta": "बरपेटा", "Golaghat": "गोलाघाट",
+    "Karimganj": "करीमगंज", "Hailakandi": "हैलाकांडी",
+    # Bihar
+    "Patna": "पटना", "Gaya": "गया", "Bhagalpur": "भागलपुर", "Muzaffarpur": "मुज़फ़्फ़रपुर",
+    "Purnia": "पूर्णिया", "Darbhanga": "दरभंगा", "Bihar Sharif": "बिहार शरीफ़", "Arrah": "आरा",
+    "Begusarai": "बेगूसराय", "Katihar": "कटिहार", "Munger": "मुंगेर", "Chhapra": "छपरा",
+    "Samastipur": "समस्तीपुर", "Saharsa": "सहरसा", "Sasaram": "सासाराम", "Hajipur": "हाजीपुर",
+    "Dehri": "डेहरी", "Bettiah": "बेतिया", "Motihari": "मोतिहारी", "Kishanganj": "किशनगंज",
+    "Jamui": "जमुई",
+    # Chhattisgarh
+    "Raipur": "रायपुर", "Bhilai": "भिलाई", "Bilaspur": "बिलासपुर", "Korba": "कोरबा",
+    "Rajnandgaon": "राजनांदगांव", "Raigarh": "रायगढ़", "Jagdalpur": "जगदलपुर", "Ambikapur": "अंबिकापुर",
+    "Dhamtari": "धमतरी", "Durg": "दुर्ग", "Mahasamund": "महासमुंद", "Chirmiri": "चिरमिरी",
+    "Bhatapara": "भाटापारा", "Baloda Bazar": "बलौदा बाज़ार", "Dongargarh": "डोंगरगढ़",
+    # Goa
+    "Panaji": "पणजी", "Margao": "मडगांव", "Vasco da Gama": "वास्को द गामा", "Mapusa": "मापुसा",
+    "Ponda": "पोंडा", "Bicholim": "बिचोलिम", "Curchorem": "कुर्चोरेम", "Sanquelim": "सांकेलिम",
+    "Valpoi": "वालपोई",
+    # Gujarat
+    "Ahmedabad": "अहमदाबाद", "Surat": "सूरत", "Vadodara": "वडोदरा", "Rajkot": "राजकोट",
+    "Bhavnagar": "भावनगर", "Jamnagar": "जामनगर", "Junagadh": "जूनागढ़", "Gandhinagar": "गांधीनगर",
+    "Gandhidham": "गांधीधाम", "Anand": "आणंद", "Navsari": "नवसारी", "Morbi": "मोरबी",
+    "Nadiad": "नडियाद", "Surendranagar": "सुरेंद्रनगर", "Bharuch": "भरूच", "Vapi": "वापी",
+    "Bhuj": "भुज", "Porbandar": "पोरबंदर", "Palanpur": "पालनपुर", "Valsad": "वलसाड",
+    "Godhra": "गोधरा", "Patan": "पाटन", "Botad": "बोटाद", "Amreli": "अमरेली",
+    # Haryana
+    "Faridabad": "फ़रीदाबाद", "Gurugram": "गुरुग्राम", "Panipat": "पानीपत", "Ambala": "अंबाला",
+    "Chandigarh": "चंडीगढ़", "Rohtak": "रोहतक", "Hisar": "हिसार", "Karnal": "करनाल",
+    "Sonipat": "सोनीपत", "Panchkula": "पंचकूला", "Bhiwani": "भिवानी", "Sirsa": "सिरसा",
+    "Yamunanagar": "यमुनानगर", "Bahadurgarh": "बहादुरगढ़", "Jind": "जींद", "Thanesar": "थानेसर",
+    "Kaithal": "कैथल", "Rewari": "रेवाड़ी", "Palwal": "पलवल", "Hansi": "हांसी", "Fatehabad": "फ़तेहाबाद",
+    # Himachal Pradesh
+    "Shimla": "शिमला", "Dharamshala": "धर्मशाला", "Mandi": "मंडी", "Solan": "सोलन", "Kullu": "कुल्लू",
+    "Manali": "मनाली", "Dalhousie": "डलहौज़ी", "Palampur": "पालमपुर", "Nahan": "नाहन",
+    "Chamba": "चंबा", "Una": "ऊना", "Hamirpur": "हमीरपुर", "Sundarnagar": "सुंदरनगर",
+    "Paonta Sahib": "पांवटा साहिब",
+    # Jharkhand
+    "Ranchi": "रांची", "Jamshedpur": "जमशेदपुर", "Dhanbad": "धनबाद", "Bokaro": "बोकारो",
+    "Deoghar": "देवघर", "Phusro": "फुसरो", "Hazaribagh": "हज़ारीबाग", "Giridih": "गिरिडीह",
+    "Ramgarh": "रामगढ़", "Medininagar": "मेदिनीनगर", "Chirkunda": "चिरकुंडा",
+    "Jhumri Telaiya": "झुमरी तिलैया", "Sahibganj": "साहिबगंज", "Chaibasa": "चाईबासा",
+    "Lohardaga": "लोहरदगा",
+    # Karnataka
+    "Bengaluru": "बेंगलुरु", "Mysuru": "मैसूरु", "Hubballi": "हुब्बल्ली", "Mangaluru": "मंगलुरु",
+    "Belagavi": "बेलगावी", "Kalaburagi": "कलबुर्गी", "Davanagere": "दावणगेरे", "Ballari": "बल्लारी",
+    "Vijayapura": "विजयपुरा", "Shivamogga": "शिवमोग्गा", "Tumakuru": "तुमकुरु", "Udupi": "उडुपी",
+    "Raichur": "रायचूर", "Bidar": "बीदर", "Hospet": "होसपेट", "Gadag": "गदग", "Hassan": "हासन",
+    "Chitradurga": "चित्रदुर्ग", "Kolar": "कोलार", "Mandya": "मांड्या", "Chikkamagaluru": "चिक्कमगलुरु",
+    "Bagalkot": "बागलकोट", "Karwar": "कारवार", "Ramanagara": "रामनगरा",
+    # Kerala
+    "Thiruvananthapuram": "तिरुवनंतपुरम", "Kochi": "कोच्चि", "Kozhikode": "कोझिकोड",
+    "Thrissur": "त्रिशूर", "Kollam": "कोल्लम", "Alappuzha": "अलाप्पुझा", "Palakkad": "पलक्कड़",
+    "Kottayam": "कोट्टायम", "Kannur": "कन्नूर", "Manjeri": "मंजेरी", "Thalassery": "थालास्सेरी",
+    "Ponnani": "पोन्नानी", "Vatakara": "वटकरा", "Kanhangad": "कान्हांगाड", "Malarpuram": "मलप्पुरम",
+    "Kayamkulam": "कायमकुलम", "Changanassery": "चंगनास्सेरी", "Tirur": "तिरूर",
+    # Madhya Pradesh
+    "Indore": "इंदौर", "Bhopal": "भोपाल", "Jabalpur": "जबलपुर", "Gwalior": "ग्वालियर",
+    "Ujjain": "उज्जैन", "Sagar": "सागर", "Dewas": "देवास", "Satna": "सतना", "Ratlam": "रतलाम",
+    "Rewa": "रीवा", "Khandwa": "खंडवा", "Burhanpur": "बुरहानपुर", "Chhindwara": "छिंदवाड़ा",
+    "Murwara (Katni)": "कटनी", "Singrauli": "सिंगरौली", "Bhind": "भिंड", "Morena": "मुरैना",
+    "Guna": "गुना", "Shivpuri": "शिवपुरी", "Chhatarpur": "छतरपुर", "Vidisha": "विदिशा",
+    "Mandsaur": "मंदसौर", "Hoshangabad": "होशंगाबाद", "Kargone": "खरगोन",
+    # Maharashtra
+    "Mumbai": "मुंबई", "Pune": "पुणे", "Nagpur": "नागपुर", "Nashik": "नासिक",
+    "Aurangabad": "औरंगाबाद", "Solapur": "सोलापुर", "Amravati": "अमरावती", "Navi Mumbai": "नवी मुंबई",
+    "Kolhapur": "कोल्हापुर", "Akola": "अकोला", "Jalgaon": "जलगांव", "Latur": "लातूर", "Dhule": "धुले",
+    "Ahmednagar": "अहमदनगर", "Chandrapur": "चंद्रपुर", "Parbhani": "परभणी", "Nanded": "नांदेड़",
+    "Satara": "सतारा", "Sangli": "सांगली", "Malegaon": "मालेगांव", "Mira-Bhayandar": "मीरा भायंदर",
+    "Bhiwandi": "भिवंडी", "Amalner": "अमलनेर", "Gondia": "गोंदिया", "Yavatmal": "यवतमाल",
+    "Beed": "बीड", "Wardha": "वर्धा",
+    # Manipur
+    "Imphal": "इंफाल", "Thoubal": "थौबल", "Kakching": "काकचिंग", "Ukhrul": "उखरुल",
+    "Churachandpur": "चुराचांदपुर", "Senapati": "सेनापति", "Jiribam": "जिरीबाम", "Moirang": "मोइरांग",
+    # Meghalaya
+    "Shillong": "शिलांग", "Tura": "तुरा", "Jowai": "जोवाई", "Nongstoin": "नोंगस्टोइन",
+    "Williamnagar": "विलियमनगर", "Baghmara": "बाघमारा", "Resubelpara": "रेसुबेलपारा", "Mairang": "मैरांग",
+    # Mizoram
+    "Aizawl": "आइज़ोल", "Lunglei": "लुंगलेई", "Saiha": "सैहा", "Champhai": "चम्फाई",
+    "Kolasib": "कोलासिब", "Serchhip": "सेरछिप", "Lawngtlai": "लॉन्ग्तलाई", "Mamit": "मामित",
+    # Nagaland
+    "Kohima": "कोहिमा", "Dimapur": "दीमापुर", "Mokokchung": "मोकोकचुंग", "Tuensang": "तुएनसांग",
+    "Wokha": "वोखा", "Zunheboto": "ज़ुन्हेबोटो", "Mon": "मोन", "Phek": "फेक",
+    # Odisha
+    "Bhubaneswar": "भुवनेश्वर", "Cuttack": "कटक", "Rourkela": "राउरकेला", "Berhampur": "बरहमपुर",
+    "Sambalpur": "संबलपुर", "Puri": "पुरी", "Balasore": "बालासोर", "Bhadrak": "भद्रक",
+    "Baripada": "बारीपदा", "Jharsuguda": "झारसुगुड़ा", "Bargarh": "बरगढ़", "Rayagada": "रायगड़ा",
+    "Bolangir": "बलांगीर", "Jeypore": "जेपोर", "Bhawani Patna": "भवानीपटना",
+    # Punjab
+    "Ludhiana": "लुधियाना", "Amritsar": "अमृतसर", "Jalandhar": "जालंधर", "Patiala": "पटियाला",
+    "Bathinda": "बठिंडा", "Hoshiarpur": "होशियारपुर", "Pathankot": "पठानकोट", "Moga": "मोगा",
+    "Batala": "बटाला", "Khanna": "खन्ना", "Phagwara": "फगवाड़ा", "S.A.S. Nagar": "मोहाली",
+    "Abohar": "अबोहर", "Firozpur": "फ़िरोज़पुर", "Kapurthala": "कपूरथला", "Faridkot": "फ़रीदकोट",
+    "Barnala": "बरनाला", "Muktsar": "मुक्तसर",
+    # Rajasthan
+    "Jaipur": "जयपुर", "Jodhpur": "जोधपुर", "Kota": "कोटा", "Bikaner": "बीकानेर", "Ajmer": "अजमेर",
+    "Udaipur": "उदयपुर", "Bhilwara": "भीलवाड़ा", "Alwar": "अलवर", "Bharatpur": "भरतपुर",
+    "Pali": "पाली", "Sikar": "सीकर", "Chittorgarh": "चित्तौड़गढ़", "Banswara": "बांसवाड़ा",
+    "Hanumangarh": "हनुमानगढ़", "Sawai Madhopur": "सवाई माधोपुर", "Kishangarh": "किशनगढ़",
+    "Beawar": "ब्यावर", "Tonk": "टोंक", "Jhunjhunu": "झुंझुनूं", "Churu": "चूरू", "Barmer": "बाड़मेर",
+    "Jalore": "जालोर", "Sirohi": "सिरोही", "Jaisalmer": "जैसलमेर",
+    # Sikkim
+    "Gangtok": "गंगटोक", "Namchi": "नामची", "Gyalshing": "ग्यालशिंग", "Mangan": "मंगन",
+    "Singtam": "सिंगताम", "Rangpo": "रंगपो",
+    # Tamil Nadu
+    "Chennai": "चेन्नई", "Coimbatore": "कोयंबटूर", "Madurai": "मदुरै", "Tiruchirappalli": "तिरुचिरापल्ली",
+    "Salem": "सेलम", "Tirunelveli": "तिरुनेलवेली", "Erode": "ईरोड", "Vellore": "वेल्लोर",
+    "Thoothukudi": "थूथुकुडी", "Dindigul": "डिंडीगुल", "Thanjavur": "तंजावुर", "Ranipet": "रानीपेट",
+    "Karur": "करूर", "Nagercoil": "नागरकोइल", "Kancheepuram": "कांचीपुरम", "Tiruppur": "तिरुप्पुर",
+    "Cuddalore": "कुड्डालोर", "Neyveli": "नेवेली", "Kumbakonam": "कुंभकोणम", "Rajapalayam": "राजापालयम",
+    "Pudukkottai": "पुदुक्कोट्टई", "Hosur": "होसुर", "Ambur": "अंबूर", "Karaikudi": "कराईकुडी",
+    # Telangana
+    "Hyderabad": "हैदराबाद", "Warangal": "वारंगल", "Nizamabad": "निज़ामाबाद", "Karimnagar": "करीमनगर",
+    "Ramagundam": "रामागुंडम", "Khammam": "खम्मम", "Mahbubnagar": "महबूबनगर", "Nalgonda": "नलगोंडा",
+    "Adilabad": "आदिलाबाद", "Suryapet": "सूर्यापेट", "Miryalaguda": "मिर्यालगुडा", "Jagtial": "जगतियाल",
+    "Mancherial": "मंचेरियल", "Kothagudem": "कोठागुडेम", "Siddipet": "सिद्दीपेट", "Kamareddy": "कामारेड्डी",
+    "Zaheerabad": "ज़हीराबाद", "Nagarkurnool": "नागरकुरनूल",
+    # Tripura
+    "Agartala": "अगरतला", "Dharmanagar": "धर्मनगर", "Kailasahar": "कैलाशहर", "Belonia": "बेलोनिया",
+    "Ambassa": "अंबासा", "Khowai": "खोवाई", "Bishalgarh": "बिशालगढ़", "Sabroom": "सबरूम",
+    # Uttar Pradesh
+    "Lucknow": "लखनऊ", "Kanpur": "कानपुर", "Ghaziabad": "ग़ाज़ियाबाद", "Agra": "आगरा",
+    "Varanasi": "वाराणसी", "Meerut": "मेरठ", "Prayagraj": "प्रयागराज", "Bareilly": "बरेली",
+    "Aligarh": "अलीगढ़", "Moradabad": "मुरादाबाद", "Saharanpur": "सहारनपुर", "Gorakhpur": "गोरखपुर",
+    "Noida": "नोएडा", "Firozabad": "फ़िरोज़ाबाद", "Jhansi": "झांसी", "Muzaffarnagar": "मुज़फ़्फ़रनगर",
+    "Mathura": "मथुरा", "Rampur": "रामपुर", "Shahjahanpur": "शाहजहांपुर", "Farrukhabad": "फ़र्रुख़ाबाद",
+    "Orai": "उरई", "Faizabad": "फ़ैज़ाबाद", "Etawah": "इटावा", "Mirzapur": "मिर्ज़ापुर",
+    "Bulandshahr": "बुलंदशहर", "Sambhal": "संभल", "Amroha": "अमरोहा", "Hardoi": "हरदोई",
+    "Banda": "बांदा", "Hapur": "हापुड़",
+    # Uttarakhand
+    "Dehradun": "देहरादून", "Haridwar": "हरिद्वार", "Roorkee": "रुड़की", "Haldwani": "हल्द्वानी",
+    "Rudrapur": "रुद्रपुर", "Kashipur": "काशीपुर", "Rishikesh": "ऋषिकेश", "Pantnagar": "पंतनगर",
+    "Pithoragarh": "पिथौरागढ़", "Ramnagar": "रामनगर", "Kichha": "किच्छा", "Manglaur": "मंगलौर",
+    "Kotdwar": "कोटद्वार", "Almora": "अल्मोड़ा", "Mussoorie": "मसूरी", "Nainital": "नैनीताल",
+    "Bageshwar": "बागेश्वर", "Chamoli": "चमोली",
+    # West Bengal
+    "Kolkata": "कोलकाता", "Asansol": "आसनसोल", "Siliguri": "सिलीगुड़ी", "Durgapur": "दुर्गापुर",
+    "Bardhaman": "बर्धमान", "English Bazar": "इंग्लिश बाज़ार", "Baharampur": "बहरामपुर",
+    "Habra": "हाबरा", "Kharagpur": "खड़गपुर", "Shantipur": "शांतिपुर", "Dankuni": "डानकुनी",
+    "Haldia": "हल्दिया", "Jalpaiguri": "जलपाईगुड़ी", "Balurghat": "बालुरघाट",
+    "Alipurduar": "अलीपुरद्वार", "Bhatpara": "भाटपाड़ा", "Maheshtala": "महेशतला",
+    "Rajpur Sonarpur": "राजपुर सोनारपुर", "South Dumdum": "दक्षिण दमदम", "Gopalpur": "गोपालपुर",
+    "Bally": "बाली", "Midnapore": "मेदिनीपुर", "Raniganj": "रानीगंज", "Navadwip": "नवद्वीप",
+}
@@ -0,0 +1,63 @@
+import numpy as np
+import pytest
+
+from alert_engine import batch_alerts, forecasts_to_arrays
+from weather_scout import WeatherScout
+from weather_service import parse_forecast
+
+DATES = [f"2025-01-{day:02d}" for day in range(1, 8)]
+
+
+def maybe_none(rng, value):
+    return None if rng.random() < 0.1 else value
+
+
+def random_forecasts(n: int, seed: int = 11) -> list:
+    """Forecasts straddling every threshold, with nulls and short ranges mixed in."""
+    rng = np.random.default_rng(seed)
+    forecasts = []
+    for _ in range(n):
+        days = int(rng.choice([1, 2, 7]))
+
+        def column(low, high):
+            return [maybe_none(rng, round(float(rng.uniform(low, high)), 1)) for _ in range(days)]
+
+        forecasts.append(parse_forecast({
+            "current": {
+                "temperature_2m": maybe_none(rng, round(float(rng.uniform(0, 46)), 1)),
+                "relative_humidity_2m": maybe_none(rng, int(rng.integers(20, 101))),
+                "apparent_temperature": 0.0, "wind_speed_10m": 0.0, "wind_direction_10m": 0, "weather_code": 0,
+            },
+            "daily": {
+                "time": DATES[:days],
+                "temperature_2m_min": column(-3, 28),
+                "temperature_2m_max": column(15, 48),
+                "precipitation_sum": [maybe_none(rng, float(rng.choice([0.0, 0.5, 30.0, 45.0]))) for _ in range(days)],
+                "precipitation_probability_max": column(0, 100),
+                "wind_speed_10m_max": column(0, 40),
+            },
+        }))
+    return forecasts
+
+
+@pytest.mark.parametrize("lang,crop", [("English", None), ("Hindi", None), ("English", "wheat")])
+def test_batch_matches_scalar_path(lang, crop):
+    scout = WeatherScout(text_fn=None)
+    forecasts = random_forecasts(300)
+
+    batch = batch_alerts(forecasts_to_arrays(forecasts), lang, crop)
+
+    assert batch == [scout._generate_alerts(f, lang, crop) for f in forecasts]
+    assert sum(map(len, batch)) > 0
+
+
+def test_whole_nan_columns_fire_nothing_that_needs_them():
+    forecasts = random_forecasts(50)
+    arrays = forecasts_to_arrays(forecasts)
+    for name in ("rain_prob", "wind_max", "humidity"):
+        arrays[name][:] = np.nan
+
+    fired = {a["title"] for alerts in batch_alerts(arrays) for a in alerts}
+
+    assert not fired & {"Rain Likely Tomorrow", "Strong Winds", "Good Spray Window",
+                        "Disease Risk — High Humidity"}
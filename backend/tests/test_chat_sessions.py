@@ -0,0 +1,56 @@
+import asyncio
+
+from chat_sessions import KEEP_RECENT_TURNS, SessionStore
+
+
+def test_concurrent_records_compact_once():
+    prompts = []
+
+    async def summarize(prompt):
+        prompts.append(prompt)
+        await asyncio.sleep(0.01)
+        return "summary"
+
+    async def run():
+        store = SessionStore(summarize, token_budget=10)
+        session = store.get("farmer")
+        turns = [(f"question {i} " * 5, f"answer {i} " * 5) for i in range(2 * KEEP_RECENT_TURNS + 2)]
+        # Several turns recorded before the first compaction task gets to run
+        for user_text, model_text in turns:
+            store.record(session, user_text, model_text)
+        await asyncio.sleep(0.05)
+        return store, session, turns
+
+    store, session, turns = asyncio.run(run())
+    assert len(prompts) == 1
+    assert store.compactions == 1
+    assert not session.compacting
+    assert session.memory == "summary"
+    # Nothing that wasn't summarised was dropped
+    summarised = len(turns) - len(session.turns)
+    assert session.turns == turns[summarised:]
+    assert all(u.strip() in prompts[0] for u, _ in turns[:summarised])
+
+
+def test_cancelled_compaction_keeps_the_turns():
+    async def summarize(prompt):
+        await asyncio.sleep(10)
+        return "summary"
+
+    async def run():
+        store = SessionStore(summarize, token_budget=10)
+        session = store.get("farmer")
+        turns = [(f"question {i} " * 5, f"answer {i} " * 5) for i in range(2 * KEEP_RECENT_TURNS)]
+        for user_text, model_text in turns:
+            store.record(session, user_text, model_text)
+        await asyncio.sleep(0.01)
+        for task in list(store._tasks):
+            task.cancel()
+        await asyncio.sleep(0.01)
+        return store, session, turns
+
+    store, session, turns = asyncio.run(run())
+    assert session.turns == turns
+    assert session.memory == ""
+    assert not session.compacting
+    assert store.compactions == 0
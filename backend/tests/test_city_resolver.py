@@ -0,0 +1,68 @@
+import pytest
+
+from city_resolver import CITY_ALIASES, CityResolver, fold
+from hindi_city_names import HINDI_CITY_NAMES
+from weather_scout import CITY_COORDS, GPS_SNAP_KM, _resolve_location
+
+resolver = CityResolver(CITY_COORDS, CITY_ALIASES)
+
+
+def test_hindi_list_covers_every_city():
+    assert set(HINDI_CITY_NAMES) == set(CITY_COORDS)
+
+
+@pytest.mark.parametrize("city,hindi", sorted(HINDI_CITY_NAMES.items()))
+def test_hindi_spelling_resolves(city, hindi):
+    match = resolver.resolve(hindi)
+    assert match is not None and match[0] == city
+
+
+@pytest.mark.parametrize("hindi,city", [
+    ("हैदराबाद", "Hyderabad"),
+    ("अहमदाबाद", "Ahmedabad"),
+    ("मेरठ", "Meerut"),
+    ("गुड़गांव", "Gurugram"),
+    ("गुड़गाँव", "Gurugram"),
+])
+def test_review_examples(hindi, city):
+    assert resolver.resolve(hindi)[0] == city
+
+
+def test_canonical_names_keep_distinct_keys():
+    keys = {}
+    for name in CITY_COORDS:
+        assert keys.setdefault(fold(name), name) == name
+    for name in CITY_COORDS:
+        assert resolver.lookup(name) == name
+
+
+@pytest.mark.parametrize("text,city", [
+    ("jodhpur ", "Jodhpur"),
+    ("Jodhapur", "Jodhpur"),
+    ("Gurgaon", "Gurugram"),
+    ("Bangalore", "Bengaluru"),
+    ("Ludhiyana", "Ludhiana"),
+    ("Indaur", "Indore"),
+])
+def test_latin_variants_resolve(text, city):
+    assert resolver.resolve(text)[0] == city
+
+
+def test_unrelated_name_does_not_resolve():
+    assert resolver.resolve("Ganganagar") is None
+
+
+def test_gps_fix_near_a_city_snaps_to_it():
+    jodhpur = CITY_COORDS["Jodhpur"]
+    name, coords, location = _resolve_location("", lat=jodhpur["lat"] + 0.02, lon=jodhpur["lon"])
+    assert name == "Jodhpur"
+    assert coords == {"lat": jodhpur["lat"], "lon": jodhpur["lon"]}
+    assert location["distance_km"] <= GPS_SNAP_KM
+
+
+def test_far_gps_fix_keeps_a_neutral_name():
+    name, coords, location = _resolve_location("", lat=15.0, lon=65.0)   # Arabian Sea
+    assert name == "15.00, 65.00"
+    assert coords == {"lat": 15.0, "lon": 65.0}
+    assert location["nearest"] in CITY_COORDS
+    assert location["distance_km"] > GPS_SNAP_KM
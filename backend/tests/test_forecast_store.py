@@ -0,0 +1,99 @@
+import asyncio
+import os
+from datetime import date, datetime
+
+import numpy as np
+import pytest
+
+import weather_service
+from conftest import open_meteo_payload
+from forecast_store import ForecastStore
+from weather_service import WeatherService, parse_forecast
+
+LAT, LON = 26.2389, 73.0243
+
+
+def forecast(start: date, days: int = 3, temp: float = None):
+    payload = open_meteo_payload(days=days, start=start)
+    if temp is not None:
+        payload["hourly"]["temperature_2m"] = [temp] * len(payload["hourly"]["time"])
+    return parse_forecast(payload)
+
+
+@pytest.fixture
+def store(tmp_path):
+    return ForecastStore(root=str(tmp_path))
+
+
+def month_files(store, table="hourly"):
+    table_dir = os.path.join(store.root, store.cell(LAT, LON), table)
+    return sorted(os.listdir(table_dir))
+
+
+def test_query_round_trip_latest_only(store):
+    store.record(LAT, LON, forecast(date(2025, 6, 10), temp=30.0), datetime(2025, 6, 10, 6))
+    store.record(LAT, LON, forecast(date(2025, 6, 10), temp=31.5), datetime(2025, 6, 10, 7))
+
+    every = store.query(LAT, LON, "2025-06-10", "2025-06-11")
+    assert len(every["valid"]) == 48
+    assert np.all(every["valid"][:-1] <= every["valid"][1:])
+
+    latest = store.query(LAT, LON, "2025-06-10", "2025-06-11", latest_only=True)
+    assert len(latest["valid"]) == 24
+    assert np.all(latest["issued"] == np.datetime64("2025-06-10T07:00"))
+    assert np.all(latest["temp"] == np.float32(31.5))
+    assert np.all(latest["humidity"] == 50)
+
+
+def test_seal_keeps_rows_queryable(store):
+    store.record(LAT, LON, forecast(date(2025, 6, 29)), datetime(2025, 6, 29, 6))
+    before = store.query(LAT, LON, "2025-06-29", "2025-07-02")
+    store.record(LAT, LON, forecast(date(2025, 7, 2)), datetime(2025, 7, 2, 6))
+
+    assert month_files(store) == ["2025-06.npz", "2025-07"]
+    after = store.query(LAT, LON, "2025-06-29", "2025-07-02")
+    for name, column in before.items():
+        np.testing.assert_array_equal(after[name], column)
+
+
+def test_reopened_sealed_month_is_merged_not_overwritten(store):
+    store.record(LAT, LON, forecast(date(2025, 6, 28), temp=30.0), datetime(2025, 6, 28, 6))
+    store.record(LAT, LON, forecast(date(2025, 7, 1)), datetime(2025, 7, 1, 6))
+    sealed = store.query(LAT, LON, "2025-06-28", "2025-07-01")   # caches the .npz
+    assert len(sealed["valid"]) == 3 * 24
+
+    # Late rows for June land beside the .npz; queries see both
+    store.record(LAT, LON, forecast(date(2025, 6, 29), days=2, temp=33.0), datetime(2025, 7, 1, 7))
+    assert "2025-06" in month_files(store) and "2025-06.npz" in month_files(store)
+    both = store.query(LAT, LON, "2025-06-28", "2025-07-01")
+    assert len(both["valid"]) == 5 * 24
+
+    # The next seal merges them, and the cached copy is not served stale
+    store.record(LAT, LON, forecast(date(2025, 7, 2)), datetime(2025, 7, 2, 6))
+    assert "2025-06" not in month_files(store)
+    merged = store.query(LAT, LON, "2025-06-28", "2025-07-01")
+    for name, column in both.items():
+        np.testing.assert_array_equal(merged[name], column)
+    latest = store.query(LAT, LON, "2025-06-29", "2025-07-01", latest_only=True)
+    assert np.all(latest["temp"] == np.float32(33.0))
+
+
+def test_store_failure_never_fails_a_fetch(monkeypatch, payload):
+    class BrokenStore:
+        def record(self, *args):
+            raise RuntimeError("disk on fire")
+
+    async def get_json(path, params):
+        return payload
+
+    monkeypatch.setattr(weather_service.open_meteo, "get_json", get_json)
+    service = WeatherService(store=BrokenStore())
+
+    async def run():
+        fetched = await service.fetch(LAT, LON)
+        await asyncio.gather(*service._record_tasks)
+        return fetched
+
+    fetched = asyncio.run(run())
+    assert len(fetched.dates) == 7
+    assert service.stats()["record_errors"] == 1
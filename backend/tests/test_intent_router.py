@@ -0,0 +1,51 @@
+import pytest
+
+from intent_router import IntentRouter, mentions_weather
+
+router = IntentRouter(weather_fn=None)
+
+
+def intent(message):
+    result = router.classify(message)
+    return result and result[0]
+
+
+@pytest.mark.parametrize("message,scheme", [
+    ("what is pm kisan", "pm_kisan"),
+    ("PM-KISAN benefits", "pm_kisan"),
+    ("kcc details", "kcc"),
+    ("how to apply for fasal bima", "pmfby"),
+])
+def test_english_scheme_questions_are_routed(message, scheme):
+    name, slots = router.classify(message)
+    assert name == "scheme_info" and slots["scheme"]["id"] == scheme
+
+
+@pytest.mark.parametrize("message", [
+    "pm kisan kitna paisa milta hai",
+    "kcc kaise banta hai",
+    "पीएम किसान क्या है",
+])
+def test_hindi_and_hinglish_scheme_questions_fall_back(message):
+    assert intent(message) is None
+
+
+def test_cues_match_whole_words():
+    assert not mentions_weather("rainfed wheat varieties")
+    assert mentions_weather("will it rain in Pali")
+    assert mentions_weather("weather forecasts for Pali")
+
+    _, slots = router.classify("weather in Kalaburagi")
+    assert slots["city"] == "Kalaburagi" and not slots["tomorrow"]
+    _, slots = router.classify("kal Kalaburagi ka mausam")
+    assert slots["tomorrow"]
+
+
+def test_my_cue_does_not_match_inside_words():
+    assert router.classify("weather in Mysore")[1]["city"] == "Mysuru"
+    assert intent("my pm kisan money") is None
+
+
+def test_prefix_cues():
+    assert intent("pm kisan eligibility") is None
+    assert intent("pests in Pali weather") is None
@@ -0,0 +1,105 @@
+import asyncio
+
+import pytest
+from google.genai import errors as genai_errors
+
+import circuit_breaker
+from llm_gateway import GEMINI_MODELS, GeminiGateway
+
+
+def make_gateway(**kwargs):
+    kwargs.setdefault("hedge", True)
+    return GeminiGateway(client=None, models=GEMINI_MODELS[:2], retry_delay=0, **kwargs)
+
+
+def test_cancelling_during_hedge_wait_cancels_primary():
+    gateway = make_gateway()
+    started, cancelled = [], []
+
+    async def slow(model_id):
+        started.append(model_id)
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.append(model_id)
+            raise
+
+    async def run():
+        call = asyncio.ensure_future(gateway.run(slow, hedge=True))
+        await asyncio.sleep(0.05)       # well inside the 3 s default hedge delay
+        call.cancel()
+        await asyncio.gather(call, return_exceptions=True)
+        await asyncio.sleep(0.01)
+        # Checked before asyncio.run() cancels whatever is left over
+        return list(cancelled)
+
+    assert asyncio.run(run()) == [GEMINI_MODELS[0]]
+    assert started == [GEMINI_MODELS[0]]
+
+
+def test_hedge_wins_and_cancels_primary(monkeypatch):
+    monkeypatch.setattr(GeminiGateway, "_hedge_delay", lambda self, model_id: 0.01)
+    gateway = make_gateway()
+    cancelled = []
+
+    async def task(model_id):
+        if model_id == GEMINI_MODELS[0]:
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                cancelled.append(model_id)
+                raise
+        return model_id
+
+    async def run():
+        winner = await gateway.run(task, hedge=True)
+        await asyncio.sleep(0.01)
+        return winner, list(cancelled)
+
+    assert asyncio.run(run()) == (GEMINI_MODELS[1], [GEMINI_MODELS[0]])
+
+
+def test_malformed_response_counts_as_breaker_failure():
+    gateway = make_gateway(hedge=False)
+    model_id = GEMINI_MODELS[0]
+
+    async def no_text(model_id):
+        return None.strip()     # what response.text.strip() does on a blocked answer
+
+    with pytest.raises(AttributeError):
+        asyncio.run(gateway.run(no_text))
+    assert gateway.breaker.health()[model_id]["recent_calls"] == 1
+    assert gateway.breaker.health()[model_id]["health_score"] == 0.0
+    assert "NoneType" in gateway.breaker.health()[model_id]["last_error"]
+
+
+def test_caller_error_is_no_verdict_on_the_model():
+    gateway = make_gateway(hedge=False)
+    model_id = GEMINI_MODELS[0]
+
+    async def bad_request(model_id):
+        raise genai_errors.ClientError(400, {"error": {"message": "bad image", "status": "INVALID_ARGUMENT"}})
+
+    with pytest.raises(genai_errors.ClientError):
+        asyncio.run(gateway.run(bad_request))
+    assert gateway.breaker.health()[model_id]["recent_calls"] == 0
+
+
+def test_composite_task_times_and_charges_each_round_trip(monkeypatch):
+    monkeypatch.setattr(circuit_breaker, "SLOW_CALL_SEC", 0.05)
+    gateway = make_gateway(hedge=False)
+    model_id = GEMINI_MODELS[0]
+    tokens = gateway.router.snapshot()[model_id]["minute_tokens"]
+
+    async def answer():
+        return "ok"
+
+    async def chat(model_id):
+        await gateway.step(model_id, answer, charge=False)
+        await asyncio.sleep(0.1)        # slow tool I/O between model calls
+        return await gateway.step(model_id, answer)
+
+    assert asyncio.run(gateway.run(chat, composite=True)) == "ok"
+    health = gateway.breaker.health()[model_id]
+    assert health["recent_calls"] == 2 and health["health_score"] == 1.0
+    assert gateway.router.snapshot()[model_id]["minute_tokens"] == pytest.approx(tokens - 2, abs=0.1)
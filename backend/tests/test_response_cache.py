@@ -0,0 +1,72 @@
+import asyncio
+import os
+import time
+
+from response_cache import ResponseCache, cache_key
+from scheme_navigator import is_ranking_reply
+
+
+def test_disk_tier_survives_restart(tmp_path):
+    async def upper(prompt):
+        return prompt.upper()
+
+    async def run():
+        cached = ResponseCache(cache_dir=str(tmp_path)).wrap(upper, ttl=60, site="test")
+        await cached("hello", "English")
+        restarted = ResponseCache(cache_dir=str(tmp_path))
+        return await restarted.get(cache_key("hello", "English")), restarted.stats()
+
+    value, stats = asyncio.run(run())
+    assert value == "HELLO"
+    assert stats["disk_hits"] == 1
+
+
+def test_sweep_drops_expired_and_trims_oldest(tmp_path):
+    cache = ResponseCache(cache_dir=str(tmp_path), max_disk_entries=3)
+    cache._disk_set(cache_key("stale"), "x", expires_at=0, site="test")
+    for i in range(5):
+        key = cache_key(f"p{i}")
+        cache._disk_set(key, f"v{i}", expires_at=time.time() + 60, site="test")
+        os.utime(cache._path(key), (i, i))     # distinct write order
+
+    result = cache._sweep_disk()
+
+    assert result == {"entries": 3, "bytes": result["bytes"], "expired": 1, "evicted": 2}
+    remaining = sorted(
+        name for _, _, names in os.walk(tmp_path) for name in names if name.endswith(".json")
+    )
+    assert remaining == sorted(f"{cache_key(f'p{i}')}.json" for i in (2, 3, 4))
+
+
+def test_writes_past_the_cap_trigger_a_sweep(tmp_path):
+    async def run():
+        cache = ResponseCache(cache_dir=str(tmp_path), max_disk_entries=2)
+        for i in range(4):
+            await cache.set(cache_key(f"p{i}"), f"v{i}", ttl=60)
+            if cache._sweep_task:
+                await cache._sweep_task
+        return cache.stats()
+
+    stats = asyncio.run(run())
+    assert stats["disk_sweeps"] >= 2
+    assert stats["disk_entries"] <= 2
+
+
+def test_rejected_replies_are_returned_but_not_cached(tmp_path):
+    replies = iter(["not json", "", '{"ranked_schemes": []}', "unused"])
+    calls = []
+
+    async def text(prompt):
+        calls.append(prompt)
+        return next(replies)
+
+    async def run():
+        cache = ResponseCache(cache_dir=str(tmp_path))
+        cached = cache.wrap(text, ttl=60, site="scheme_ranking", validate=is_ranking_reply)
+        answers = [await cached("rank") for _ in range(4)]
+        return answers, cache.stats()["sites"]["scheme_ranking"]
+
+    answers, site = asyncio.run(run())
+    assert answers == ["not json", "", '{"ranked_schemes": []}', '{"ranked_schemes": []}']
+    assert len(calls) == 3
+    assert site["rejected"] == 2
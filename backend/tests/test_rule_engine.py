@@ -0,0 +1,122 @@
+import json
+import os
+
+import pytest
+
+from conftest import open_meteo_payload
+from rule_engine import RuleEngine, RuleSyntaxError, compile_threshold
+from weather_scout import WeatherScout
+from weather_service import parse_forecast
+
+CALENDAR = os.path.join(os.path.dirname(os.path.dirname(__file__)), "crop_calendar.json")
+
+
+def tomorrow(current=None, days=None, **daily):
+    """Forecast whose day 1 has the given daily values (Open-Meteo names)."""
+    payload = open_meteo_payload()
+    for name, value in daily.items():
+        payload["daily"][name][1] = value
+    for name, values in (days or {}).items():
+        payload["daily"][name][:len(values)] = values
+    payload["current"].update(current or {})
+    return parse_forecast(payload)
+
+
+def titles(forecast, lang="English", crop=None):
+    return [a["title"] for a in WeatherScout(text_fn=None)._generate_alerts(forecast, lang, crop)]
+
+
+def test_calm_hot_day():
+    # Default payload: 34.5 / 21 °C, no rain, light wind, 40 % humidity, 31.4 °C now
+    assert titles(tomorrow()) == ["Irrigation Needed", "Good Spray Window"]
+
+
+@pytest.mark.parametrize("daily,title", [
+    ({"temperature_2m_min": 2.0}, "Frost Risk"),
+    ({"temperature_2m_max": 42.0}, "Extreme Heat"),
+    ({"precipitation_sum": 30.0}, "Heavy Rainfall"),
+])
+def test_danger_alert_closes_the_spray_window(daily, title):
+    fired = titles(tomorrow(**daily))
+    assert fired[0] == title
+    assert "Good Spray Window" not in fired
+
+
+def test_thresholds_are_inclusive_on_the_danger_side():
+    assert "Frost Risk" not in titles(tomorrow(temperature_2m_min=2.1))
+    assert "Extreme Heat" not in titles(tomorrow(temperature_2m_max=41.9))
+    assert "Heavy Rainfall" not in titles(tomorrow(precipitation_sum=29.9))
+
+
+def test_rain_likely_excludes_heavy_rain():
+    assert "Rain Likely Tomorrow" in titles(tomorrow(precipitation_probability_max=70, precipitation_sum=5.0))
+    fired = titles(tomorrow(precipitation_probability_max=90, precipitation_sum=30.0))
+    assert "Heavy Rainfall" in fired and "Rain Likely Tomorrow" not in fired
+
+
+def test_caution_alerts_leave_the_spray_gate_to_its_own_clauses():
+    fired = titles(tomorrow(wind_speed_10m_max=25.0))
+    assert "Strong Winds" in fired and "Good Spray Window" not in fired     # wind < 15 fails
+    fired = titles(tomorrow(current={"relative_humidity_2m": 85}, temperature_2m_min=20.0))
+    assert "Disease Risk — High Humidity" in fired and "Good Spray Window" not in fired
+
+
+def test_irrigation_needs_three_dry_days_and_heat():
+    assert "Irrigation Needed" not in titles(tomorrow(days={"precipitation_sum": [0.0, 0.0, 1.0]}))
+    assert "Irrigation Needed" not in titles(tomorrow(current={"temperature_2m": 29.9}))
+
+
+def test_hindi_titles():
+    assert titles(tomorrow(temperature_2m_min=1.0), lang="Hindi")[0] == "पाला पड़ने का खतरा"
+
+
+def write_rules(path, rules):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"weather_farming_rules": rules}, f, ensure_ascii=False)
+
+
+@pytest.fixture
+def rules():
+    with open(CALENDAR, "r", encoding="utf-8") as f:
+        return json.load(f)["weather_farming_rules"]
+
+
+def test_crop_thresholds_override(tmp_path, rules):
+    heat = next(r for r in rules if r["condition"] == "extreme_heat")
+    heat["crop_thresholds"] = {"Wheat": "temp_max >= 35"}
+    path = tmp_path / "calendar.json"
+    write_rules(path, rules)
+    engine = RuleEngine(str(path))
+    facts = {"temp_min": 21.0, "temp_max": 36.0, "rain_mm": 0.0, "rain_prob": 10.0, "wind_speed": 12.0,
+             "humidity": 40, "temp": 31.4, "no_rain_days": 3, "danger_alerts": 0}
+
+    assert "Extreme Heat" in [a["title"] for a in engine.evaluate(facts, crop="wheat")]
+    plain = [a["title"] for a in engine.evaluate(facts, crop="rice")]
+    assert "Extreme Heat" not in plain and "Good Spray Window" in plain
+
+
+def test_bad_edit_keeps_the_last_good_rules(tmp_path, rules):
+    path = tmp_path / "calendar.json"
+    write_rules(path, rules)
+    engine = RuleEngine(str(path))
+    good = engine.rules()
+
+    rules[0]["threshold"] = "temp_min <=> 2"
+    write_rules(path, rules)
+    os.utime(path, (1, 1))
+    engine._next_check = 0.0
+    assert engine.rules() is good
+    assert "Cannot parse clause" in engine.stats()["last_error"]
+
+    rules[0]["threshold"] = "temp_min <= 4"
+    write_rules(path, rules)
+    os.utime(path, (2, 2))
+    engine._next_check = 0.0
+    assert engine.rules()[0].threshold == "temp_min <= 4"
+    assert engine.stats()["last_error"] is None
+
+
+@pytest.mark.parametrize("text", ["temp_min <= ", "soil_moisture > 3", "temp_min <= 2 OR temp_max >= 42"])
+def test_compile_threshold_rejects(text):
+    with pytest.raises(RuleSyntaxError):
+        compile_threshold(text)
@@ -0,0 +1,100 @@
+import asyncio
+import threading
+
+from intent_router import find_entities
+from semantic_cache import SemanticCache
+
+KCC_SBI = "what documents are needed for kisan credit card application at SBI bank"
+KCC_PNB = "what documents are needed for kisan credit card application at PNB bank"
+
+
+def make_cache(**kwargs):
+    return SemanticCache(entities_fn=find_entities, **kwargs)
+
+
+def test_reworded_question_hits():
+    cache = make_cache()
+    cache.set("PM kisan kitna paisa", "₹6,000 a year")
+    assert cache.get("how much money PM-KISAN gives") == "₹6,000 a year"
+    assert cache.get("pm kisan me kitna paisa milta hai") == "₹6,000 a year"
+
+
+def test_swapped_bank_misses():
+    cache = make_cache()
+    cache.set(KCC_SBI, "SBI answer")
+    assert cache.get(KCC_PNB) is None
+    assert cache.get(KCC_SBI) == "SBI answer"
+
+
+def test_swapped_scheme_crop_state_and_city_miss():
+    cache = make_cache()
+    pairs = [
+        ("how much money PM kisan gives", "how much money PM Kisan Maan Dhan gives"),
+        ("best sowing time for wheat in Rajasthan", "best sowing time for mustard in Rajasthan"),
+        ("best sowing time for wheat in Rajasthan", "best sowing time for wheat in Punjab"),
+        ("soil testing lab near Jodhpur for my farm", "soil testing lab near Jaipur for my farm"),
+    ]
+    for stored, asked in pairs:
+        cache.set(stored, stored)
+        assert cache.get(asked) is None, asked
+
+
+def test_numbers_must_match():
+    cache = make_cache()
+    cache.set("subsidy for 2 acre drip irrigation", "2 acre answer")
+    assert cache.get("subsidy for 5 acre drip irrigation") is None
+
+
+def test_lookups_during_writes_and_growth():
+    cache = make_cache(max_entries=4096)
+    errors = []
+
+    def writer():
+        for i in range(3000):
+            cache.set(f"question number {i} about fertilizer dose", f"answer {i}")
+
+    def reader():
+        try:
+            for i in range(3000):
+                cache.get(f"question number {i % 50} about fertilizer dose")
+        except Exception as e:      # IndexError from a half-grown matrix
+            errors.append(e)
+
+    threads = [threading.Thread(target=writer)] + [threading.Thread(target=reader) for _ in range(3)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert errors == []
+
+
+def test_follow_up_turns_skip_the_cache(monkeypatch):
+    import main
+
+    cache = make_cache()
+    cache.set("what about for wheat", "answer stored for someone else's question")
+    monkeypatch.setattr(main, "semantic_cache", cache)
+    request = main.ChatRequest(message="what about for wheat")
+    history = [{"role": "user", "parts": [{"text": "kcc interest rate"}]}]
+
+    assert asyncio.run(main._cached_answer(request, None, history)) is None
+    assert asyncio.run(main._cached_answer(request, None, None)) is not None
+
+
+def test_closer_row_with_other_entities_does_not_hide_a_match():
+    question = "documents needed to apply for kisan credit card loan at SBI bank branch in village"
+    cache = make_cache()
+    # ~0.93 similar but names another bank; the SBI row is ~0.92 similar
+    cache.set(question.replace("SBI", "PNB"), "PNB answer")
+    cache.set(question.replace(" branch", ""), "SBI answer")
+    assert cache.get(question) == "SBI answer"
+
+
+def test_guard_ids_are_released_when_rows_are_overwritten():
+    cache = make_cache(max_entries=4)
+    for i in range(20):
+        cache.set(f"msp of wheat in {2000 + i}", f"answer {i}")
+    index = cache.indexes["en"]
+    assert len(index._guard_id) == len(index._guard_uses) == 4
+    assert cache.get("msp of wheat in 2019") == "answer 19"
+    assert cache.get("msp of wheat in 2003") is None
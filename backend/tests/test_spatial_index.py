@@ -0,0 +1,53 @@
+import math
+
+import numpy as np
+import pytest
+
+from spatial_index import EARTH_RADIUS_KM, SpatialIndex
+
+
+def haversine_km(lat1, lon1, lat2, lon2):
+    lat1, lon1, lat2, lon2 = map(np.radians, (lat1, lon1, lat2, lon2))
+    a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(a))
+
+
+@pytest.fixture(scope="module")
+def points():
+    rng = np.random.default_rng(3)
+    lats = np.degrees(np.arcsin(rng.uniform(-1, 1, 2000)))     # uniform over the sphere
+    lons = rng.uniform(-180, 180, 2000)
+    # Points that only a wrap-aware distance finds: across the antimeridian and at the poles
+    lats = np.concatenate([lats, [10.0, -10.0, 89.9, -89.9]])
+    lons = np.concatenate([lons, [179.9, -179.9, 0.0, 120.0]])
+    return [f"p{i}" for i in range(len(lats))], lats, lons
+
+
+def brute_force(points, lat, lon):
+    _, lats, lons = points
+    km = haversine_km(lat, lon, lats, lons)
+    return float(km.min())
+
+
+def test_nearest_matches_brute_force(points):
+    index = SpatialIndex(*points)
+    rng = np.random.default_rng(4)
+    queries = list(zip(np.degrees(np.arcsin(rng.uniform(-1, 1, 300))), rng.uniform(-180, 180, 300)))
+    queries += [(10.0, -179.95), (-10.0, 179.95), (90.0, 0.0), (-90.0, -45.0), (89.95, 180.0)]
+
+    for lat, lon in queries:
+        _, near_lat, near_lon, km = index.nearest(lat, lon)
+        expected = brute_force(points, lat, lon)
+        assert km == pytest.approx(expected, abs=1e-3)
+        assert haversine_km(lat, lon, near_lat, near_lon) == pytest.approx(expected, abs=1e-3)
+        assert math.isfinite(km)
+
+
+def test_antimeridian_neighbour_is_found(points):
+    _, _, near_lon, km = SpatialIndex(*points).nearest(10.0, -179.95)
+    assert near_lon == pytest.approx(179.9)
+    assert km < 20
+
+
+def test_empty_index():
+    assert SpatialIndex([], [], []).nearest(26.3, 73.0) is None
@@ -0,0 +1,43 @@
+from datetime import datetime
+
+import numpy as np
+
+from task_windows import TASK_PROFILES, find_windows, plan_task, score_hours
+
+
+def day(temp_max=34.0, temp=30.0, rain_total=0.0):
+    return {
+        "hour": np.arange(24, dtype=np.int8),
+        "temp": np.full(24, temp),
+        "humidity": np.full(24, 60.0),
+        "rain_prob": np.full(24, 10.0),
+        "wind": np.full(24, 8.0),
+        "temp_max": temp_max, "temp_min": 22.0, "rain_total": rain_total, "rain_prob_max": 10,
+    }
+
+
+def hour_of(slot):
+    return datetime.strptime(slot["time"], "%I:%M %p").hour
+
+
+def test_very_hot_day_gets_two_sessions_from_one_long_run():
+    view = day(temp_max=38.5, temp=38.0)
+    scores, _ = score_hours(view, TASK_PROFILES["irrigation"])
+    assert len(find_windows(scores, view["hour"], 90)) == 1
+
+    plan = plan_task(view, "irrigation", "wheat")
+    assert plan["times_today"] == 2
+    first, second = (hour_of(slot) for slot in plan["schedule"])
+    assert second - first >= TASK_PROFILES["irrigation"]["min_gap"]
+    assert all(slot["duration_minutes"] == 90 for slot in plan["schedule"])
+
+
+def test_ordinary_day_keeps_one_session():
+    plan = plan_task(day(), "irrigation", "wheat")
+    assert plan["times_today"] == 1
+    assert hour_of(plan["schedule"][0]) == 5
+
+
+def test_rainy_day_skips_irrigation():
+    plan = plan_task(day(rain_total=15.0), "irrigation", "wheat")
+    assert plan["skip_today"] and plan["schedule"] == []
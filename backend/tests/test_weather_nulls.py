@@ -0,0 +1,98 @@
+from collections import OrderedDict
+
+import pytest
+from fastapi.testclient import TestClient
+
+import main
+import weather_service
+from advisory_buckets import UNKNOWN, fill_template, is_advisory_template, rain_class, temp_band, wind_class
+from response_cache import ResponseCache
+
+
+@pytest.fixture
+def client(monkeypatch, payload):
+    async def get_json(path, params):
+        return payload
+
+    async def text(prompt):
+        return "Expect {temp_max}°C tomorrow in {city}, rain chance {rain_prob}%."
+
+    monkeypatch.setattr(weather_service.open_meteo, "get_json", get_json)
+    monkeypatch.setattr(main.weather_scout, "text", text)
+    monkeypatch.setattr(main.weather_service.forecasts, "_entries", OrderedDict())
+    return TestClient(main.app)
+
+
+def test_bucket_functions_accept_none():
+    assert temp_band(None) == UNKNOWN
+    assert wind_class(None) == UNKNOWN
+    assert rain_class(None, None) == UNKNOWN
+    assert rain_class(None, 80) == "rain likely"
+    assert rain_class(35.0, None) == "heavy rain"
+
+
+def test_fill_template_rejects_invented_placeholders():
+    assert fill_template("{city}: {temp}°C", {"city": "Pali", "temp": None}) == "Pali: –°C"
+    with pytest.raises(ValueError):
+        fill_template("{city} soil moisture {soil_moisture}", {"city": "Pali"})
+
+
+@pytest.mark.parametrize("section,variable", [
+    ("daily", "precipitation_probability_max"),
+    ("daily", "precipitation_sum"),
+    ("daily", "temperature_2m_max"),
+    ("daily", "wind_speed_10m_max"),
+    ("current", "temperature_2m"),
+])
+def test_weather_with_null_value(client, payload, section, variable):
+    if section == "daily":
+        payload["daily"][variable][1] = None        # tomorrow
+    else:
+        payload["current"][variable] = None
+
+    response = client.post("/weather", json={"city": "Jodhpur", "state": "Rajasthan"})
+    assert response.status_code == 200, response.text
+    body = response.json()
+    assert body["status"] == "success"
+    assert body["advisory"]
+    assert "{" not in body["advisory"]
+
+
+def test_invented_placeholder_uses_fallback(client, monkeypatch):
+    async def text(prompt):
+        return "Irrigate at {best_hour} in {city}."
+
+    monkeypatch.setattr(main.weather_scout, "text", text)
+    body = client.post("/weather", json={"city": "Jodhpur", "state": "Rajasthan"}).json()
+    assert body["advisory"].startswith("Current temperature in Jodhpur")
+
+
+@pytest.mark.parametrize("reply,usable", [
+    ("Expect {temp_max}°C in {city}; rain chance {rain_prob}%.", True),
+    ("{city}: {rain_mm} mm expected, wind {wind} km/h.", True),
+    ("Irrigate at {best_hour} in {city}.", False),
+    ("Expect 38°C in {city} tomorrow.", False),
+    ("Rain chance 70 % — cover the harvest.", False),
+    ("About 12mm of rain expected.", False),
+    ("कल {city} में 40 डिग्री तक तापमान रहेगा।", False),
+])
+def test_advisory_template_validation(reply, usable):
+    assert is_advisory_template(reply) is usable
+
+
+def test_literal_values_use_fallback_and_are_not_cached(client, monkeypatch, tmp_path):
+    calls = []
+
+    async def text(prompt):
+        calls.append(prompt)
+        return "Expect 38°C in {city} tomorrow."
+
+    cache = ResponseCache(cache_dir=str(tmp_path))
+    monkeypatch.setattr(
+        main.weather_scout, "text",
+        cache.wrap(text, ttl=3600, site="weather_advisory", validate=is_advisory_template),
+    )
+    for _ in range(2):
+        body = client.post("/weather", json={"city": "Jodhpur", "state": "Rajasthan"}).json()
+        assert body["advisory"].startswith("Current temperature in Jodhpur")
+    assert len(calls) == 2
@@ -0,0 +1,140 @@
+"""
+NEER — Compact tool result payloads
+Projects agent results down to the fields the chat model actually needs
+before they are sent back through Part.from_function_response.
+
+The full WeatherScout / SchemeNavigator responses are built for the UI
+(7-day forecast with emojis and labels, full apply_steps, tags). For the
+model we keep only the facts it phrases an answer from, at progressively
+coarser levels until the payload fits TOOL_RESULT_TOKEN_BUDGET.
+
+Token counts are a local estimate (no API call): ~4 ASCII characters per
+token, ~2 characters per token for Devanagari and other scripts.
+"""
+
+import json
+import os
+
+TOOL_RESULT_TOKEN_BUDGET = int(os.getenv("TOOL_RESULT_TOKEN_BUDGET", "600"))
+
+# Per-tool before/after token totals, for /internal/tool-payloads
+_stats = {}
+
+
+def estimate_tokens(data) -> int:
+    """Rough token count of a JSON-serialised payload."""
+    text = json.dumps(data, ensure_ascii=False, separators=(",", ":"))
+    ascii_chars = sum(1 for ch in text if ord(ch) < 128)
+    return ascii_chars // 4 + (len(text) - ascii_chars) // 2 + 1
+
+
+def _truncate(text: str, limit: int) -> str:
+    if not text or len(text) <= limit:
+        return text
+    return text[:limit - 1].rstrip() + "…"
+
+
+# ============================================================
+# PROJECTIONS — level 0 is the richest, higher levels are coarser
+# ============================================================
+
+def _project_weather(res: dict, level: int) -> dict:
+    if res.get("status") != "success":
+        return {"status": res.get("status"), "message": res.get("message")}
+
+    days = (3, 2, 1)[level]
+    current = res["current"]
+    payload = {
+        "city": res["city"],
+        "state": res["state"],
+        "current": {
+            "temp": current["temp"],
+            "feels_like": current["feels_like"],
+            "humidity": current["humidity"],
+            "wind_kmh": current["wind_speed"],
+            "conditions": current["weather_label"],
+        },
+        "forecast": [
+            {
+                "date": d["date"],
+                "max": d["temp_max"],
+                "min": d["temp_min"],
+                "rain_mm": d["rain_mm"],
+                "rain_prob": d["rain_prob"],
+                "wind_max": d["wind_max"],
+            }
+            for d in res["forecast"][:days]
+        ],
+        "season_activity": res["season"]["current_activity"],
+    }
+    if level < 2:
+        payload["alerts"] = [{"type": a["type"], "title": a["title"], "advice": a["message"]} for a in res["alerts"]]
+    else:
+        payload["alerts"] = [f"{a['type']}: {a['title']}" for a in res["alerts"]]
+    return payload
+
+
+def _project_schemes(res: dict, level: int) -> dict:
+    if res.get("status") != "success":
+        return {"status": res.get("status"), "message": res.get("message")}
+
+    top_n, benefit_chars = ((8, 160), (5, 80), (3, 0))[level]
+    schemes = []
+    for s in res["schemes"][:top_n]:
+        entry = {"id": s["id"], "name": s["name"], "tier": s["tier"], "short": s["short"]}
+        if benefit_chars:
+            entry["benefits"] = _truncate(s["benefits"], benefit_chars)
+        if s.get("apply_url"):
+            entry["apply_url"] = s["apply_url"]
+        schemes.append(entry)
+    return {
+        "total_eligible": res["total_schemes"],
+        "summary": res.get("summary"),
+        "schemes": schemes,
+    }
+
+
+PROJECTIONS = {
+    "get_weather_update": _project_weather,
+    "find_government_schemes": _project_schemes,
+}
+MAX_LEVEL = 2
+
+
+def compact_tool_result(name: str, res_data: dict, budget: int = None) -> dict:
+    """
+    Project a tool result for the model, coarsening until it fits budget
+    tokens (the coarsest level is returned even if still over budget).
+    """
+    budget = budget or TOOL_RESULT_TOKEN_BUDGET
+    before = estimate_tokens(res_data)
+    project = PROJECTIONS.get(name)
+    if project is None:
+        return res_data
+
+    for level in range(MAX_LEVEL + 1):
+        payload = project(res_data, level)
+        after = estimate_tokens(payload)
+        if after <= budget:
+            break
+
+    stats = _stats.setdefault(name, {"calls": 0, "tokens_before": 0, "tokens_after": 0, "over_budget": 0})
+    stats["calls"] += 1
+    stats["tokens_before"] += before
+    stats["tokens_after"] += after
+    stats["over_budget"] += after > budget
+    print(f"[TOOL PAYLOAD] {name}: ~{before} → ~{after} tokens (level {level}, budget {budget})")
+    return payload
+
+
+def payload_stats() -> dict:
+    """Average estimated tokens per tool result, before and after projection."""
+    report = {"budget": TOOL_RESULT_TOKEN_BUDGET, "tools": {}}
+    for name, s in _stats.items():
+        report["tools"][name] = {
+            **s,
+            "avg_before": round(s["tokens_before"] / s["calls"], 1),
+            "avg_after": round(s["tokens_after"] / s["calls"], 1),
+            "reduction": round(1 - s["tokens_after"] / s["tokens_before"], 3) if s["tokens_before"] else 0.0,
+        }
+    return report
@@ -0,0 +1,90 @@
+"""
+NEER — Forecast Prefetch
+Keeps the forecast cache warm so interactive /weather requests are cache reads.
+
+Once per hourly model update, the forecasts for every location in scope
+are pulled in a handful of bulk Open-Meteo requests (comma-separated
+latitude/longitude lists, PREFETCH_CHUNK_SIZE locations each) and written
+into the ForecastCache.
+
+Scope (PREFETCH_SCOPE):
+  active — cells of farmers who logged in recently + cells the cache
+           served recently (default; stays well inside the free tier)
+  all    — every city in crop_calendar.json (~480 → 10 requests/hour)
+  off    — no prefetching
+"""
+
+import asyncio
+import os
+import time
+
+from forecast_cache import UPDATE_OFFSET_SEC, next_update
+
+PREFETCH_SCOPE = os.getenv("PREFETCH_SCOPE", "active")
+PREFETCH_CHUNK_SIZE = int(os.getenv("PREFETCH_CHUNK_SIZE", "50"))
+ACTIVE_WINDOW_SEC = 24 * 3600      # "Recently" for cache cells and user logins
+RETRY_AFTER_FAILURE_SEC = 5 * 60
+
+
+class ForecastPrefetcher:
+    """
+    Scheduled bulk fetcher that fills a ForecastCache.
+
+    Uses functions injected at init:
+      - async bulk_fetch_fn([(lat, lon), ...]) -> [forecast, ...]  (same order)
+      - locations_fn() -> [(lat, lon), ...]   locations to keep warm
+    """
+
+    def __init__(self, cache, bulk_fetch_fn, locations_fn, chunk_size: int = PREFETCH_CHUNK_SIZE):
+        self.cache = cache
+        self.bulk_fetch = bulk_fetch_fn
+        self.locations = locations_fn
+        self.chunk_size = chunk_size
+        self._stats = {"runs": 0, "requests": 0, "locations": 0, "failed_chunks": 0}
+        self.last_run = None
+
+    async def prefetch(self, coords: list) -> int:
+        """Fetch and cache forecasts for coords; returns how many cells were filled."""
+        # One fetch per cache cell — nearby cities share a forecast
+        cells = list(dict.fromkeys(self.cache.key(lat, lon) for lat, lon in coords))
+        start = time.monotonic()
+        filled = 0
+        for i in range(0, len(cells), self.chunk_size):
+            chunk = cells[i:i + self.chunk_size]
+            self._stats["requests"] += 1
+            try:
+                forecasts = await self.bulk_fetch(chunk)
+            except Exception as e:
+                self._stats["failed_chunks"] += 1
+                print(f"[PREFETCH] Chunk of {len(chunk)} failed: {e}")
+                continue
+            for (lat, lon), forecast in zip(chunk, forecasts):
+                self.cache.put(lat, lon, forecast)
+            filled += len(chunk)
+
+        self._stats["runs"] += 1
+        self._stats["locations"] += filled
+        self.last_run = {
+            "cells": len(cells),
+            "filled": filled,
+            "requests": -(-len(cells) // self.chunk_size),
+            "duration_sec": round(time.monotonic() - start, 2),
+        }
+        print(f"[PREFETCH] Warmed {filled}/{len(cells)} cells in {self.last_run['requests']} requests")
+        return filled
+
+    async def run_forever(self):
+        """Prefetch now, then shortly after every hourly model update."""
+        while True:
+            try:
+                await self.prefetch(self.locations())
+                ok = self.last_run["filled"] == self.last_run["cells"]
+            except Exception as e:
+                print(f"[PREFETCH] Run failed: {e}")
+                ok = False
+            now = time.time()
+            wake_at = next_update(now) if ok else now + RETRY_AFTER_FAILURE_SEC
+            await asyncio.sleep(max(wake_at - now, UPDATE_OFFSET_SEC / 5))
+
+    def stats(self) -> dict:
+        return {**self._stats, "scope": PREFETCH_SCOPE, "last_run": self.last_run}
@@ -4,11 +4,19 @@ Live weather intelligence for Indian farmers.
 
 Pipeline:
   Step 1: FETCH WEATHER — Open-Meteo API (free, no key needed)
-    → Current conditions + 7-day forecast
+    → Current conditions + 7-day forecast, via WeatherService
+    → City names resolved fuzzily — aliases, typos, Devanagari (city_resolver.py)
+    → GPS coordinates snap to the nearest known location (spatial_index.py)
+    → Cached per ~11 km cell until the next hourly model update
+      (stale-while-revalidate, last known forecast if the API is down)
   Step 2: FARMING ALERTS — rule-based analysis (no API call)
-    → Color-coded alerts based on thresholds
+    → Color-coded alerts from weather_farming_rules (rule_engine.py)
   Step 3: AI ADVISORY — Gemini text call
     → Personalized farming advice based on weather + season
+    → Prompted on bucketed features, one cached advisory per bucket
+
+Tool mode (get_weather_data) runs Steps 1–2 only, for callers such as
+the chat orchestrator that phrase the answer themselves.
 
 Alert Tiers:
   🔴 danger       — frost, heavy rain, extreme heat
@@ -19,10 +27,16 @@ Alert Tiers:
 
 import json
 import os
-import urllib.request
-import urllib.parse
 from datetime import datetime, timezone
 
+from advisory_buckets import (
+    AdvisoryBucketStats, advisory_features, advisory_prompt, fill_template, template_values,
+)
+from city_resolver import CityResolver, CITY_ALIASES
+from rule_engine import weather_rules, weather_facts
+from spatial_index import SpatialIndex
+from weather_service import WeatherService
+
 # ============================================================
 # LOAD CROP CALENDAR KB
 # ============================================================
@@ -34,13 +48,38 @@ with open(_CALENDAR_PATH, "r", encoding="utf-8") as f:
 CITY_COORDS = CALENDAR_KB["city_coordinates"]
 STATE_CITY = CALENDAR_KB["state_default_city"]
 SEASONS = CALENDAR_KB["seasons"]
-WEATHER_RULES = CALENDAR_KB["weather_farming_rules"]
+
+# GPS fixes within this distance of a known location use its coordinates,
+# so every farmer around a town shares one cached forecast
+GPS_SNAP_KM = float(os.getenv("GPS_SNAP_KM", "15"))
+# Optional extra points (e.g. village centroids): CSV with name,lat,lon columns
+GAZETTEER_PATH = os.getenv("GAZETTEER_PATH", "")
+
+
+def _build_location_index() -> SpatialIndex:
+    names = list(CITY_COORDS)
+    lats = [c["lat"] for c in CITY_COORDS.values()]
+    lons = [c["lon"] for c in CITY_COORDS.values()]
+    if GAZETTEER_PATH:
+        import csv
+        with open(GAZETTEER_PATH, "r", encoding="utf-8", newline="") as f:
+            for row in csv.DictReader(f):
+                names.append(row["name"])
+                lats.append(float(row["lat"]))
+                lons.append(float(row["lon"]))
+        print(f"[WEATHER SCOUT] Loaded gazetteer: {len(names) - len(CITY_COORDS)} extra locations")
+    return SpatialIndex(names, lats, lons)
+
+
+LOCATION_INDEX = _build_location_index()
+CITY_RESOLVER = CityResolver(CITY_COORDS, CITY_ALIASES)
 
 
 def _get_coordinates(city: str, state: str = None):
-    """Get lat/lon for a city. Falls back to state default."""
-    if city and city in CITY_COORDS:
-        return CITY_COORDS[city]
+    """Get lat/lon for a city (fuzzy match). Falls back to state default."""
+    match = CITY_RESOLVER.resolve(city) if city else None
+    if match:
+        return CITY_COORDS[match[0]]
     if state and state in STATE_CITY:
         default_city = STATE_CITY[state]
         if default_city in CITY_COORDS:
@@ -49,46 +88,28 @@ def _get_coordinates(city: str, state: str = None):
     return CITY_COORDS.get("New Delhi", {"lat": 28.61, "lon": 77.21})
 
 
-def _get_weather_emoji(code: int) -> str:
-    """Map WMO weather code to emoji."""
-    if code <= 1:
-        return "☀️"
-    elif code <= 3:
-        return "⛅"
-    elif code <= 48:
-        return "🌫️"
-    elif code <= 55:
-        return "🌧️"
-    elif code <= 65:
-        return "🌧️"
-    elif code <= 67:
-        return "🌨️"
-    elif code <= 75:
-        return "❄️"
-    elif code <= 77:
-        return "🌨️"
-    elif code <= 82:
-        return "🌧️"
-    elif code <= 86:
-        return "❄️"
-    elif code <= 99:
-        return "⛈️"
-    return "🌤️"
-
-
-def _get_weather_label(code: int) -> str:
-    """Map WMO weather code to label."""
-    labels = {
-        0: "Clear sky", 1: "Mainly clear", 2: "Partly cloudy", 3: "Overcast",
-        45: "Foggy", 48: "Depositing rime fog",
-        51: "Light drizzle", 53: "Moderate drizzle", 55: "Dense drizzle",
-        61: "Slight rain", 63: "Moderate rain", 65: "Heavy rain",
-        66: "Light freezing rain", 67: "Heavy freezing rain",
-        71: "Slight snow", 73: "Moderate snow", 75: "Heavy snow",
-        80: "Slight rain showers", 81: "Moderate rain showers", 82: "Violent rain showers",
-        95: "Thunderstorm", 96: "Thunderstorm with hail", 99: "Thunderstorm with heavy hail"
-    }
-    return labels.get(code, "Partly cloudy")
+def _resolve_location(city: str, state: str = None, lat: float = None, lon: float = None):
+    """
+    (name, coords, location_info). A GPS fix within GPS_SNAP_KM of a known
+    location snaps to it (name and coords); farther away the fix keeps its
+    own coords and a neutral "lat, lon" name, with the nearest known name
+    only in location_info. Otherwise it's the city / state-default lookup.
+    """
+    if lat is not None and lon is not None:
+        nearest, near_lat, near_lon, km = LOCATION_INDEX.nearest(lat, lon)
+        if km <= GPS_SNAP_KM:
+            name, coords = nearest, {"lat": near_lat, "lon": near_lon}
+        else:
+            name, coords = f"{lat:.2f}, {lon:.2f}", {"lat": lat, "lon": lon}
+        return name, coords, {"source": "gps", **coords, "nearest": nearest, "distance_km": round(km, 1)}
+
+    match = CITY_RESOLVER.resolve(city) if city else None
+    if match:
+        name, score = match
+        coords = CITY_COORDS[name]
+        return name, coords, {"source": "city", **coords, "query": city, "match_score": score}
+    coords = _get_coordinates("", state)
+    return STATE_CITY.get(state, "New Delhi"), coords, {"source": "state_default", **coords}
 
 
 def _get_current_season():
@@ -103,38 +124,72 @@ def _get_current_season():
 class WeatherScout:
     """
     Multi-step weather intelligence agent for farmers.
+
+    Uses text_fn injected at init:
+      - async text_fn(prompt) -> str
+    Forecasts come from weather_service (shared with /farm-advisor);
+    a private WeatherService is created if none is given.
     """
 
-    def __init__(self, text_fn):
+    def __init__(self, text_fn, weather_service: WeatherService = None):
         self.text = text_fn
+        self.weather_service = weather_service or WeatherService()
+        self.advisory_stats = AdvisoryBucketStats()
 
-    def get_weather(self, city: str, state: str, lang: str = "English",
-                    crop_type: str = None) -> dict:
+    async def get_weather(self, city: str, state: str, lang: str = "English",
+                          crop_type: str = None, lat: float = None, lon: float = None) -> dict:
         """
         Run the full weather intelligence pipeline.
         """
+        result, forecast = await self._run_data_steps(city, state, lang, crop_type, lat, lon)
+        if result["status"] != "success":
+            return result
+
+        # ── STEP 3: AI ADVISORY (1 Gemini call) ──
+        print("[WEATHER SCOUT] Step 3: Generating AI farming advisory...")
+        result["agent_steps"].append("ai_advisory")
+
+        season_name = result["season"]["name"]
+        result["advisory"] = await self._generate_advisory(
+            forecast, result["alerts"], season_name, SEASONS[season_name],
+            result["season"]["current_activity"], result["city"], state, lang, crop_type
+        )
+        return result
+
+    async def get_weather_data(self, city: str, state: str, lang: str = "English",
+                               crop_type: str = None, lat: float = None, lon: float = None) -> dict:
+        """
+        Tool mode: deterministic steps only (forecast, alerts, season).
+        No Gemini call — used by the chat orchestrator, whose model writes
+        the prose itself. lat/lon (GPS) take precedence over city/state.
+        """
+        result, _ = await self._run_data_steps(city, state, lang, crop_type, lat, lon)
+        return result
+
+    async def _run_data_steps(self, city: str, state: str, lang: str, crop_type: str,
+                              lat: float, lon: float):
+        """(JSON result, Forecast) — Steps 1–2; the Forecast stays columnar for Step 3."""
         steps_completed = []
-        coords = _get_coordinates(city, state)
-        resolved_city = city if city in CITY_COORDS else STATE_CITY.get(state, "New Delhi")
+        resolved_city, coords, location = _resolve_location(city, state, lat, lon)
 
         # ── STEP 1: FETCH WEATHER (Free API) ──
         print(f"[WEATHER SCOUT] Step 1: Fetching weather for {resolved_city} ({coords['lat']}, {coords['lon']})...")
 
         try:
-            weather_data = self._fetch_open_meteo(coords["lat"], coords["lon"])
+            weather_data, freshness = await self.weather_service.forecast(coords["lat"], coords["lon"])
             steps_completed.append("fetch_weather")
-            print(f"[WEATHER SCOUT] → Weather data received. Current: {weather_data['current']['temp']}°C")
+            print(f"[WEATHER SCOUT] → Weather data received. Current: {weather_data.current['temp']}°C")
         except Exception as e:
             print(f"[WEATHER SCOUT] ✗ API failed: {e}")
             return {
                 "status": "error",
                 "message": f"Could not fetch weather data: {str(e)}",
                 "agent_steps": steps_completed
-            }
+            }, None
 
         # ── STEP 2: FARMING ALERTS (Free — rule-based) ──
         print("[WEATHER SCOUT] Step 2: Analyzing farming alerts...")
-        alerts = self._generate_alerts(weather_data, lang)
+        alerts = self._generate_alerts(weather_data, lang, crop_type)
         steps_completed.append("farming_alerts")
         print(f"[WEATHER SCOUT] → Generated {len(alerts)} alerts")
 
@@ -143,224 +198,44 @@ class WeatherScout:
         month_str = str(datetime.now().month)
         current_activity = season_data["activities"].get(month_str, "General field maintenance")
 
-        # ── STEP 3: AI ADVISORY (1 Gemini call) ──
-        print("[WEATHER SCOUT] Step 3: Generating AI farming advisory...")
-        steps_completed.append("ai_advisory")
-
-        advisory = self._generate_advisory(
-            weather_data, alerts, season_name, season_data,
-            current_activity, resolved_city, state, lang, crop_type
-        )
-
-        # Build response
         return {
             "status": "success",
             "agent_steps": steps_completed,
             "city": resolved_city,
             "state": state,
-            "current": weather_data["current"],
-            "forecast": weather_data["daily"],
+            "location": location,
+            "current": weather_data.current,
+            "forecast": weather_data.daily_rows(),
             "alerts": alerts,
+            "freshness": freshness,
             "season": {
                 "name": season_name,
                 "label": season_data["label"],
                 "crops": season_data["crops"],
                 "current_activity": current_activity
-            },
-            "advisory": advisory
-        }
-
-    def _fetch_open_meteo(self, lat: float, lon: float) -> dict:
-        """Fetch weather from Open-Meteo API."""
-        params = {
-            "latitude": lat,
-            "longitude": lon,
-            "current": "temperature_2m,relative_humidity_2m,apparent_temperature,weather_code,wind_speed_10m,wind_direction_10m",
-            "daily": "weather_code,temperature_2m_max,temperature_2m_min,precipitation_sum,precipitation_probability_max,wind_speed_10m_max,uv_index_max",
-            "timezone": "Asia/Kolkata",
-            "forecast_days": 7
-        }
-        url = f"https://api.open-meteo.com/v1/forecast?{urllib.parse.urlencode(params)}"
-        
-        req = urllib.request.Request(url, headers={"User-Agent": "NEER-FarmerAI/1.0"})
-        with urllib.request.urlopen(req, timeout=10) as resp:
-            data = json.loads(resp.read().decode())
-
-        # Parse current
-        current = {
-            "temp": data["current"]["temperature_2m"],
-            "feels_like": data["current"]["apparent_temperature"],
-            "humidity": data["current"]["relative_humidity_2m"],
-            "wind_speed": data["current"]["wind_speed_10m"],
-            "wind_dir": data["current"]["wind_direction_10m"],
-            "weather_code": data["current"]["weather_code"],
-            "weather_emoji": _get_weather_emoji(data["current"]["weather_code"]),
-            "weather_label": _get_weather_label(data["current"]["weather_code"])
-        }
-
-        # Parse daily forecast
-        daily = []
-        for i in range(len(data["daily"]["time"])):
-            daily.append({
-                "date": data["daily"]["time"][i],
-                "temp_max": data["daily"]["temperature_2m_max"][i],
-                "temp_min": data["daily"]["temperature_2m_min"][i],
-                "rain_mm": data["daily"]["precipitation_sum"][i],
-                "rain_prob": data["daily"]["precipitation_probability_max"][i],
-                "wind_max": data["daily"]["wind_speed_10m_max"][i],
-                "uv_index": data["daily"]["uv_index_max"][i],
-                "weather_code": data["daily"]["weather_code"][i],
-                "weather_emoji": _get_weather_emoji(data["daily"]["weather_code"][i]),
-                "weather_label": _get_weather_label(data["daily"]["weather_code"][i])
-            })
-
-        return {"current": current, "daily": daily}
-
-    def _generate_alerts(self, weather: dict, lang: str) -> list:
-        """Generate color-coded farming alerts based on weather rules."""
-        alerts = []
-        current = weather["current"]
-        daily = weather["daily"]
-
-        # Check tomorrow's forecast if available
-        tomorrow = daily[1] if len(daily) > 1 else daily[0]
-
-        # === DANGER ALERTS ===
-        # Frost risk
-        if tomorrow["temp_min"] <= 2:
-            alerts.append({
-                "type": "danger",
-                "icon": "❄️",
-                "title": "Frost Risk" if lang != "Hindi" else "पाला पड़ने का खतरा",
-                "message": next((r["advice_en"] if lang != "Hindi" else r["advice_hi"])
-                               for r in WEATHER_RULES if r["condition"] == "frost_risk")
-            })
-
-        # Extreme heat
-        if tomorrow["temp_max"] >= 42:
-            alerts.append({
-                "type": "danger",
-                "icon": "🔥",
-                "title": "Extreme Heat" if lang != "Hindi" else "अत्यधिक गर्मी",
-                "message": next((r["advice_en"] if lang != "Hindi" else r["advice_hi"])
-                               for r in WEATHER_RULES if r["condition"] == "extreme_heat")
-            })
-
-        # Heavy rain
-        if tomorrow["rain_mm"] >= 30:
-            alerts.append({
-                "type": "danger",
-                "icon": "🌊",
-                "title": "Heavy Rainfall" if lang != "Hindi" else "भारी बारिश",
-                "message": next((r["advice_en"] if lang != "Hindi" else r["advice_hi"])
-                               for r in WEATHER_RULES if r["condition"] == "heavy_rain")
-            })
-
-        # === CAUTION ALERTS ===
-        # Rain probability
-        if tomorrow["rain_prob"] >= 70 and tomorrow["rain_mm"] < 30:
-            alerts.append({
-                "type": "caution",
-                "icon": "🌧️",
-                "title": "Rain Likely Tomorrow" if lang != "Hindi" else "कल बारिश की संभावना",
-                "message": next((r["advice_en"] if lang != "Hindi" else r["advice_hi"])
-                               for r in WEATHER_RULES if r["condition"] == "rain_probability_high")
-            })
-
-        # Strong wind
-        if tomorrow["wind_max"] >= 25:
-            alerts.append({
-                "type": "caution",
-                "icon": "💨",
-                "title": "Strong Winds" if lang != "Hindi" else "तेज हवा",
-                "message": next((r["advice_en"] if lang != "Hindi" else r["advice_hi"])
-                               for r in WEATHER_RULES if r["condition"] == "strong_wind")
-            })
-
-        # High humidity disease risk
-        if current["humidity"] >= 85 and tomorrow["temp_min"] >= 20:
-            alerts.append({
-                "type": "caution",
-                "icon": "🦠",
-                "title": "Disease Risk — High Humidity" if lang != "Hindi" else "रोग जोखिम — अधिक नमी",
-                "message": next((r["advice_en"] if lang != "Hindi" else r["advice_hi"])
-                               for r in WEATHER_RULES if r["condition"] == "high_humidity_disease_risk")
-            })
-
-        # === IRRIGATION ALERT ===
-        # Check next 3 days for no rain
-        no_rain_days = sum(1 for d in daily[:3] if d["rain_mm"] < 1)
-        if no_rain_days >= 3 and current["temp"] >= 30:
-            alerts.append({
-                "type": "irrigation",
-                "icon": "💧",
-                "title": "Irrigation Needed" if lang != "Hindi" else "सिंचाई आवश्यक",
-                "message": next((r["advice_en"] if lang != "Hindi" else r["advice_hi"])
-                               for r in WEATHER_RULES if r["condition"] == "irrigation_needed")
-            })
-
-        # === FAVORABLE ===
-        if (tomorrow["rain_prob"] < 20 and tomorrow["wind_max"] < 15 and
-                current["humidity"] < 80 and not any(a["type"] == "danger" for a in alerts)):
-            alerts.append({
-                "type": "favorable",
-                "icon": "✅",
-                "title": "Good Spray Window" if lang != "Hindi" else "छिड़काव के लिए अनुकूल",
-                "message": next((r["advice_en"] if lang != "Hindi" else r["advice_hi"])
-                               for r in WEATHER_RULES if r["condition"] == "good_spray_window")
-            })
-
-        return alerts
-
-    def _generate_advisory(self, weather: dict, alerts: list,
-                           season_name: str, season_data: dict,
-                           current_activity: str, city: str, state: str,
-                           lang: str, crop_type: str = None) -> str:
-        """Generate AI farming advisory."""
-        current = weather["current"]
-        tomorrow = weather["daily"][1] if len(weather["daily"]) > 1 else weather["daily"][0]
-
-        alert_summary = "\n".join(
-            f"  - [{a['type'].upper()}] {a['title']}: {a['message']}" for a in alerts
-        ) if alerts else "  No critical alerts."
-
-        crop_line = f"\nFarmer is growing: {crop_type}" if crop_type else ""
-
-        prompt = f"""You are 'NEER Weather Scout', an expert agricultural weather advisor for Indian farmers.
-
-CURRENT CONDITIONS in {city}, {state}:
-- Temperature: {current['temp']}°C (feels like {current['feels_like']}°C)
-- Humidity: {current['humidity']}%
-- Wind: {current['wind_speed']} km/h
-- Conditions: {current['weather_label']}
-- Season: {season_data['label']}
-
-TOMORROW'S FORECAST:
-- High: {tomorrow['temp_max']}°C, Low: {tomorrow['temp_min']}°C
-- Rain: {tomorrow['rain_mm']}mm ({tomorrow['rain_prob']}% probability)
-- Wind: {tomorrow['wind_max']} km/h
-- UV Index: {tomorrow['uv_index']}
-
-ACTIVE ALERTS:
-{alert_summary}
-
-SEASONAL ACTIVITY for this month: {current_activity}
-{crop_line}
-
-TASK: Write a concise 3-4 line farming advisory for today. Be specific and actionable.
-Include:
-1. What to do TODAY based on current weather
-2. What to PREPARE FOR based on tomorrow's forecast
-3. Any seasonal tip relevant to this month
-
-RULES:
-- Be concise — maximum 4 lines
-- Be specific (mention temperatures, timing)
-- Respond ONLY in {lang}
-- Do NOT use greetings or sign-offs"""
+            }
+        }, weather_data
 
+    def _generate_alerts(self, weather, lang: str, crop_type: str = None) -> list:
+        """Generate color-coded farming alerts from the compiled weather rules."""
+        return weather_rules.evaluate(weather_facts(weather), lang, crop_type)
+
+    async def _generate_advisory(self, weather, alerts: list,
+                                 season_name: str, season_data: dict,
+                                 current_activity: str, city: str, state: str,
+                                 lang: str, crop_type: str = None) -> str:
+        """
+        Generate AI farming advisory. The prompt is built from bucketed
+        features (advisory_buckets.py), so similar weather anywhere shares
+        one cached advisory; this location's numbers are filled in after.
+        """
+        current = weather.current
         try:
-            return self.text(prompt)
+            features = advisory_features(weather, alerts, season_data["label"], current_activity, lang, crop_type)
+            values = template_values(weather, city)
+            # Raw = everything the old per-location prompt was built from
+            self.advisory_stats.record({"values": values, "current": current, "state": state, "features": features}, features)
+            return fill_template(await self.text(advisory_prompt(features)), values)
         except Exception as e:
             print(f"[WEATHER SCOUT] Advisory AI failed: {e}")
             # Fallback
@@ -0,0 +1,344 @@
+"""
+NEER — Weather Data Service
+One Open-Meteo fetch per location, shared by /weather, /farm-advisor and chat.
+
+Every fetch asks for the superset the app needs — current conditions,
+daily summaries and hourly values for the whole FORECAST_DAYS window — and
+parses it into a columnar Forecast (float32 columns over shared daily and
+hourly time indexes). Caching, alerts and window scoring work on the
+arrays; daily_row()/daily_rows() build JSON dicts only for responses.
+
+Forecasts go through the ForecastCache (hourly-fresh, stale-while-
+revalidate). Any date inside the window is served from the cached
+superset (day()); only dates outside it need a separate date-range fetch.
+
+With a ForecastStore attached, every fetched superset is also appended
+to the local forecast history by a background task that logs its own
+errors, so a store failure never delays or fails a forecast.
+"""
+
+import asyncio
+from datetime import datetime
+from zoneinfo import ZoneInfo
+
+import numpy as np
+
+from forecast_cache import ForecastCache
+from http_pool import open_meteo
+from single_flight import SingleFlight
+
+FORECAST_DAYS = 7
+CURRENT_VARS = "temperature_2m,relative_humidity_2m,apparent_temperature,weather_code,wind_speed_10m,wind_direction_10m"
+DAILY_VARS = "weather_code,temperature_2m_max,temperature_2m_min,precipitation_sum,precipitation_probability_max,wind_speed_10m_max,uv_index_max"
+HOURLY_VARS = "temperature_2m,relative_humidity_2m,precipitation_probability,wind_speed_10m"
+TIMEZONE = "Asia/Kolkata"
+
+FORECAST_PARAMS = {
+    "current": CURRENT_VARS,
+    "daily": DAILY_VARS,
+    "hourly": HOURLY_VARS,
+    "timezone": TIMEZONE,
+    "forecast_days": FORECAST_DAYS,
+}
+
+
+def _get_weather_emoji(code: int) -> str:
+    """Map WMO weather code to emoji."""
+    if code <= 1:
+        return "☀️"
+    elif code <= 3:
+        return "⛅"
+    elif code <= 48:
+        return "🌫️"
+    elif code <= 55:
+        return "🌧️"
+    elif code <= 65:
+        return "🌧️"
+    elif code <= 67:
+        return "🌨️"
+    elif code <= 75:
+        return "❄️"
+    elif code <= 77:
+        return "🌨️"
+    elif code <= 82:
+        return "🌧️"
+    elif code <= 86:
+        return "❄️"
+    elif code <= 99:
+        return "⛈️"
+    return "🌤️"
+
+
+def _get_weather_label(code: int) -> str:
+    """Map WMO weather code to label."""
+    labels = {
+        0: "Clear sky", 1: "Mainly clear", 2: "Partly cloudy", 3: "Overcast",
+        45: "Foggy", 48: "Depositing rime fog",
+        51: "Light drizzle", 53: "Moderate drizzle", 55: "Dense drizzle",
+        61: "Slight rain", 63: "Moderate rain", 65: "Heavy rain",
+        66: "Light freezing rain", 67: "Heavy freezing rain",
+        71: "Slight snow", 73: "Moderate snow", 75: "Heavy snow",
+        80: "Slight rain showers", 81: "Moderate rain showers", 82: "Violent rain showers",
+        95: "Thunderstorm", 96: "Thunderstorm with hail", 99: "Thunderstorm with heavy hail"
+    }
+    return labels.get(code, "Partly cloudy")
+
+
+# ============================================================
+# FORECAST — columnar, JSON only at the response edge
+# ============================================================
+
+# Our column name → Open-Meteo variable
+DAILY_COLUMNS = {
+    "temp_max": "temperature_2m_max",
+    "temp_min": "temperature_2m_min",
+    "rain_mm": "precipitation_sum",
+    "rain_prob": "precipitation_probability_max",
+    "wind_max": "wind_speed_10m_max",
+    "uv_index": "uv_index_max",
+    "weather_code": "weather_code",
+}
+HOURLY_COLUMNS = {
+    "temp": "temperature_2m",
+    "humidity": "relative_humidity_2m",
+    "rain_prob": "precipitation_probability",
+    "wind": "wind_speed_10m",
+}
+# Whole-number columns come back out as int; the rest are rounded to
+# EDGE_DECIMALS, which recovers Open-Meteo's values exactly from float32
+INT_COLUMNS = {"rain_prob", "weather_code", "humidity"}
+EDGE_DECIMALS = 2
+
+
+def _parse_current(c: dict) -> dict:
+    return {
+        "temp": c["temperature_2m"],
+        "feels_like": c["apparent_temperature"],
+        "humidity": c["relative_humidity_2m"],
+        "wind_speed": c["wind_speed_10m"],
+        "wind_dir": c["wind_direction_10m"],
+        "weather_code": c["weather_code"],
+        "weather_emoji": _get_weather_emoji(c["weather_code"]),
+        "weather_label": _get_weather_label(c["weather_code"])
+    }
+
+
+def _column(values, n: int) -> np.ndarray:
+    """float32 column of length n; missing values (None / short lists) → NaN."""
+    column = np.full(n, np.nan, dtype=np.float32)
+    values = (values or [])[:n]
+    column[:len(values)] = [np.nan if v is None else v for v in values]
+    return column
+
+
+def to_json(name: str, value):
+    """One column value → JSON scalar (None for missing)."""
+    if np.isnan(value):
+        return None
+    if name in INT_COLUMNS:
+        return int(value)
+    return round(float(value), EDGE_DECIMALS)
+
+
+class Forecast:
+    """
+    One location's forecast as columns over shared time indexes:
+
+        dates  datetime64[D] (days,)    daily[name]  float32 (days,)
+        times  datetime64[m] (hours,)   hourly[name] float32 (hours,)
+        current — the single current-conditions row, a plain dict
+
+    ~8 KB for 7 days × 24 h (4 KB of column data), versus ~34 KB as
+    dicts and lists of Python objects.
+    """
+
+    __slots__ = ("current", "dates", "daily", "times", "hourly")
+
+    def __init__(self, current: dict, dates: np.ndarray, daily: dict, times: np.ndarray, hourly: dict):
+        self.current = current
+        self.dates = dates
+        self.daily = daily
+        self.times = times
+        self.hourly = hourly
+
+    @classmethod
+    def from_open_meteo(cls, data: dict) -> "Forecast":
+        """Parse one Open-Meteo location payload (current + daily + hourly)."""
+        d = data["daily"]
+        h = data.get("hourly", {})
+        dates = np.array(d["time"], dtype="datetime64[D]")
+        times = np.array(h.get("time", []), dtype="datetime64[m]")
+        return cls(
+            current=_parse_current(data["current"]) if "current" in data else None,
+            dates=dates,
+            daily={name: _column(d.get(var), len(dates)) for name, var in DAILY_COLUMNS.items()},
+            times=times,
+            hourly={name: _column(h.get(var), len(times)) for name, var in HOURLY_COLUMNS.items()},
+        )
+
+    @property
+    def tomorrow_index(self) -> int:
+        """Tomorrow's row, or today's if only one day is known."""
+        return 1 if len(self.dates) > 1 else 0
+
+    @property
+    def nbytes(self) -> int:
+        columns = [self.dates, self.times, *self.daily.values(), *self.hourly.values()]
+        return sum(c.nbytes for c in columns)
+
+    # ── JSON edge ──
+
+    def daily_row(self, i: int) -> dict:
+        row = {"date": str(self.dates[i])}
+        row.update((name, to_json(name, column[i])) for name, column in self.daily.items())
+        code = row["weather_code"]
+        row["weather_emoji"] = _get_weather_emoji(code) if code is not None else "🌤️"
+        row["weather_label"] = _get_weather_label(code)
+        return row
+
+    def daily_rows(self) -> list:
+        return [self.daily_row(i) for i in range(len(self.dates))]
+
+    # ── Per-date view ──
+
+    def day(self, date: str):
+        """
+        Hourly columns + daily summary for one date (YYYY-MM-DD), or None
+        if the date is outside this forecast's window:
+
+            {"hour": int8 (n,), "temp", "humidity", "rain_prob", "wind": float64 (n,),
+             "temp_max", "temp_min", "rain_total", "rain_prob_max": JSON scalars}
+        """
+        try:
+            target = np.datetime64(date, "D")
+        except ValueError:
+            return None
+        found = np.nonzero(self.dates == target)[0]
+        if not len(found):
+            return None
+        i = found[0]
+        in_day = self.times.astype("datetime64[D]") == target
+        view = {"hour": ((self.times[in_day] - target) // np.timedelta64(1, "h")).astype(np.int8)}
+        # float64 at EDGE_DECIMALS: the exact Open-Meteo values for scoring
+        view.update((name, np.round(column[in_day].astype(np.float64), EDGE_DECIMALS))
+                    for name, column in self.hourly.items())
+        view["temp_max"] = to_json("temp_max", self.daily["temp_max"][i])
+        view["temp_min"] = to_json("temp_min", self.daily["temp_min"][i])
+        view["rain_total"] = to_json("rain_mm", self.daily["rain_mm"][i])
+        view["rain_prob_max"] = to_json("rain_prob", self.daily["rain_prob"][i])
+        return view
+
+
+def parse_forecast(data: dict) -> Forecast:
+    """Parse one Open-Meteo location payload (current + daily + hourly)."""
+    return Forecast.from_open_meteo(data)
+
+
+# ============================================================
+# SERVICE
+# ============================================================
+
+class WeatherService:
+    """Cached superset forecasts per location, with per-date views."""
+
+    def __init__(self, store=None):
+        self.forecasts = ForecastCache(self.fetch)
+        self.store = store
+        # Dates outside the cached window: farmers asking about the same
+        # cell/date share one in-flight fetch
+        self.day_flight = SingleFlight("open_meteo_day")
+        self._stats = {"days_from_window": 0, "days_fetched": 0, "record_errors": 0}
+        self._record_tasks = set()
+
+    async def fetch(self, lat: float, lon: float) -> Forecast:
+        """Fetch the superset for one location (called by the cache on a miss)."""
+        params = {"latitude": lat, "longitude": lon, **FORECAST_PARAMS}
+        forecast = parse_forecast(await open_meteo.get_json("/v1/forecast", params))
+        self._record([(lat, lon)], [forecast])
+        return forecast
+
+    async def fetch_bulk(self, coords: list) -> list:
+        """
+        Fetch the superset for many (lat, lon) pairs in ONE Open-Meteo request
+        (comma-separated coordinate lists). Results are in input order.
+        """
+        params = {
+            "latitude": ",".join(str(lat) for lat, _ in coords),
+            "longitude": ",".join(str(lon) for _, lon in coords),
+            **FORECAST_PARAMS,
+        }
+        data = await open_meteo.get_json("/v1/forecast", params)
+        # A single location comes back as an object, several as a list
+        locations = data if isinstance(data, list) else [data]
+        if len(locations) != len(coords):
+            raise ValueError(f"Open-Meteo returned {len(locations)} locations for {len(coords)} requested")
+        forecasts = [parse_forecast(loc) for loc in locations]
+        self._record(coords, forecasts)
+        return forecasts
+
+    def _record(self, coords: list, forecasts: list):
+        """Schedule appending fetched forecasts to the history store, if one is attached."""
+        if self.store is None:
+            return
+        issued = datetime.now(ZoneInfo(TIMEZONE)).replace(tzinfo=None)
+        task = asyncio.ensure_future(self._record_all(coords, forecasts, issued))
+        self._record_tasks.add(task)
+        task.add_done_callback(self._record_tasks.discard)
+
+    async def _record_all(self, coords: list, forecasts: list, issued: datetime):
+        def record_all():
+            for (lat, lon), forecast in zip(coords, forecasts):
+                self.store.record(lat, lon, forecast, issued)
+
+        try:
+            await asyncio.to_thread(record_all)
+        except Exception as e:
+            self._stats["record_errors"] += 1
+            print(f"[FORECAST STORE] Recording {len(coords)} forecast(s) failed: {e}")
+
+    async def forecast(self, lat: float, lon: float):
+        """(forecast, freshness) for the cell containing (lat, lon)."""
+        return await self.forecasts.get(lat, lon)
+
+    async def day(self, lat: float, lon: float, date: str) -> dict:
+        """Hourly columns + daily summary for one date (YYYY-MM-DD); see Forecast.day()."""
+        if self._in_window(date):
+            forecast, _ = await self.forecasts.get(lat, lon)
+            view = forecast.day(date)
+            if view is not None:
+                self._stats["days_from_window"] += 1
+                return view
+
+        self._stats["days_fetched"] += 1
+        key = (*self.forecasts.key(lat, lon), date)
+        return await self.day_flight.do(key, self._fetch_day, *key)
+
+    @staticmethod
+    def _in_window(date: str) -> bool:
+        try:
+            offset = (datetime.strptime(date, "%Y-%m-%d").date() - datetime.now().date()).days
+        except ValueError:
+            return False
+        return 0 <= offset < FORECAST_DAYS
+
+    async def _fetch_day(self, lat: float, lon: float, date: str) -> dict:
+        params = {
+            "latitude": lat,
+            "longitude": lon,
+            "hourly": HOURLY_VARS,
+            "daily": DAILY_VARS,
+            "timezone": TIMEZONE,
+            "start_date": date,
+            "end_date": date,
+        }
+        view = parse_forecast(await open_meteo.get_json("/v1/forecast", params)).day(date)
+        if view is None:
+            raise ValueError(f"No forecast returned for {date}")
+        return view
+
+    def stats(self) -> dict:
+        return {
+            **self._stats,
+            "forecast_cache": self.forecasts.stats(),
+            "day_single_flight": self.day_flight.stats(),
+        }
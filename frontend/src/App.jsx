@@ -636,7 +636,7 @@ function App() {
         if (user?.id === 'guest') {
             switch (page) {
                 case 'home': return <HomePage go={go} lang={lang} />;
-                case 'chat': return <ChatPage onBack={() => { go('home'); setChatCtx(null); }} lang={lang} ctx={chatCtx} />;
+                case 'chat': return <ChatPage onBack={() => { go('home'); setChatCtx(null); }} lang={lang} ctx={chatCtx} user={user} />;
                 case 'detect': return <DetectPage onBack={() => go('home')} lang={lang} user={user} />;
                 case 'schemes': return <SchemesPage onBack={() => go('home')} lang={lang} go={go} />;
                 case 'weather': return <WeatherPage onBack={() => go('home')} lang={lang} />;
@@ -659,7 +659,7 @@ function App() {
         if (page === 'profile-setup') return <ProfileSetup user={user} lang={lang} onComplete={() => syncUser(session)} />;
         switch (page) {
             case 'home': return <HomePage go={go} lang={lang} />;
-            case 'chat': return <ChatPage onBack={() => { go('home'); setChatCtx(null); }} lang={lang} ctx={chatCtx} />;
+            case 'chat': return <ChatPage onBack={() => { go('home'); setChatCtx(null); }} lang={lang} ctx={chatCtx} user={user} />;
             case 'detect': return <DetectPage onBack={() => go('home')} lang={lang} user={user} />;
             case 'schemes': return <SchemesPage onBack={() => go('home')} lang={lang} go={go} />;
             case 'weather': return <WeatherPage onBack={() => go('home')} lang={lang} />;
@@ -1033,7 +1033,7 @@ function HomePage({ go, lang }) {
 /* ============================================================
    2. CHAT PAGE
    ============================================================ */
-function ChatPage({ onBack, lang, ctx }) {
+function ChatPage({ onBack, lang, ctx, user }) {
     const [msgs, setMsgs] = useState([]);
     const [input, setInput] = useState('');
     const [loading, setLoading] = useState(false);
@@ -1110,10 +1110,13 @@ function ChatPage({ onBack, lang, ctx }) {
         setInput('');
         setLoading(true);
 
+        // Server keeps conversation memory per signed-in user (guests stay stateless)
+        const chatUserId = user?.id && user.id !== 'guest' ? user.id : undefined;
+
         const trySend = async (attempts = 4) => {
             for (let i = 0; i < attempts; i++) {
                 try {
-                    const r = await axios.post(`${API}/chat`, { message: q, context: ctx });
+                    const r = await axios.post(`${API}/chat`, { message: q, context: ctx, user_id: chatUserId });
                     const reply = r.data.response || r.data.reply || (lang === 'Hindi' ? 'क्षमा करें, अभी मदद नहीं कर पा रहा।' : 'Sorry, I couldn\'t process that.');
                     setMsgs(p => [...p, { role: 'bot', text: reply }]);
                     return true;
@@ -1132,7 +1135,62 @@ function ChatPage({ onBack, lang, ctx }) {
             }
         };
 
-        await trySend();
+        // Stream tokens over SSE so slow links see text as soon as it arrives.
+        // Falls back to the plain /chat endpoint only if the stream itself
+        // could not be opened or broke before anything arrived.
+        const tryStream = async () => {
+            let text = '';
+            let started = false;
+            try {
+                const res = await fetch(`${API}/chat/stream`, {
+                    method: 'POST',
+                    headers: { 'Content-Type': 'application/json' },
+                    body: JSON.stringify({ message: q, context: ctx, user_id: chatUserId }),
+                });
+                if (!res.ok || !res.body) return false;
+                const reader = res.body.getReader();
+                const decoder = new TextDecoder();
+                let buf = '';
+                while (true) {
+                    const { value, done } = await reader.read();
+                    if (done) break;
+                    buf += decoder.decode(value, { stream: true });
+                    const events = buf.split('\n\n');
+                    buf = events.pop();
+                    for (const raw of events) {
+                        const event = raw.match(/^event: (.*)$/m)?.[1];
+                        const data = JSON.parse(raw.match(/^data: (.*)$/m)?.[1] || '{}');
+                        if (event === 'token') {
+                            text += data.text;
+                            if (!started) {
+                                started = true;
+                                setLoading(false);
+                                setMsgs(p => [...p, { role: 'bot', text }]);
+                            } else {
+                                setMsgs(p => [...p.slice(0, -1), { role: 'bot', text }]);
+                            }
+                        } else if (event === 'error') {
+                            // The server already ran (or gave up on) the orchestration —
+                            // re-posting to /chat would only repeat it, so show the reason
+                            const detail = data.detail || (lang === 'Hindi' ? 'संपर्क टूट गया, पुनः प्रयास करें।' : 'Connection lost, please try again.');
+                            if (!started) {
+                                started = true;
+                                setLoading(false);
+                                setMsgs(p => [...p, { role: 'bot', text: detail }]);
+                            } else {
+                                setMsgs(p => [...p.slice(0, -1), { role: 'bot', text: `${text}\n\n${detail}` }]);
+                            }
+                        }
+                    }
+                }
+                return started;
+            } catch (err) {
+                console.warn('Chat stream failed, falling back', err);
+                return started;
+            }
+        };
+
+        if (!(await tryStream())) await trySend();
         setLoading(false);
     };
 